@@ -1,9 +1,13 @@
 import os
+import sys
 import argparse
 import logging
 from dotenv import load_dotenv
-from src.controllers.image_generation_controller import ImageGenerationController
-from src.controllers.llm_provider_controller import LLMProviderController
+from src.models.container_run import ContainerLimits
+from src.models.garbage_collection import GCPolicy
+from src.models.run_options import RunOptions
+from src.services.security_service import SecurityService
+from src.constants import DOCKER_BACKENDS, DockerConstants, GCConstants, GenerationConstants, HISTORY_MODES, OPTIMIZE_GOALS
 
 
 def setup_logging():
@@ -15,12 +19,100 @@ def parse_args():
     parser = argparse.ArgumentParser(description='Analyze script and generate Dockerfile')
     parser.add_argument('script_path', help='Path to the script file within the repository')
     parser.add_argument('example_path', help='Path to the markdown file containing usage examples')
-    parser.add_argument('--model', default='openai', help='Specify the LLM model to use (default: openai)')
+    parser.add_argument('--model', default='openai', help='Specify the LLM model to use: openai, google or replay (default: openai)')
     parser.add_argument('--debug', action='store_true', help='Enable debug mode')
+    parser.add_argument('--no-cache', action='store_true', help='Bypass the on-disk cache of LLM analysis results')
+    parser.add_argument('--no-static-analysis', action='store_true',
+                        help='Always analyze the script and example with the LLM instead of trying local analysis first')
+    parser.add_argument('--no-templates', action='store_true',
+                        help='Always generate the Dockerfile with the LLM instead of trying a template first')
+    parser.add_argument('--history', choices=HISTORY_MODES, default=GenerationConstants.DEFAULT_HISTORY_MODE,
+                        help='How much conversation history Dockerfile retries replay (default: full)')
+    parser.add_argument('--stream', action='store_true',
+                        help='Stream Dockerfile generation and abort early on output that is not a Dockerfile')
+    parser.add_argument('--disk-context', action='store_true',
+                        help='Build every attempt from the build context directory instead of an in-memory context')
+    parser.add_argument('--no-normalize', action='store_true',
+                        help='Build Dockerfiles as generated, without moving dependency installs before the script COPY')
+    parser.add_argument('--buildkit', action='store_true',
+                        help='Build with BuildKit through the docker CLI and share package-manager caches between builds')
+    parser.add_argument('--cache-from', action='append', default=[], metavar='IMAGE',
+                        help='Image to use as a layer cache source, may be repeated')
+    parser.add_argument('--no-prefetch', action='store_true',
+                        help='Do not pull the predicted base image in the background while the Dockerfile is generated')
+    parser.add_argument('--test-timeout', type=float, default=DockerConstants.TEST_TIMEOUT_SECONDS,
+                        help='Seconds a test container may run before it is killed (default: %(default)s)')
+    parser.add_argument('--test-memory', default=DockerConstants.TEST_MEM_LIMIT,
+                        help='Memory limit of a test container (default: %(default)s)')
+    parser.add_argument('--test-cpus', type=float, default=DockerConstants.TEST_NANO_CPUS / 1e9,
+                        help='CPUs available to a test container (default: %(default)s)')
+    parser.add_argument('--warm-containers', action='store_true',
+                        help='Run repeated test commands in a long-lived container per image instead of a new one each time')
+    parser.add_argument('--no-memo', action='store_true',
+                        help='Build and test every Dockerfile, even one already built and tested for this script and test command')
+    parser.add_argument('--no-validate', action='store_true',
+                        help='Send every generated Dockerfile to Docker without checking it locally first')
+    parser.add_argument('--candidates', type=int, default=1, metavar='N',
+                        help='Generate N diverse Dockerfiles at once and build and test them concurrently (default: 1)')
+    parser.add_argument('--optimize', choices=OPTIMIZE_GOALS, default=GenerationConstants.DEFAULT_OPTIMIZE_GOAL,
+                        help='Once a Dockerfile passes, try variants of it and keep the best one (default: none)')
+    parser.add_argument('--docker-backend', choices=DOCKER_BACKENDS, default=DockerConstants.DEFAULT_BACKEND,
+                        help='Build and test with the Docker daemon, or simulate it in-process with fake (default: daemon)')
+    parser.add_argument('--token-budget', type=int, help='Stop generating once the run has used this many tokens')
+    parser.add_argument('--cost-budget', type=float, help='Stop generating once the estimated run cost (USD) reaches this amount')
     return parser.parse_args()
 
+def parse_gc_args(argv):
+    parser = argparse.ArgumentParser(
+        prog='main.py gc',
+        description='Remove generated images, leftover containers, dangling layers and stale build contexts',
+    )
+    parser.add_argument('--dry-run', action='store_true', help='Report what would be removed without removing it')
+    parser.add_argument('--max-age-days', type=float, default=GCConstants.DEFAULT_MAX_AGE_DAYS,
+                        help='Remove images and build contexts unused for longer (default: %(default)s)')
+    parser.add_argument('--max-images', type=int, default=GCConstants.DEFAULT_MAX_IMAGES,
+                        help='Keep at most this many of the most recently used images (default: %(default)s)')
+    parser.add_argument('--max-image-gb', type=float, default=GCConstants.DEFAULT_MAX_IMAGE_BYTES / 1024 ** 3,
+                        help='Keep the most recently used images within this total size (default: %(default)s)')
+    parser.add_argument('--max-build-contexts', type=int, default=GCConstants.DEFAULT_MAX_BUILD_CONTEXTS,
+                        help='Keep at most this many of the most recently used build contexts (default: %(default)s)')
+    parser.add_argument('--docker-backend', choices=DOCKER_BACKENDS, default=DockerConstants.DEFAULT_BACKEND,
+                        help='Collect from the Docker daemon, or from the in-process fake with fake (default: daemon)')
+    parser.add_argument('--debug', action='store_true', help='Enable debug mode')
+    return parser.parse_args(argv)
+
+def run_gc(argv):
+    args = parse_gc_args(argv)
+    if args.debug:
+        os.environ["DEBUG_MODE"] = "True"
+    setup_logging()
+
+    from docker.errors import DockerException
+    from src.controllers.garbage_collection_controller import GarbageCollectionController
+    from src.core.docker_backend import get_docker_backend
+    from src.core.docker_manager import DockerManager
+
+    policy = GCPolicy(
+        max_age_days=args.max_age_days,
+        max_images=args.max_images,
+        max_image_bytes=int(args.max_image_gb * 1024 ** 3),
+        max_build_contexts=args.max_build_contexts,
+        dry_run=args.dry_run,
+    )
+    docker_manager = DockerManager(backend=get_docker_backend(args.docker_backend))
+    try:
+        report = GarbageCollectionController(docker_manager=docker_manager).run(policy)
+    except DockerException as e:
+        logging.error(f"Garbage collection failed, is the Docker daemon running? {e}")
+        exit(1)
+    exit(1 if report.failed_items else 0)
+
 def main():
     load_dotenv()
+    if sys.argv[1:2] == ["gc"]:
+        run_gc(sys.argv[2:])
+        return
+
     args = parse_args()
 
     if args.debug:
@@ -28,13 +120,48 @@ def main():
 
     setup_logging()
 
+    # Reject invalid inputs before paying for the LLM and Docker imports
+    try:
+        SecurityService().sanitize_paths(args.script_path, args.example_path)
+    except (FileNotFoundError, ValueError) as e:
+        logging.error(f"Invalid input: {e}")
+        exit(1)
+
+    from src.controllers.image_generation_controller import ImageGenerationController
+    from src.controllers.llm_provider_controller import LLMProviderController
+
     # Run the docker generation process
     llm_provider_controller = LLMProviderController(args.model)
     llm_provider = llm_provider_controller.get_llm_provider()
-    image_generation_controller = ImageGenerationController(llm_provider)
-    success = image_generation_controller.run(args.script_path, args.example_path)
+    options = RunOptions(
+        use_cache=not args.no_cache,
+        use_static_analysis=not args.no_static_analysis,
+        token_budget=args.token_budget,
+        cost_budget=args.cost_budget,
+        history_mode=args.history,
+        stream=args.stream,
+        use_templates=not args.no_templates,
+        in_memory_context=not args.disk_context,
+        normalize_dockerfile=not args.no_normalize,
+        buildkit=args.buildkit,
+        cache_from=args.cache_from,
+        prefetch_base_image=not args.no_prefetch,
+        container_limits=ContainerLimits(
+            timeout_seconds=args.test_timeout,
+            mem_limit=args.test_memory,
+            nano_cpus=int(args.test_cpus * 1e9),
+        ),
+        warm_containers=args.warm_containers,
+        memoize_results=not args.no_memo,
+        validate_dockerfile=not args.no_validate,
+        candidates=max(1, args.candidates),
+        optimize=args.optimize,
+        docker_backend=args.docker_backend,
+    )
+    image_generation_controller = ImageGenerationController(llm_provider, options)
+    result = image_generation_controller.run(args.script_path, args.example_path)
 
-    exit(0 if success else 1)
+    exit(0 if result.success else 1)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -1,3 +1,4 @@
+import os
 import typing
 from typing import Literal, Tuple
 
@@ -8,6 +9,67 @@ class LLMProviderConstants:
     DEFAULT_OPENAI_TEMPERATURE = 0.3
     DEFAULT_GOOGLE_MODEL_NAME = "gemini-1.5-pro"
     DEFAULT_GOOGLE_TEMPERATURE = 0.3
+    PROVIDER_POOL_MAX_SIZE = 32  # Maximum number of pooled providers (and compiled agents) per process
+
+
+# Backends DockerManager drives: a real Docker daemon, or the in-process fake for benchmarking
+DockerBackendName = Literal["daemon", "fake"]
+DOCKER_BACKENDS: Tuple[DockerBackendName, ...] = typing.get_args(DockerBackendName)
+
+
+# Constants related to Docker builds
+class DockerConstants:
+    BUILD_LOG_TAIL_LINES = 20  # Lines of the failing step's log kept in a build result
+    PREFETCH_MAX_WORKERS = 2  # Concurrent background image pulls
+    # Limits of a test container, so a hanging or runaway script cannot stall the pipeline
+    TEST_TIMEOUT_SECONDS = 60
+    TEST_MEM_LIMIT = "512m"
+    TEST_NANO_CPUS = 1_000_000_000  # One CPU
+    TEST_PIDS_LIMIT = 256
+    OOM_EXIT_CODE = 137
+    RUN_HISTORY_SIZE = 50  # Container test results kept in memory
+    # Bytes of container output kept per test, from its start and from its end
+    LOG_CAPTURE_HEAD_BYTES = 4 * 1024
+    LOG_CAPTURE_TAIL_BYTES = 12 * 1024
+    WARM_CONTAINER_MAX_USES = 20  # Tests run in a warm container before it is replaced by a fresh one
+    WARM_CONTAINER_IDLE_ENTRYPOINT = ["sleep", "2147483647"]  # Keeps a warm container running between tests
+    # Connections kept open by the shared Docker client, as docker-py's default of 10 is shared by every thread
+    CLIENT_POOL_SIZE_ENV_VAR = "DOCKER_CLIENT_POOL_SIZE"
+    DEFAULT_CLIENT_POOL_SIZE = 10
+    CLIENT_HEALTH_CHECK_INTERVAL_SECONDS = 30  # A shared client idle for longer is pinged before it is reused
+    IMAGE_REPOSITORY = "script-container"  # Repository every generated image is tagged in
+    DEFAULT_BACKEND: DockerBackendName = "daemon"
+
+
+class FakeDockerConstants:
+    CONFIG_PATH_ENV_VAR = "FAKE_DOCKER_CONFIG"  # JSON file of the timings and failure rates to simulate
+    DEFAULT_BASE_IMAGE_BYTES = 150 * 1024 ** 2
+    DEFAULT_LAYER_BYTES = 20 * 1024 ** 2
+    KILLED_EXIT_CODE = 137  # Exit code of a container killed with SIGKILL
+
+
+# Constants related to garbage collection of generated images, containers and build contexts
+class GCConstants:
+    DEFAULT_MAX_AGE_DAYS = 7
+    DEFAULT_MAX_IMAGES = 50
+    DEFAULT_MAX_IMAGE_BYTES = 10 * 1024 ** 3
+    DEFAULT_MAX_BUILD_CONTEXTS = 50
+    # Dangling images and exited test containers younger than this may belong to a run still in progress
+    MIN_AGE_SECONDS = 60 * 60
+
+
+# Constants related to the record/replay LLM provider
+class ReplayConstants:
+    MODE_ENV_VAR = "LLM_REPLAY_MODE"  # "replay" (default) or "record"
+    CASSETTE_PATH_ENV_VAR = "LLM_CASSETTE_PATH"
+    LATENCY_ENV_VAR = "LLM_REPLAY_LATENCY"  # Seconds per response, or "recorded" to reuse the recorded latency
+    RECORD_VENDOR_ENV_VAR = "LLM_RECORD_VENDOR"  # Vendor whose responses are recorded
+    DEFAULT_MODE = "replay"
+    DEFAULT_CASSETTE_PATH = os.path.join(".cache", "llm_cassette.json")
+    DEFAULT_LATENCY = "0"
+    DEFAULT_RECORD_VENDOR = "openai"
+    RECORDED_LATENCY = "recorded"
+    MODEL_NAME = "replay"
 
 
 # Constants related to Token Usage
@@ -17,6 +79,24 @@ class TokenUsageConstants:
         "output_tokens": 0,
         "total_tokens": 0
     }
+    # USD per million tokens, used to estimate the cost of a run against its budget
+    PRICING_PER_MILLION_TOKENS = {
+        "gpt-4o-mini": {"input": 0.15, "output": 0.60},
+        "gemini-1.5-pro": {"input": 1.25, "output": 5.00},
+    }
+
+
+# Constants related to the LLM response cache
+class CacheConstants:
+    CACHE_DIR_ENV_VAR = "LLM_CACHE_DIR"
+    DEFAULT_CACHE_DIR = os.path.join(".cache", "llm_responses")
+    MAX_ENTRIES = 500
+    MAX_AGE_SECONDS = 7 * 24 * 60 * 60  # One week
+    # Built images and test outcomes, stored under the build context root unless overridden
+    RESULT_STORE_DIR_ENV_VAR = "RESULT_STORE_DIR"
+    RESULT_STORE_FILENAME = "results.sqlite3"
+    RESULT_STORE_MAX_ENTRIES = 500
+    RESULT_STORE_MAX_AGE_SECONDS = 7 * 24 * 60 * 60  # One week
 
 
 # Constants related to Prompts
@@ -222,16 +302,79 @@ tool.exe /config=config.yaml /debug
     Make sure to reference it correctly in the COPY and CMD instructions.
     """
 
+    # Appended to the generation prompt of each candidate, so concurrent candidates try different base images
+    DOCKERFILE_CANDIDATE_HINTS = (
+        "",
+        "Base the image on the slim variant of the official language image.",
+        "Base the image on the Alpine variant of the official language image, if the dependencies are available for it.",
+        "Base the image on the full official language image, not a slim or Alpine variant.",
+    )
+
     PROMPT_DOCKERFILE_ERROR = """
     The Dockerfile failed to build the image with the following error: {error}.
     Please correct the Dockerfile and try again.
     """
 
+    PROMPT_DOCKERFILE_COMPACT_RETRY = """
+    {requirements_prompt}
+
+    A previous attempt produced the following Dockerfile:
+    {dockerfile}
+
+    The attempts so far failed with the following errors (oldest first):
+    {error_trail}
+
+    Please correct the Dockerfile and try again.
+    """
+
+    PROMPT_DOCKERFILE_OPTIMIZE_SIZE = """
+    The following Dockerfile builds an image that passes its test command:
+    {dockerfile}
+
+    The image is pulled by many nodes, so rewrite the Dockerfile to produce the smallest possible image.
+    Use a multi-stage build where it helps, and base the final stage on a distroless or Alpine image when the
+    script can run on it. The image must still support the following execution command:
+    {command}
+
+    Respond with the Dockerfile only.
+    """
+
     PROMPT_EXAMPLE_ANALYZER = "Please analyze this example file and provide the execution arguments:\n\n{example_content}"
 
 
+# Constants related to Dockerfile generation
+HistoryMode = Literal["compact", "full"]
+HISTORY_MODES: Tuple[HistoryMode, ...] = typing.get_args(HistoryMode)
+OptimizeGoal = Literal["none", "size"]
+OPTIMIZE_GOALS: Tuple[OptimizeGoal, ...] = typing.get_args(OptimizeGoal)
+
+
+class GenerationConstants:
+    DEFAULT_HISTORY_MODE: HistoryMode = "full"
+    MAX_ERROR_TRAIL_ENTRIES = 3  # Number of failed attempts summarised in a compact retry prompt
+    MAX_LATEST_ERROR_CHARS = 2000  # The latest error keeps its tail, where Docker reports the failure
+    MAX_SUMMARISED_ERROR_CHARS = 200  # Older errors are reduced to the start of their first line
+    # Candidate Dockerfiles generated at once cycle through these temperatures for diversity
+    CANDIDATE_TEMPERATURES = (0.2, 0.7, 1.0)
+    MAX_CONCURRENT_CANDIDATE_BUILDS = 2  # Builds and tests of candidates running at the same time
+    DEFAULT_OPTIMIZE_GOAL: OptimizeGoal = "none"
+    # Smaller variants of official base images tried by `--optimize size`, as tag suffixes
+    SMALLER_BASE_IMAGE_SUFFIXES = {
+        "python": ("slim", "alpine"),
+        "node": ("slim", "alpine"),
+        "ruby": ("slim", "alpine"),
+        "golang": ("alpine",),
+        "debian": ("slim",),
+    }
+
+
+# Constants related to local (non-LLM) analysis
+class StaticAnalysisConstants:
+    MIN_CONFIDENCE = 0.8  # Below this, the script is analyzed by the LLM instead
+
+
 # Constants related to Vendor Types
-ValidVendorArgument = Literal["openai", "google"]
+ValidVendorArgument = Literal["openai", "google", "replay"]
 VALID_VENDORS: Tuple[ValidVendorArgument, ...] = typing.get_args(ValidVendorArgument)
 
 
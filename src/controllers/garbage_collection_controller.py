@@ -0,0 +1,23 @@
+import logging
+from typing import Optional
+
+from src.core.docker_manager import DockerManager
+from src.models.build_context import BuildContext
+from src.models.garbage_collection import GCPolicy, GCReport
+from src.services.file_service import FileService
+
+
+class GarbageCollectionController:
+    def __init__(self, docker_manager: Optional[DockerManager] = None, file_service: Optional[FileService] = None):
+        self.logger = logging.getLogger(__name__)
+        self.docker_manager = docker_manager or DockerManager()
+        self.file_service = file_service or FileService()
+
+    def run(self, policy: GCPolicy, context_root: Optional[str] = None) -> GCReport:
+        """Collect the generated containers, images and dangling layers, then the build contexts."""
+        context_root = context_root or BuildContext.model_fields["context_root"].default
+        report = GCReport(dry_run=policy.dry_run)
+        report.items += self.docker_manager.collect_garbage(policy)
+        report.items += self.file_service.collect_garbage(context_root, policy)
+        self.logger.info(f"Garbage collection{' (dry run)' if policy.dry_run else ''}:\n{report.format()}")
+        return report
@@ -1,38 +1,84 @@
 import os
+import asyncio
 import logging
+from typing import Optional, Tuple
 
 from src.models.script_analysis import ScriptAnalysis
 from src.services.file_service import FileService
 from src.services.llm_services.script_analyzer import ScriptAnalyzer
 from src.services.llm_services.dockerfile_generator import DockerfileGenerator
 from src.services.llm_services.example_analyzer import ExampleAnalyzer
+from src.services.dockerfile_normalizer import DockerfileNormalizer
+from src.services.dockerfile_template_engine import DockerfileTemplateEngine
+from src.services.dockerfile_validator import DockerfileValidator
+from src.core.build_context_archive import BuildContextArchive
+from src.core.docker_backend import get_docker_backend
 from src.core.docker_manager import DockerManager
+from src.core.image_result_store import ImageResultStore
 from src.models.docker_file_generation import DockerfileGenerationRequest
 from src.models.build_context import BuildContext
 from src.services.tool_services.build_image import BuildImageTool
 from src.services.tool_services.test_container import TestContainerTool
 from src.services.security_service import SecurityService
+from src.core.llm_cache import LLMResponseCache
+from src.models.run_options import RunOptions
+from src.models.run_result import RunResult
+from src.models.token_ledger import TokenLedger
+from src.constants import GenerationConstants
 
 
 class ImageGenerationController:
-    def __init__(self, llm_provider):
+    def __init__(self, llm_provider, options: Optional[RunOptions] = None):
         self.logger = logging.getLogger(__name__)
         self.llm_provider = llm_provider
-        self.script_analyzer = ScriptAnalyzer(self.llm_provider)
-        self.example_analyzer = ExampleAnalyzer(self.llm_provider)
-        self.docker_manager = DockerManager()
+        self.options = options or RunOptions()
+        self.llm_cache = LLMResponseCache() if self.options.use_cache else None
+        self.token_ledger = TokenLedger(
+            max_total_tokens=self.options.token_budget,
+            max_cost=self.options.cost_budget,
+        )
+        self.script_analyzer = ScriptAnalyzer(
+            self.llm_provider,
+            cache=self.llm_cache,
+            ledger=self.token_ledger,
+            use_static_analysis=self.options.use_static_analysis,
+        )
+        self.example_analyzer = ExampleAnalyzer(
+            self.llm_provider,
+            cache=self.llm_cache,
+            ledger=self.token_ledger,
+            use_static_analysis=self.options.use_static_analysis,
+        )
+        self.docker_manager = DockerManager(
+            use_buildkit=self.options.buildkit,
+            cache_from=self.options.cache_from,
+            limits=self.options.container_limits,
+            warm_containers=self.options.warm_containers,
+            backend=get_docker_backend(self.options.docker_backend),
+        )
         self.file_service = FileService()
         self.security_service = SecurityService()
 
-    def run(self, script_path: str, example_path: str) -> bool:
+    def run(self, script_path: str, example_path: str) -> RunResult:
+        self.token_ledger.reset()
         try:
-            script_path, example_path = self.security_service.sanitize_paths(script_path, example_path)
+            success = self._run(script_path, example_path)
+        finally:
+            self.docker_manager.close()
+        result = RunResult(
+            success=success,
+            token_usage=self.token_ledger.get_totals(),
+            stage_token_usage=self.token_ledger.get_stage_totals(),
+        )
+        self.logger.info(f"Token usage: {result.token_usage}")
+        return result
 
-            self.logger.info("Analyzing script...")
-            analysis = self.script_analyzer.analyze_script(script_path)
+    def _run(self, script_path: str, example_path: str) -> bool:
+        try:
+            script_path, example_path = self.security_service.sanitize_paths(script_path, example_path)
 
-            self.logger.info("Analyzing example file...")
-            test_command = self.generate_test_command(example_path)
+            self.logger.info("Analyzing script and example file...")
+            analysis, test_command = asyncio.run(self.analyze_inputs(script_path, example_path))
 
             self.logger.info("Creating build context...")
             script_name = os.path.splitext(os.path.basename(script_path))[0]
@@ -40,19 +86,24 @@ class ImageGenerationController:
             tag = build_context.get_image_tag()
 
             self.file_service.prepare_build_context(build_context)
+            if self.options.prefetch_base_image:
+                self.prefetch_base_image(analysis)
 
             self.logger.info("Generating Dockerfile...")
             self.generate_dockerfile(build_context, analysis, test_command)
 
             self.logger.info("Building Docker image...")
             self.logger.info(f"Image tag: {tag}")
-            self.docker_manager.build_image(build_context.get_context_directory(), tag)
+            build_result = self.docker_manager.build_image(build_context.get_context_directory(), tag)
+            if not build_result:
+                self.logger.error(f"Docker build failed!\n{build_result.get_error_message()}")
+                return False
 
             self.logger.info("Testing Docker container...")
             tested_successfully = self.docker_manager.test_container(tag, test_command)
 
             if not tested_successfully:
-                self.logger.error("Container test failed!")
+                self.logger.error(f"Container test failed!\n{self.docker_manager.run_history[-1].get_error_message()}")
                 return False
 
             self.logger.info("Container tested successfully!")
@@ -62,18 +113,37 @@ class ImageGenerationController:
             self.logger.exception(f"Error in orchestration process")
             return False
 
+    def prefetch_base_image(self, analysis: ScriptAnalysis):
+        """Pull the likely base image in the background, so the pull overlaps with Dockerfile generation."""
+        base_image = DockerfileTemplateEngine().predict_base_image(analysis)
+        if base_image:
+            self.logger.info(f"Prefetching base image: {base_image}")
+            self.docker_manager.prefetch_image(base_image)
+
     def generate_dockerfile(self, build_context: BuildContext, analysis: ScriptAnalysis, test_command: str):
+        result_store = ImageResultStore(
+            build_context.get_result_store_path(), build_context.get_manifest(), test_command,
+            limits=self.options.container_limits,
+        ) if self.options.memoize_results else None
+        validator = DockerfileValidator(
+            [BuildContextArchive.DOCKERFILE_NAME, *build_context.get_manifest()]
+        ) if self.options.validate_dockerfile else None
+
         build_image_tool = BuildImageTool(
             docker_manager=self.docker_manager,
             file_interface=self.file_service.file_interface,
             dockerfile_path=build_context.get_dockerfile_path(),
             tag=build_context.get_image_tag(),
+            context_archive=BuildContextArchive(build_context.get_manifest()) if self.options.in_memory_context else None,
+            result_store=result_store,
+            validator=validator,
         )
 
         test_container_tool = TestContainerTool(
             docker_manager=self.docker_manager,
             tag=build_context.get_image_tag(),
             test_command=test_command,
+            result_store=result_store,
         )
 
         dockerfile_request = DockerfileGenerationRequest(
@@ -86,13 +156,42 @@ class ImageGenerationController:
             llm_provider=self.llm_provider,
             build_image_tool=build_image_tool,
             test_container_tool=test_container_tool,
+            ledger=self.token_ledger,
+            history_mode=self.options.history_mode,
+            streaming=self.options.stream,
+            use_templates=self.options.use_templates,
+            normalizer=DockerfileNormalizer(use_cache_mounts=self.options.buildkit) if self.options.normalize_dockerfile else None,
+            candidates=self.options.candidates,
+            # Builds from the context directory share its Dockerfile, so candidates have to take turns
+            max_concurrent_builds=GenerationConstants.MAX_CONCURRENT_CANDIDATE_BUILDS if self.options.in_memory_context else 1,
+            optimize=self.options.optimize,
         )
 
         dockerfile_request = dockerfile_generator.generate_dockerfile(dockerfile_request)
+        if dockerfile_request.file_content is None:
+            raise ValueError("No Dockerfile was generated within the token budget")
         self.file_service.save_dockerfile(dockerfile_request)
+        if dockerfile_request.optimization_report:
+            report_path = self.file_service.save_optimization_report(dockerfile_request)
+            self.logger.info(f"Optimization report saved to {report_path}")
+
+    async def analyze_inputs(self, script_path: str, example_path: str) -> Tuple[ScriptAnalysis, str]:
+        """Analyze the script and the example file concurrently, as neither depends on the other."""
+        analysis, test_command = await asyncio.gather(
+            self.script_analyzer.aanalyze_script(script_path),
+            self.agenerate_test_command(example_path, script_path),
+        )
+        return analysis, test_command
+
+    def generate_test_command(self, example_path: str, script_path: Optional[str] = None) -> str:
+        test_command = self.example_analyzer.analyze_example(example_path, script_path)
+        return self._sanitize_test_command(test_command)
+
+    async def agenerate_test_command(self, example_path: str, script_path: Optional[str] = None) -> str:
+        test_command = await self.example_analyzer.aanalyze_example(example_path, script_path)
+        return self._sanitize_test_command(test_command)
 
-    def generate_test_command(self, example_path: str) -> str:
-        test_command = self.example_analyzer.analyze_example(example_path)
+    def _sanitize_test_command(self, test_command: str) -> str:
         sanitized_command = self.security_service.sanitize_test_command(test_command)
         if not sanitized_command:
             raise ValueError("Invalid test command")
@@ -1,5 +1,6 @@
 from src.constants import VALID_VENDORS, ValidVendorArgument
 from src.core.llm_interface import LLMProvider, GoogleGenerativeAIProvider, OpenAIProvider
+from src.core.replay_provider import ReplayProvider
 from src.services.security_service import SecurityService
 
 
@@ -23,5 +24,7 @@ class LLMProviderController:
             return OpenAIProvider
         elif vendor == VALID_VENDORS[1]:
             return GoogleGenerativeAIProvider
+        elif vendor == VALID_VENDORS[2]:
+            return ReplayProvider
         else:
             raise ValueError(f"Unsupported LLM vendor: {vendor}")
@@ -0,0 +1,57 @@
+import io
+import os
+import copy
+import tarfile
+import logging
+from typing import Dict, List, Optional, Tuple
+
+
+class BuildContextArchive:
+    """
+    In-memory Docker build context assembled from an explicit file manifest.
+
+    The manifest maps names inside the context to files on the host. Those files are read
+    once and their tar entries reused, so every build attempt only adds the new Dockerfile
+    instead of writing it to disk and having docker-py walk and tar the context directory.
+    """
+
+    DOCKERFILE_NAME = "Dockerfile"
+
+    def __init__(self, manifest: Dict[str, str]):
+        self.manifest = manifest
+        self._entries: Optional[List[Tuple[tarfile.TarInfo, bytes]]] = None
+        self.logger = logging.getLogger(__name__)
+
+    def build(self, dockerfile_content: str) -> io.BytesIO:
+        """Return an uncompressed tar of the Dockerfile and the manifest files, ready for `fileobj`."""
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode="w") as tar:
+            dockerfile = dockerfile_content.encode("utf-8")
+            self._add(tar, self._create_tarinfo(self.DOCKERFILE_NAME, len(dockerfile)), dockerfile)
+            for tarinfo, content in self._get_entries():
+                self._add(tar, copy.copy(tarinfo), content)
+        buffer.seek(0)
+        return buffer
+
+    def _get_entries(self) -> List[Tuple[tarfile.TarInfo, bytes]]:
+        if self._entries is None:
+            self._entries = []
+            for name, path in self.manifest.items():
+                with open(path, "rb") as f:
+                    content = f.read()
+                # Keep the permission bits so executable scripts stay executable in the image
+                tarinfo = self._create_tarinfo(name, len(content), os.stat(path).st_mode & 0o777)
+                self._entries.append((tarinfo, content))
+            self.logger.debug(f"Loaded build context files: {list(self.manifest)}")
+        return self._entries
+
+    @staticmethod
+    def _create_tarinfo(name: str, size: int, mode: int = 0o644) -> tarfile.TarInfo:
+        tarinfo = tarfile.TarInfo(name)
+        tarinfo.size = size
+        tarinfo.mode = mode
+        return tarinfo
+
+    @staticmethod
+    def _add(tar: tarfile.TarFile, tarinfo: tarfile.TarInfo, content: bytes):
+        tar.addfile(tarinfo, io.BytesIO(content))
@@ -0,0 +1,43 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from src.constants import DockerBackendName, DockerConstants, DOCKER_BACKENDS
+from src.core.docker_client_pool import DockerClientPool
+
+
+class DockerBackend(ABC):
+    """
+    Where DockerManager gets its Docker client from.
+
+    The client is a docker-py `DockerClient`, or an object offering the part of its API that
+    DockerManager and the warm container pool use.
+    """
+
+    # Whether builds may run `docker build` with BuildKit, which needs the docker CLI and a daemon
+    supports_buildkit = True
+
+    @abstractmethod
+    def get_client(self):
+        pass
+
+
+class DaemonDockerBackend(DockerBackend):
+    """The Docker daemon configured in the environment, through the shared client of DockerClientPool."""
+
+    def __init__(self, client_pool_size: Optional[int] = None):
+        self.client_pool_size = client_pool_size
+
+    def get_client(self):
+        return DockerClientPool.get_client(self.client_pool_size)
+
+
+def get_docker_backend(name: DockerBackendName = DockerConstants.DEFAULT_BACKEND,
+                       client_pool_size: Optional[int] = None) -> DockerBackend:
+    """Create the backend of the given name, the fake one configured from `FAKE_DOCKER_CONFIG`."""
+    if name == DOCKER_BACKENDS[0]:
+        return DaemonDockerBackend(client_pool_size)
+    elif name == DOCKER_BACKENDS[1]:
+        from src.core.fake_docker_backend import FakeDockerBackend
+        return FakeDockerBackend.from_env()
+    else:
+        raise ValueError(f"Unsupported Docker backend: {name}")
@@ -0,0 +1,85 @@
+import os
+import time
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+
+import docker
+from docker.errors import DockerException
+from requests.exceptions import RequestException
+
+from src.constants import DockerConstants
+
+
+logger = logging.getLogger(__name__)
+
+
+class DockerClientPool:
+    """
+    Process-wide pool of Docker clients.
+
+    Every client holds its own pool of daemon connections, so Docker managers borrow a shared,
+    thread-safe client keyed by daemon and connection pool size instead of creating one each.
+    A client that has not been checked for a while is pinged before it is handed out, and
+    replaced if the daemon no longer answers it, e.g. after a Docker restart.
+    """
+
+    _clients: Dict[Tuple[Optional[str], int], Tuple[docker.DockerClient, float]] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_client(cls, max_pool_size: Optional[int] = None) -> docker.DockerClient:
+        """
+        Return the shared client for the daemon configured in the environment, creating it on first use.
+
+        :param max_pool_size: Connections the client keeps open, `DOCKER_CLIENT_POOL_SIZE` by default
+        """
+        max_pool_size = max_pool_size or cls.get_default_pool_size()
+        key = (os.getenv("DOCKER_HOST"), max_pool_size)
+
+        with cls._lock:
+            client, checked_at = cls._clients.get(key, (None, 0.0))
+            now = time.monotonic()
+            if client is not None and now - checked_at >= DockerConstants.CLIENT_HEALTH_CHECK_INTERVAL_SECONDS:
+                if cls._is_healthy(client):
+                    cls._clients[key] = (client, now)
+                else:
+                    logger.warning("Shared Docker client is unhealthy, reconnecting")
+                    cls._close(client)
+                    client = None
+
+            if client is None:
+                logger.debug(f"Creating shared Docker client with {max_pool_size} pooled connections")
+                client = docker.from_env(max_pool_size=max_pool_size)
+                cls._clients[key] = (client, now)
+            return client
+
+    @staticmethod
+    def get_default_pool_size() -> int:
+        try:
+            return int(os.getenv(DockerConstants.CLIENT_POOL_SIZE_ENV_VAR, DockerConstants.DEFAULT_CLIENT_POOL_SIZE))
+        except ValueError:
+            logger.warning(f"Invalid {DockerConstants.CLIENT_POOL_SIZE_ENV_VAR}, using the default")
+            return DockerConstants.DEFAULT_CLIENT_POOL_SIZE
+
+    @classmethod
+    def clear(cls):
+        """Close and drop every shared client."""
+        with cls._lock:
+            for client, _ in cls._clients.values():
+                cls._close(client)
+            cls._clients.clear()
+
+    @staticmethod
+    def _is_healthy(client: docker.DockerClient) -> bool:
+        try:
+            return bool(client.ping())
+        except (DockerException, RequestException):
+            return False
+
+    @staticmethod
+    def _close(client: docker.DockerClient):
+        try:
+            client.close()
+        except Exception as e:
+            logger.debug(f"Failed to close Docker client: {e}")
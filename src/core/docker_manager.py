@@ -1,55 +1,366 @@
-import docker
+import os
+import re
+import time
 import logging
+import tempfile
+import subprocess
+from collections import deque
+from datetime import datetime, timezone
+from typing import BinaryIO, Callable, Deque, Dict, List, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from docker.errors import DockerException, ImageNotFound
+from docker.utils import parse_repository_tag
+from requests.exceptions import ConnectionError as RequestsConnectionError, ReadTimeout, RequestException
+
+from src.constants import DockerConstants, GCConstants
+from src.core.docker_backend import DaemonDockerBackend, DockerBackend
+from src.core.log_capture import LogCapture
+from src.core.warm_container_pool import WarmContainerPool
+from src.models.build_result import BuildResult, BuildStep
+from src.models.container_run import ContainerLimits, ContainerRunResult
+from src.models.garbage_collection import GCItem, GCPolicy
 
 
 class DockerManager:
-    def __init__(self):
-        self.client = docker.from_env()
+    # Progress lines of the classic builder's JSON stream
+    STEP_PATTERN = re.compile(r'^Step (\d+)/\d+ : (.*)$')
+    BUILT_PATTERN = re.compile(r'^Successfully built (\w+)$')
+    CACHE_HIT_LINE = "---> Using cache"
+    # Lines of BuildKit's plain progress output, e.g. "#5 [2/3] RUN pip install requests", "#5 DONE 3.2s"
+    BUILDKIT_STEP_PATTERN = re.compile(r'^#(\d+) \[(?:[^\]]* )?(\d+)/\d+\] (.*)$')
+    BUILDKIT_STATUS_PATTERN = re.compile(r'^#(\d+) (CACHED|DONE (\d+(?:\.\d+)?)s|ERROR: .*)$')
+    BUILDKIT_LOG_PATTERN = re.compile(r'^#(\d+) \d+\.\d+ (.*)$')
+
+    def __init__(self, use_buildkit: bool = False, cache_from: Optional[List[str]] = None,
+                 limits: Optional[ContainerLimits] = None, warm_containers: bool = False,
+                 client_pool_size: Optional[int] = None, backend: Optional[DockerBackend] = None):
+        """
+        :param backend: Where the Docker client comes from, the daemon configured in the environment by default
+        """
+        self.backend = backend or DaemonDockerBackend(client_pool_size)
+        self.limits = limits or ContainerLimits()
+        self.warm_containers = warm_containers
+        self._warm_container_pool: Optional[WarmContainerPool] = None
+        self._cold_only_tags = set()
+        self._running_containers: Dict[object, ContainerRunResult] = {}
+        self._prefetch_executor: Optional[ThreadPoolExecutor] = None
+        self._prefetches: Dict[str, Future] = {}
         self.logger = logging.getLogger(__name__)
-        self.run_history = []
+        self.use_buildkit = use_buildkit and self.backend.supports_buildkit
+        if use_buildkit and not self.use_buildkit:
+            self.logger.warning(f"{type(self.backend).__name__} cannot build with BuildKit, using the classic builder")
+        self.cache_from = cache_from or []
+        # Bounded, so a long-lived or batch process does not keep every test result
+        self.run_history: Deque[ContainerRunResult] = deque(maxlen=DockerConstants.RUN_HISTORY_SIZE)
+
+    @property
+    def client(self):
+        """The backend's Docker client, connected on first use so invalid inputs fail before touching the daemon."""
+        return self.backend.get_client()
+
+    def prefetch_image(self, image: str) -> Future:
+        """
+        Start pulling an image in the background, e.g. the predicted base image while the LLM is generating.
+
+        Failures are only logged, as the build pulls whatever it still needs.
+        """
+        future = self._prefetches.get(image)
+        # A pull cancelled by `close` never ran, so it is started again
+        if future is None or future.cancelled():
+            if self._prefetch_executor is None:
+                self._prefetch_executor = ThreadPoolExecutor(
+                    max_workers=DockerConstants.PREFETCH_MAX_WORKERS, thread_name_prefix="image-prefetch"
+                )
+            self._prefetches[image] = self._prefetch_executor.submit(self._pull_image, image)
+        return self._prefetches[image]
 
-    def build_image(self, dockerfile_path: str, tag: str) -> bool:
+    def _pull_image(self, image: str) -> bool:
         try:
-            self.client.images.build(
-                path=str(dockerfile_path),
-                tag=tag,
-                rm=True
-            )
-            self.logger.info(f"Docker image built successfully with tag: {tag}")
+            self.client.images.get(image)
+            self.logger.debug(f"Image already present, not prefetching: {image}")
+            return False
+        except ImageNotFound:
+            pass
+        except DockerException as e:
+            self.logger.warning(f"Failed to inspect image {image}: {e}")
+            return False
+
+        start = time.monotonic()
+        repository, tag = parse_repository_tag(image)
+        try:
+            self.client.images.pull(repository, tag=tag or "latest")
+            self.logger.info(f"Prefetched image {image} in {round(time.monotonic() - start, 3)}s")
             return True
-        except Exception as e:
-            self.logger.error(f"Error building Docker image: {e}")
-            raise
+        except DockerException as e:
+            self.logger.warning(f"Failed to prefetch image {image}: {e}")
+            return False
+
+    def build_image(
+            self,
+            dockerfile_path: Optional[str],
+            tag: str,
+            on_step: Optional[Callable[[BuildStep], None]] = None,
+            fileobj: Optional[BinaryIO] = None,
+    ) -> BuildResult:
+        """
+        Build the image, streaming the build log step by step.
+
+        :param dockerfile_path: The build context directory, unused when `fileobj` is given
+        :param tag: The image tag
+        :param on_step: Called with every step as soon as it completes
+        :param fileobj: A tar of the whole build context, sent as is instead of the directory
+        :return: The build result, with per-step timings and cache hits, or the failing step's log tail
+        """
+        start = time.monotonic()
+        result = BuildResult(tag=tag, success=False)
+        self._release_tag(tag)
+        if self.use_buildkit:
+            self._build_with_buildkit(result, dockerfile_path, on_step, fileobj)
+        else:
+            self._build_with_docker_py(result, dockerfile_path, on_step, fileobj)
+        result.success = result.error is None
+        result.duration_seconds = round(time.monotonic() - start, 3)
+
+        if result.error:
+            result.error_step = result.error_step or (result.steps[-1] if result.steps else None)
+            if result.error_step:
+                result.error_log_tail = result.error_step.log[-DockerConstants.BUILD_LOG_TAIL_LINES:]
+            self.logger.error(f"Error building Docker image: {result.error}")
+            return result
+
+        result.size = self.get_image_size(result.image_id or tag)
+        self.logger.info(
+            f"Docker image built successfully with tag: {tag} in {result.duration_seconds}s "
+            f"({result.cache_hits} cached steps, {result.cache_misses} built)"
+        )
+        return result
+
+    def tag_image(self, image_id: str, tag: str) -> bool:
+        """Point the tag at an existing image, e.g. one built earlier from the same Dockerfile."""
+        repository, image_tag = parse_repository_tag(tag)
+        try:
+            image = self.client.images.get(image_id)
+            self._release_tag(tag)
+            image.tag(repository, tag=image_tag)
+        except ImageNotFound:
+            return False
+        except DockerException as e:
+            self.logger.warning(f"Failed to tag image {image_id} as {tag}: {e}")
+            return False
+        self.logger.info(f"Tagged existing image {image_id} as {tag}")
+        return True
+
+    def _release_tag(self, tag: str):
+        """Forget everything tied to the image a tag points to, as it is about to be replaced."""
+        # Warm containers are replaced on their next use if the tag ends up on another image
+        self._cold_only_tags.discard(tag)
+
+    def _build_with_docker_py(self, result: BuildResult, dockerfile_path: Optional[str],
+                              on_step: Optional[Callable[[BuildStep], None]], fileobj: Optional[BinaryIO]):
+        """Build with the classic builder, parsing the JSON progress stream of the Docker API."""
+        step_started = time.monotonic()
+        try:
+            context = {"fileobj": fileobj, "custom_context": True} if fileobj else {"path": str(dockerfile_path)}
+            cache_from = {"cache_from": self.cache_from} if self.cache_from else {}
+            stream = self.client.api.build(**context, **cache_from, tag=result.tag, rm=True, decode=True)
+            for chunk in stream:
+                if "error" in chunk:
+                    result.error = chunk.get("errorDetail", {}).get("message") or chunk["error"]
+                    break
+                if "aux" in chunk:
+                    result.image_id = chunk["aux"].get("ID", result.image_id)
+                    continue
+
+                for line in chunk.get("stream", "").splitlines():
+                    line = line.rstrip()
+                    step_match = self.STEP_PATTERN.match(line)
+                    built_match = self.BUILT_PATTERN.match(line)
+                    if step_match:
+                        if result.steps:
+                            self._finish_step(result.steps[-1], step_started, on_step)
+                        step_started = time.monotonic()
+                        result.steps.append(BuildStep(number=int(step_match.group(1)), instruction=step_match.group(2)))
+                    elif built_match:
+                        result.image_id = result.image_id or built_match.group(1)
+                    elif line.strip() and result.steps:
+                        result.steps[-1].cached = result.steps[-1].cached or line.strip() == self.CACHE_HIT_LINE
+                        result.steps[-1].log.append(line)
+        except (DockerException, RequestException) as e:
+            # The daemon may also drop the connection mid-build, which docker-py does not wrap
+            result.error = str(e)
+
+        if result.steps:
+            self._finish_step(result.steps[-1], step_started, None if result.error else on_step)
+
+    def _build_with_buildkit(self, result: BuildResult, dockerfile_path: Optional[str],
+                             on_step: Optional[Callable[[BuildStep], None]], fileobj: Optional[BinaryIO]):
+        """
+        Build with BuildKit through the Docker CLI, parsing its plain progress output.
+
+        docker-py only drives the classic builder, while cache mounts need BuildKit.
+        """
+        vertices: Dict[int, BuildStep] = {}
+        with tempfile.TemporaryDirectory() as directory:
+            iidfile = os.path.join(directory, "image_id")
+            command = ["docker", "build", "--progress=plain", "--tag", result.tag, "--iidfile", iidfile,
+                       # Embed the cache metadata so the image can serve as a cache source for later builds
+                       "--build-arg", "BUILDKIT_INLINE_CACHE=1"]
+            for image in self.cache_from:
+                command += ["--cache-from", image]
+            command.append("-" if fileobj else str(dockerfile_path))
+
+            try:
+                process = subprocess.Popen(
+                    command,
+                    stdin=subprocess.PIPE if fileobj else subprocess.DEVNULL,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    env={**os.environ, "DOCKER_BUILDKIT": "1"},
+                )
+            except OSError as e:
+                result.error = f"Failed to run docker build: {e}"
+                return
+
+            if fileobj:
+                process.stdin.write(fileobj.read())
+                process.stdin.close()
+            for raw_line in process.stdout:
+                self._parse_buildkit_line(raw_line.decode("utf-8", errors="replace").rstrip(), result, vertices, on_step)
+            return_code = process.wait()
+
+            if return_code != 0:
+                result.error = result.error or f"docker build exited with code {return_code}"
+            elif os.path.exists(iidfile):
+                with open(iidfile, "r") as f:
+                    result.image_id = f.read().strip()
+
+    def _parse_buildkit_line(self, line: str, result: BuildResult, vertices: Dict[int, BuildStep],
+                             on_step: Optional[Callable[[BuildStep], None]]):
+        step_match = self.BUILDKIT_STEP_PATTERN.match(line)
+        if step_match:
+            # Internal vertices such as loading the context have no step number and are not tracked
+            if int(step_match.group(1)) in vertices:
+                # BuildKit repeats the header when the output of several vertices interleaves
+                return
+            step = BuildStep(number=int(step_match.group(2)), instruction=step_match.group(3))
+            vertices[int(step_match.group(1))] = step
+            result.steps.append(step)
+            return
+
+        status_match = self.BUILDKIT_STATUS_PATTERN.match(line)
+        if status_match:
+            step = vertices.get(int(status_match.group(1)))
+            status = status_match.group(2)
+            if step is None:
+                return
+            if status.startswith("ERROR"):
+                result.error_step = step
+                result.error = status[len("ERROR: "):]
+            else:
+                step.cached = status == "CACHED"
+                step.duration_seconds = float(status_match.group(3) or 0.0)
+                self._report_step(step, on_step)
+            return
+
+        log_match = self.BUILDKIT_LOG_PATTERN.match(line)
+        if log_match and int(log_match.group(1)) in vertices:
+            vertices[int(log_match.group(1))].log.append(log_match.group(2))
+        elif line.startswith("ERROR: "):
+            # The summary after a failure, e.g. "ERROR: failed to solve: process ... exit code: 1"
+            result.error = line[len("ERROR: "):]
+
+    def _finish_step(self, step: BuildStep, started: float, on_step: Optional[Callable[[BuildStep], None]]):
+        step.duration_seconds = round(time.monotonic() - started, 3)
+        self._report_step(step, on_step)
+
+    def _report_step(self, step: BuildStep, on_step: Optional[Callable[[BuildStep], None]]):
+        self.logger.debug(f"Step {step.number} took {step.duration_seconds}s{' (cached)' if step.cached else ''}: {step.instruction}")
+        if on_step:
+            on_step(step)
+
+    def image_exists(self, image: str) -> bool:
+        """Whether the image is present, assumed so when the daemon cannot be asked."""
+        try:
+            self.client.images.get(image)
+            return True
+        except ImageNotFound:
+            return False
+        except (DockerException, RequestException) as e:
+            self.logger.warning(f"Failed to inspect image {image}: {e}")
+            return True
+
+    def get_image_size(self, image: str) -> Optional[int]:
+        """Return the size of the image in bytes, or None if it cannot be inspected."""
+        try:
+            return self.client.images.get(image).attrs.get("Size")
+        except (DockerException, RequestException) as e:
+            self.logger.warning(f"Failed to inspect image {image}: {e}")
+            return None
 
     def test_container(self, tag: str, test_command: str) -> bool:
+        """
+        Run the test command in a container from the image, within the configured limits.
+
+        The outcome, including timeouts, is appended to `run_history`.
+
+        :return: True if the command exited successfully within the timeout
+        """
+        return bool(self.run_test(tag, test_command))
+
+    def run_test(self, tag: str, test_command: str) -> ContainerRunResult:
+        """Like `test_container`, but return the outcome, which is safe when tests run concurrently."""
         self.logger.info(f"Test command: {test_command}")
+        run = ContainerRunResult(tag=tag, test_command=test_command)
+
+        if self.warm_containers and tag not in self._cold_only_tags:
+            try:
+                self.warm_container_pool.run(run)
+            except DockerException as e:
+                self.logger.warning(f"Cannot keep a warm container for {tag}, starting a new one per test: {e}")
+                self._cold_only_tags.add(tag)
+                run = ContainerRunResult(tag=tag, test_command=test_command)
+                self._test_in_new_container(run)
+        else:
+            self._test_in_new_container(run)
+
+        self.logger.info(f"Container logs: {run.logs}")
+        self.logger.debug(f"Container exited with code: {run.exit_code}")
+        self.run_history.append(run)
+        return run
+
+    def _test_in_new_container(self, run: ContainerRunResult):
         container = None
+        start = time.monotonic()
 
         try:
             # Run container and capture output
             container = self.client.containers.run(
-                tag,
-                command=test_command,
+                run.tag,
+                command=run.test_command,
                 detach=True,
                 stdout=True,  # Capture stdout
-                stderr=True  # Capture stderr
+                stderr=True,  # Capture stderr
+                mem_limit=self.limits.mem_limit,
+                nano_cpus=self.limits.nano_cpus,
+                pids_limit=self.limits.pids_limit,
             )
+            self._running_containers[container] = run
 
-            # Wait for the container to finish
-            result = container.wait()
-            exit_code = result["StatusCode"]
-            logs = container.logs().decode("utf-8")
-            self.logger.info(f"Container logs: {logs}")
-            self.logger.debug(f"Container exited with code: {exit_code}")
-
-            self.run_history.append({
-                "tag": tag,
-                "test_command": test_command,
-                "exit_code": exit_code,
-                "logs": logs
-            })
+            # Wait for the container to finish, killing it once the timeout is reached
+            try:
+                result = container.wait(timeout=self.limits.timeout_seconds)
+                run.exit_code = result["StatusCode"]
+            # docker-py reports the wait timeout as a read timeout, or as a connection error over the unix socket
+            except (ReadTimeout, RequestsConnectionError):
+                run.timed_out = True
+                self.logger.warning(f"Container test timed out after {self.limits.timeout_seconds}s, killing it")
+                self._kill(container)
 
-            return exit_code == 0
+            run.duration_seconds = round(time.monotonic() - start, 3)
+            if run.exit_code == DockerConstants.OOM_EXIT_CODE:
+                container.reload()
+                run.oom_killed = container.attrs.get("State", {}).get("OOMKilled", False)
+            LogCapture.capture_run_logs(run, container.logs(stream=True))
 
         except Exception as e:
             self.logger.error(f"Error testing container: {e}")
@@ -57,8 +368,155 @@ class DockerManager:
 
         finally:
             # Ensure the container is removed, even if an exception occurs
+            self._running_containers.pop(container, None)
             try:
                 container.remove(force=True)
             except Exception as cleanup_error:
                 self.logger.warning(f"Failed to remove container: {cleanup_error}")
 
+    @property
+    def captured_log_bytes(self) -> int:
+        """Bytes of container output currently held in `run_history`."""
+        return sum(run.captured_log_bytes for run in self.run_history)
+
+    @property
+    def warm_container_pool(self) -> WarmContainerPool:
+        if self._warm_container_pool is None:
+            self._warm_container_pool = WarmContainerPool(self.client, self.limits)
+        return self._warm_container_pool
+
+    def collect_garbage(self, policy: GCPolicy, now: Optional[float] = None) -> List[GCItem]:
+        """
+        Remove leftover test containers, generated images and dangling layers according to the policy.
+
+        Generated images are kept most recently used first, where use is the latest build or tag,
+        and removed once older than `max_age_days` or beyond `max_images` or `max_image_bytes`.
+        Sizes are those reported by Docker, so layers shared between images count for each.
+
+        :return: What was removed, or only would be with `policy.dry_run`
+        """
+        now = now or time.time()
+        items = self._collect_containers(policy, now) + self._collect_images(policy, now)
+        items += self._collect_dangling_images(policy, now)
+        return items
+
+    def _collect_containers(self, policy: GCPolicy, now: float) -> List[GCItem]:
+        items = []
+        for container in self.client.containers.list(all=True):
+            image = container.attrs.get("Config", {}).get("Image", "")
+            if not image.startswith(f"{DockerConstants.IMAGE_REPOSITORY}:"):
+                continue
+            created = self._parse_timestamp(container.attrs.get("Created"))
+            age = now - created
+            if container.status == "running":
+                # Warm containers run until their process removes them, unless it died
+                if not self._is_expired(age, policy):
+                    continue
+                reason = f"running for {age / 86400:.1f} days"
+            else:
+                # A run in progress may not have read the logs of its exited test container yet
+                finished = self._parse_timestamp(container.attrs.get("State", {}).get("FinishedAt"))
+                if now - max(created, finished) < GCConstants.MIN_AGE_SECONDS:
+                    continue
+                reason = f"left {container.status}"
+            item = GCItem(kind="container", name=f"{container.name} ({image})", reason=reason)
+            items.append(self._remove_item(item, policy, lambda: container.remove(force=True)))
+        return items
+
+    def _collect_images(self, policy: GCPolicy, now: float) -> List[GCItem]:
+        images = []
+        for image in self.client.images.list(name=DockerConstants.IMAGE_REPOSITORY):
+            metadata = image.attrs.get("Metadata") or {}
+            last_used = max(self._parse_timestamp(image.attrs.get("Created")),
+                            self._parse_timestamp(metadata.get("LastTagTime")))
+            images.append((last_used, image))
+        images.sort(key=lambda entry: entry[0], reverse=True)
+
+        items = []
+        kept = 0
+        kept_bytes = 0
+        for last_used, image in images:
+            size = image.attrs.get("Size") or 0
+            reason = None
+            if self._is_expired(now - last_used, policy):
+                reason = f"unused for {(now - last_used) / 86400:.1f} days"
+            elif policy.max_images is not None and kept >= policy.max_images:
+                reason = f"beyond the {policy.max_images} most recently used images"
+            elif policy.max_image_bytes is not None and kept_bytes + size > policy.max_image_bytes:
+                reason = f"beyond the {policy.max_image_bytes / 1_000_000:.0f} MB image budget"
+            if reason is None:
+                kept += 1
+                kept_bytes += size
+                continue
+
+            tags = [tag for tag in image.tags if tag.startswith(f"{DockerConstants.IMAGE_REPOSITORY}:")]
+            item = GCItem(kind="image", name=", ".join(tags), size=size, reason=reason)
+            items.append(self._remove_item(item, policy, lambda tags=tags: self._untag(tags)))
+        return items
+
+    def _untag(self, tags: List[str]):
+        # Images also tagged outside the repository stay in place, the rest are deleted with their last tag
+        for tag in tags:
+            self.client.images.remove(tag)
+
+    def _collect_dangling_images(self, policy: GCPolicy, now: float) -> List[GCItem]:
+        items = []
+        for image in self.client.images.list(filters={"dangling": True}):
+            age = now - self._parse_timestamp(image.attrs.get("Created"))
+            if age < GCConstants.MIN_AGE_SECONDS:
+                continue
+            item = GCItem(kind="dangling image", name=image.short_id, size=image.attrs.get("Size"),
+                          reason="left behind by a replaced or failed build")
+            items.append(self._remove_item(item, policy, lambda image=image: self.client.images.remove(image.id)))
+        return items
+
+    def _remove_item(self, item: GCItem, policy: GCPolicy, remove: Callable[[], object]) -> GCItem:
+        if policy.dry_run:
+            return item
+        try:
+            remove()
+            self.logger.debug(f"Removed {item.kind} {item.name}: {item.reason}")
+        except DockerException as e:
+            # e.g. an image still used by a container
+            item.error = str(e)
+            self.logger.warning(f"Failed to remove {item.kind} {item.name}: {e}")
+        return item
+
+    @staticmethod
+    def _is_expired(age_seconds: float, policy: GCPolicy) -> bool:
+        return policy.max_age_days is not None and age_seconds > policy.max_age_days * 86400
+
+    @staticmethod
+    def _parse_timestamp(value: Optional[str]) -> float:
+        """Parse Docker's RFC 3339 timestamps, whose nanoseconds `datetime` cannot hold, to epoch seconds."""
+        if not value:
+            return 0.0
+        try:
+            return datetime.strptime(value[:19], "%Y-%m-%dT%H:%M:%S").replace(tzinfo=timezone.utc).timestamp()
+        except ValueError:
+            return 0.0
+
+    def close(self):
+        """Tear down the warm containers and background pulls of this manager."""
+        if self._warm_container_pool is not None:
+            self._warm_container_pool.close()
+            self._warm_container_pool = None
+        if self._prefetch_executor is not None:
+            self._prefetch_executor.shutdown(wait=False, cancel_futures=True)
+            self._prefetch_executor = None
+        self._prefetches.clear()
+
+    def cancel_running(self):
+        """Kill every test container still running, e.g. when the run is aborted from another thread."""
+        for container, run in list(self._running_containers.items()):
+            run.cancelled = True
+            self._kill(container)
+        if self._warm_container_pool is not None:
+            self._warm_container_pool.cancel()
+
+    def _kill(self, container):
+        try:
+            container.kill()
+        except DockerException as e:
+            # The container may have exited in the meantime
+            self.logger.debug(f"Failed to kill container: {e}")
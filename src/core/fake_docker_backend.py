@@ -0,0 +1,536 @@
+import os
+import json
+import math
+import time
+import random
+import hashlib
+import logging
+import tarfile
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from docker.errors import APIError, ImageNotFound, NotFound
+from docker.utils import parse_repository_tag
+from requests.exceptions import ReadTimeout
+
+from src.constants import DockerConstants, FakeDockerConstants
+from src.core.docker_backend import DockerBackend
+from src.models.dockerfile import DockerfileInstruction
+from src.models.fake_docker import FakeDockerConfig, FakeTiming
+from src.services.dockerfile_parser import DockerfileParser
+
+
+logger = logging.getLogger(__name__)
+
+# A test outcome: its duration, its exit code (None if it hangs until killed) and its output
+TestOutcome = Tuple[float, Optional[int], str]
+
+
+class FakeDockerBackend(DockerBackend):
+    """
+    In-process stand-in for a Docker daemon, to load-test and profile the pipeline without Docker.
+
+    Nothing is executed: builds walk the Dockerfile step by step, pulling missing base images
+    and reusing layers whose instruction and parent were built before, and tests run for a
+    drawn duration. Timings and failures are drawn from the config, and the client speaks
+    enough of docker-py's API that DockerManager runs its real code paths against it.
+    """
+
+    supports_buildkit = False
+
+    def __init__(self, config: Optional[FakeDockerConfig] = None):
+        self.config = config or FakeDockerConfig()
+        self.client = FakeDockerClient(self.config)
+
+    @classmethod
+    def from_env(cls) -> "FakeDockerBackend":
+        """Create the backend from the JSON config file named by `FAKE_DOCKER_CONFIG`, the defaults if unset."""
+        path = os.getenv(FakeDockerConstants.CONFIG_PATH_ENV_VAR)
+        if not path:
+            return cls()
+        with open(path, "r") as f:
+            config = FakeDockerConfig(**json.load(f))
+        logger.info(f"Simulating Docker with the config in {path}")
+        return cls(config)
+
+    def get_client(self):
+        return self.client
+
+
+class FakeDockerClient:
+    """The simulated daemon, with the `images`, `containers` and low-level `api` parts of docker-py's client."""
+
+    def __init__(self, config: FakeDockerConfig):
+        self.config = config
+        self._random = random.Random(config.seed)
+        self.lock = threading.RLock()
+        self.images = FakeImageCollection(self)
+        self.containers = FakeContainerCollection(self)
+        self.api = FakeAPIClient(self)
+        for image in config.preloaded_images:
+            self.images.add(self.new_id(), self.get_base_image_size(image), {"Cmd": ["sh"]}, tag=image)
+
+    def ping(self) -> bool:
+        return True
+
+    def close(self):
+        pass
+
+    def pull(self, name: str):
+        """Simulate pulling a base image, raising APIError on a drawn failure."""
+        self.sleep(self.draw(self.config.pull))
+        if self.chance(self.config.pull_failure_rate):
+            raise APIError(f"pull access denied for {name}, repository does not exist or may require 'docker login'")
+        self.images.add(self.new_id(), self.get_base_image_size(name), {"Cmd": ["sh"]}, tag=name)
+
+    def draw_test(self) -> TestOutcome:
+        if self.chance(self.config.test_timeout_rate):
+            return math.inf, None, ""
+        duration = self.draw(self.config.test)
+        if self.chance(self.config.test_failure_rate):
+            return duration, 1, self.config.test_failure_output
+        return duration, 0, self.config.test_output
+
+    def get_base_image_size(self, name: str) -> int:
+        return self.config.base_image_bytes.get(name, self.config.default_base_image_bytes)
+
+    def draw(self, timing: FakeTiming) -> float:
+        with self.lock:
+            return max(0.0, self._random.uniform(timing.seconds - timing.jitter, timing.seconds + timing.jitter))
+
+    def chance(self, rate: float) -> bool:
+        with self.lock:
+            return self._random.random() < rate
+
+    def choice(self, items: list):
+        with self.lock:
+            return self._random.choice(items)
+
+    def new_id(self) -> str:
+        with self.lock:
+            return f"sha256:{self._random.getrandbits(256):064x}"
+
+    def sleep(self, seconds: float, interrupt: Optional[threading.Event] = None) -> bool:
+        """
+        Sleep for the simulated duration, scaled by `time_scale`, forever if it is infinite.
+
+        :return: True if `interrupt` was set before the duration passed
+        """
+        timeout = None if math.isinf(seconds) else seconds * self.config.time_scale
+        if interrupt is not None:
+            return interrupt.wait(timeout)
+        if timeout is None:
+            raise ValueError("Cannot sleep forever without an interrupt")
+        time.sleep(timeout)
+        return False
+
+    @staticmethod
+    def now() -> str:
+        return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+class FakeImage:
+    def __init__(self, client: FakeDockerClient, image_id: str, size: int, config: dict):
+        self.client = client
+        self.id = image_id
+        self.tags: List[str] = []
+        created = client.now()
+        self.attrs = {
+            "Id": image_id,
+            "RepoTags": self.tags,
+            "Size": size,
+            "Created": created,
+            "Metadata": {"LastTagTime": created},
+            "Config": config,
+        }
+
+    @property
+    def short_id(self) -> str:
+        return self.id[:19]
+
+    def tag(self, repository: str, tag: Optional[str] = None, **kwargs) -> bool:
+        self.client.images.add_tag(self, f"{repository}:{tag or 'latest'}")
+        return True
+
+
+class FakeImageCollection:
+    def __init__(self, client: FakeDockerClient):
+        self.client = client
+        self._images: Dict[str, FakeImage] = {}
+
+    def get(self, name: str) -> FakeImage:
+        with self.client.lock:
+            image = self._find(name)
+        if image is None:
+            raise ImageNotFound(f"No such image: {name}")
+        return image
+
+    def list(self, name: Optional[str] = None, filters: Optional[dict] = None, **kwargs) -> List[FakeImage]:
+        with self.client.lock:
+            images = list(self._images.values())
+        if name:
+            repository, tag = parse_repository_tag(name)
+            images = [image for image in images if any(
+                parse_repository_tag(image_tag)[0] == repository and (tag is None or image_tag == f"{repository}:{tag}")
+                for image_tag in image.tags
+            )]
+        if filters and filters.get("dangling"):
+            images = [image for image in images if not image.tags]
+        return images
+
+    def pull(self, repository: str, tag: Optional[str] = None, **kwargs) -> FakeImage:
+        name = f"{repository}:{tag or 'latest'}"
+        self.client.pull(name)
+        return self.get(name)
+
+    def remove(self, image: str, force: bool = False, **kwargs):
+        """Remove a tag, deleting the image with its last one, or delete an image by ID."""
+        with self.client.lock:
+            tag = self._normalize(image)
+            found = self._find(image)
+            if found is None:
+                raise ImageNotFound(f"No such image: {image}")
+            if tag in found.tags:
+                found.tags.remove(tag)
+                if found.tags:
+                    return
+            del self._images[found.id]
+
+    def add(self, image_id: str, size: int, config: dict, tag: Optional[str] = None) -> FakeImage:
+        """Store an image, or reuse the one with the same ID, and point the tag at it."""
+        with self.client.lock:
+            image = self._images.get(image_id)
+            if image is None:
+                image = self._images[image_id] = FakeImage(self.client, image_id, size, config)
+            if tag:
+                self.add_tag(image, self._normalize(tag))
+            return image
+
+    def add_tag(self, image: FakeImage, tag: str):
+        # A tag points at a single image, which becomes dangling once it lost its last tag
+        with self.client.lock:
+            for other in self._images.values():
+                if tag in other.tags:
+                    other.tags.remove(tag)
+            image.tags.append(tag)
+            image.attrs["Metadata"]["LastTagTime"] = self.client.now()
+
+    def _find(self, name: str) -> Optional[FakeImage]:
+        if name.startswith("sha256:"):
+            return next((image for image_id, image in self._images.items() if image_id.startswith(name)), None)
+        tag = self._normalize(name)
+        return next((image for image in self._images.values() if tag in image.tags), None)
+
+    @staticmethod
+    def _normalize(name: str) -> str:
+        repository, tag = parse_repository_tag(name)
+        return f"{repository}:{tag or 'latest'}"
+
+
+class FakeContainer:
+    def __init__(self, client: FakeDockerClient, name: str, image: str, outcome: Optional[TestOutcome]):
+        self.client = client
+        self.id = client.new_id()[len("sha256:"):]
+        self.name = name
+        # None for an idle container, which runs until it is killed
+        self.outcome = outcome
+        self.stopped = threading.Event()
+        self._output = b""
+        self.attrs = {
+            "Id": self.id,
+            "Name": f"/{name}",
+            "Created": client.now(),
+            "Config": {"Image": image},
+            "State": {"Status": "running", "ExitCode": 0, "OOMKilled": False},
+        }
+
+    @property
+    def status(self) -> str:
+        return self.attrs["State"]["Status"]
+
+    def wait(self, timeout: Optional[float] = None, **kwargs) -> dict:
+        """Wait for the drawn duration, with `timeout` in simulated seconds like every other duration."""
+        duration, exit_code, output = self.outcome or (math.inf, None, "")
+        limit = duration if timeout is None else min(duration, timeout)
+        if not self.client.sleep(limit, self.stopped):
+            if duration > limit:
+                raise ReadTimeout(f"Container {self.name} did not exit within {timeout}s")
+            self._exit(exit_code, output)
+        return {"StatusCode": self.attrs["State"]["ExitCode"], "Error": None}
+
+    def logs(self, stream: bool = False, **kwargs):
+        if stream:
+            return iter([self._output] if self._output else [])
+        return self._output
+
+    def reload(self):
+        pass
+
+    def kill(self, **kwargs):
+        if self.status != "running":
+            raise APIError(f"Container {self.id} is not running")
+        self._exit(FakeDockerConstants.KILLED_EXIT_CODE, "")
+
+    def remove(self, force: bool = False, **kwargs):
+        if self.status == "running":
+            if not force:
+                raise APIError(f"You cannot remove a running container {self.id}. Stop the container before attempting removal")
+            self.kill()
+        self.client.containers.discard(self)
+
+    def _exit(self, exit_code: int, output: str):
+        with self.client.lock:
+            if self.status != "running":
+                return
+            self._output = output.encode("utf-8")
+            self.attrs["State"].update(Status="exited", ExitCode=exit_code, FinishedAt=self.client.now())
+        self.stopped.set()
+
+
+class FakeContainerCollection:
+    def __init__(self, client: FakeDockerClient):
+        self.client = client
+        self._containers: Dict[str, FakeContainer] = {}
+
+    def run(self, image: str, command=None, entrypoint=None, detach: bool = False, **kwargs):
+        """Start a container, idle if it only sleeps like a warm container, else running the test for a drawn time."""
+        self.client.images.get(image)
+        idle = entrypoint == DockerConstants.WARM_CONTAINER_IDLE_ENTRYPOINT
+        with self.client.lock:
+            name = f"fake_container_{len(self._containers) + 1}"
+        container = FakeContainer(self.client, name, image, None if idle else self.client.draw_test())
+        with self.client.lock:
+            self._containers[container.id] = container
+        if detach:
+            return container
+        container.wait()
+        return container.logs()
+
+    def get(self, container_id: str) -> FakeContainer:
+        with self.client.lock:
+            container = next((container for container in self._containers.values()
+                              if container.id.startswith(container_id) or container.name == container_id), None)
+        if container is None:
+            raise NotFound(f"No such container: {container_id}")
+        return container
+
+    def list(self, all: bool = False, **kwargs) -> List[FakeContainer]:
+        with self.client.lock:
+            containers = list(self._containers.values())
+        return containers if all else [container for container in containers if container.status == "running"]
+
+    def discard(self, container: FakeContainer):
+        with self.client.lock:
+            self._containers.pop(container.id, None)
+        self.client.api.discard_execs(container)
+
+
+class FakeExec:
+    def __init__(self, container: FakeContainer, outcome: TestOutcome):
+        self.container = container
+        self.outcome = outcome
+        self.exit_code: Optional[int] = None
+
+
+class FakeAPIClient:
+    """The low-level calls of docker-py's `APIClient` that DockerManager and the warm container pool make."""
+
+    STEP_ERRORS = {
+        "RUN": "The command '/bin/sh -c {arguments}' returned a non-zero code: 1",
+        "COPY": "COPY failed: file not found in build context or excluded by .dockerignore: {arguments}",
+        "ADD": "ADD failed: file not found in build context or excluded by .dockerignore: {arguments}",
+    }
+
+    def __init__(self, client: FakeDockerClient):
+        self.client = client
+        self._layers = set()
+        self._execs: Dict[str, FakeExec] = {}
+
+    def build(self, path: Optional[str] = None, fileobj=None, tag: Optional[str] = None,
+              dockerfile: str = "Dockerfile", **kwargs) -> Iterator[dict]:
+        """Simulate a classic build, returning the decoded JSON progress stream of the Docker API."""
+        files = self._read_tar(fileobj) if fileobj else self._read_directory(path)
+        return self._build(files, dockerfile, tag)
+
+    def _build(self, files: Dict[str, bytes], dockerfile: str, tag: Optional[str]) -> Iterator[dict]:
+        if dockerfile not in files:
+            yield self._error(f"Cannot locate specified Dockerfile: {dockerfile}")
+            return
+        instructions = DockerfileParser.parse(files[dockerfile].decode("utf-8", errors="replace"))
+        instructions = [instruction for instruction in instructions if instruction.instruction != "ARG"]
+        if not instructions or instructions[0].instruction != "FROM":
+            yield self._error("No build stage in current context")
+            return
+
+        keys = self._get_layer_keys(instructions, files, dockerfile)
+        with self.client.lock:
+            cached = [key in self._layers for key in keys]
+        failing = self._draw_failing_step(instructions, cached)
+
+        stages: Dict[str, Tuple[int, dict]] = {}
+        size, config = 0, {}
+        for index, instruction in enumerate(instructions):
+            yield {"stream": f"Step {index + 1}/{len(instructions)} : {instruction.raw}\n"}
+            if instruction.instruction == "FROM":
+                image, alias = self._get_base_image(instruction)
+                if image in stages:
+                    size, config = stages[image][0], dict(stages[image][1])
+                else:
+                    try:
+                        base = self._get_or_pull(image)
+                    except APIError as e:
+                        yield self._error(str(e))
+                        return
+                    size, config = base.attrs["Size"], dict(base.attrs["Config"])
+                    yield {"stream": f" ---> {base.id[7:19]}\n"}
+                if alias:
+                    stages[alias] = (size, config)
+                continue
+
+            if cached[index]:
+                self.client.sleep(self.client.draw(self.client.config.cached_step))
+                yield {"stream": f" ---> Using cache\n ---> {keys[index][:12]}\n"}
+            else:
+                if instruction.instruction == "RUN":
+                    yield {"stream": f" ---> Running in {self.client.new_id()[7:19]}\n"}
+                    self.client.sleep(self.client.draw(self.client.config.run_step))
+                else:
+                    self.client.sleep(self.client.draw(self.client.config.step))
+                if index == failing:
+                    message = self.STEP_ERRORS.get(instruction.instruction, "failed to process \"{arguments}\"")
+                    yield self._error(message.format(arguments=instruction.arguments))
+                    return
+                with self.client.lock:
+                    self._layers.add(keys[index])
+                yield {"stream": f" ---> {keys[index][:12]}\n"}
+            size += self.client.config.layer_bytes
+            config.update(self._get_config_change(instruction))
+            if alias:
+                stages[alias] = (size, config)
+
+        # The same Dockerfile and context always end in the same layer, and so the same image
+        image_id = f"sha256:{keys[-1]}"
+        self.client.images.add(image_id, size, config, tag=tag)
+        yield {"aux": {"ID": image_id}}
+        yield {"stream": f"Successfully built {keys[-1][:12]}\n"}
+        if tag:
+            yield {"stream": f"Successfully tagged {tag}\n"}
+
+    def exec_create(self, container: str, cmd, **kwargs) -> dict:
+        container = self.client.containers.get(container)
+        if container.status != "running":
+            raise APIError(f"Container {container.id} is not running")
+        exec_id = self.client.new_id()[len("sha256:"):]
+        with self.client.lock:
+            self._execs[exec_id] = FakeExec(container, self.client.draw_test())
+        return {"Id": exec_id}
+
+    def exec_start(self, exec_id: str, stream: bool = False, **kwargs):
+        output = self._run_exec(self._execs[exec_id])
+        return output if stream else b"".join(output)
+
+    def exec_inspect(self, exec_id: str) -> dict:
+        with self.client.lock:
+            fake_exec = self._execs.get(exec_id)
+        if fake_exec is None:
+            raise NotFound(f"No such exec instance: {exec_id}")
+        return {"ID": exec_id, "Running": fake_exec.exit_code is None, "ExitCode": fake_exec.exit_code}
+
+    def discard_execs(self, container: FakeContainer):
+        with self.client.lock:
+            for exec_id in [exec_id for exec_id, fake_exec in self._execs.items() if fake_exec.container is container]:
+                del self._execs[exec_id]
+
+    def _run_exec(self, fake_exec: FakeExec) -> Iterator[bytes]:
+        duration, exit_code, output = fake_exec.outcome
+        # A hanging command only ends with its container
+        if self.client.sleep(duration, fake_exec.container.stopped):
+            fake_exec.exit_code = FakeDockerConstants.KILLED_EXIT_CODE
+            return
+        fake_exec.exit_code = exit_code
+        if output:
+            yield output.encode("utf-8")
+
+    def _get_layer_keys(self, instructions: List[DockerfileInstruction], files: Dict[str, bytes],
+                        dockerfile: str) -> List[str]:
+        """Key every step by its parent and instruction, and COPY/ADD steps by the context files too."""
+        context = hashlib.sha256()
+        for name, content in sorted(files.items()):
+            if name != dockerfile:
+                context.update(name.encode("utf-8"))
+                context.update(hashlib.sha256(content).digest())
+        context_digest = context.hexdigest()
+
+        keys = []
+        stages: Dict[str, str] = {}
+        parent = ""
+        for instruction in instructions:
+            if instruction.instruction == "FROM":
+                image, alias = self._get_base_image(instruction)
+                parent = stages.get(image) or hashlib.sha256(f"FROM {image}".encode("utf-8")).hexdigest()
+            else:
+                payload = f"{parent}\n{instruction.raw}"
+                if instruction.instruction in ("COPY", "ADD") and "--from" not in instruction.arguments:
+                    payload += f"\n{context_digest}"
+                parent = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+            if alias:
+                stages[alias] = parent
+            keys.append(parent)
+        return keys
+
+    def _draw_failing_step(self, instructions: List[DockerfileInstruction], cached: List[bool]) -> Optional[int]:
+        """Pick the step the build fails at, None if it succeeds. Cached steps have succeeded before."""
+        candidates = [index for index, instruction in enumerate(instructions)
+                      if instruction.instruction != "FROM" and not cached[index]]
+        for index in candidates:
+            if any(pattern in instructions[index].raw for pattern in self.client.config.failing_instructions):
+                return index
+        if candidates and self.client.chance(self.client.config.build_failure_rate):
+            return self.client.choice(candidates)
+        return None
+
+    def _get_or_pull(self, image: str) -> FakeImage:
+        try:
+            return self.client.images.get(image)
+        except ImageNotFound:
+            self.client.pull(image)
+            return self.client.images.get(image)
+
+    @staticmethod
+    def _get_base_image(instruction: DockerfileInstruction) -> Tuple[str, Optional[str]]:
+        """Return the image of a FROM instruction and its stage name, if any."""
+        arguments = [argument for argument in instruction.arguments.split() if not argument.startswith("--")]
+        alias = arguments[2] if len(arguments) >= 3 and arguments[1].lower() == "as" else None
+        return arguments[0], alias
+
+    @staticmethod
+    def _get_config_change(instruction: DockerfileInstruction) -> dict:
+        if instruction.instruction not in ("ENTRYPOINT", "CMD"):
+            return {}
+        try:
+            command = json.loads(instruction.arguments)
+        except ValueError:
+            command = None
+        if not isinstance(command, list):
+            command = ["/bin/sh", "-c", instruction.arguments]
+        return {"Entrypoint" if instruction.instruction == "ENTRYPOINT" else "Cmd": command}
+
+    @staticmethod
+    def _error(message: str) -> dict:
+        return {"error": message, "errorDetail": {"message": message}}
+
+    @staticmethod
+    def _read_tar(fileobj) -> Dict[str, bytes]:
+        with tarfile.open(fileobj=fileobj, mode="r") as tar:
+            return {member.name: tar.extractfile(member).read() for member in tar.getmembers() if member.isfile()}
+
+    @staticmethod
+    def _read_directory(path: str) -> Dict[str, bytes]:
+        files = {}
+        for root, _, names in os.walk(path):
+            for name in names:
+                file_path = os.path.join(root, name)
+                with open(file_path, "rb") as f:
+                    files[os.path.relpath(file_path, path).replace(os.sep, "/")] = f.read()
+        return files
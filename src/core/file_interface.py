@@ -19,3 +19,20 @@ class FileInterface:
     @staticmethod
     def get_directory(file_path):
         return os.path.dirname(file_path)
+
+    @staticmethod
+    def remove_directory(directory):
+        shutil.rmtree(directory)
+
+    @staticmethod
+    def get_directory_stats(directory):
+        """Return the total size in bytes and the latest modification time of a directory tree."""
+        size = 0
+        modified = os.path.getmtime(directory)
+        for root, _, files in os.walk(directory):
+            modified = max(modified, os.path.getmtime(root))
+            for name in files:
+                stat = os.stat(os.path.join(root, name))
+                size += stat.st_size
+                modified = max(modified, stat.st_mtime)
+        return size, modified
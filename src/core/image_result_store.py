@@ -0,0 +1,147 @@
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+from contextlib import closing
+from typing import Callable, Dict, Optional
+
+from src.constants import CacheConstants
+from src.models.build_result import StoredImageResult
+from src.models.container_run import ContainerLimits
+
+
+class ImageResultStore:
+    """
+    SQLite store of the images built, and test outcomes seen, for a script and test command.
+
+    Entries are keyed on the SHA-256 of the Dockerfile, the bytes of every build context file,
+    the test command and the limits it runs under, so when the LLM comes back with a Dockerfile that was already built
+    and tested, the image is re-tagged and its outcome reused instead of building and testing
+    it again. The Dockerfile built last under each tag is tracked, so the test of that tag can
+    be looked up without being handed the Dockerfile.
+
+    Entries older than `max_age_seconds` are ignored and removed, and the least recently
+    updated ones are evicted once the store holds more than `max_entries`.
+    """
+
+    def __init__(self, db_path: str, manifest: Dict[str, str], test_command: str,
+                 limits: Optional[ContainerLimits] = None, max_entries: int = CacheConstants.RESULT_STORE_MAX_ENTRIES,
+                 max_age_seconds: int = CacheConstants.RESULT_STORE_MAX_AGE_SECONDS):
+        self.db_path = db_path
+        self.manifest = manifest
+        self.test_command = test_command
+        self.limits = limits or ContainerLimits()
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self._context_digest: Optional[str] = None
+        self._current_keys: Dict[str, str] = {}
+        self.logger = logging.getLogger(__name__)
+
+    def get_key(self, dockerfile_content: str) -> str:
+        """Hash the Dockerfile together with the build context files, the test command and its limits."""
+        digest = hashlib.sha256()
+        # An outcome seen under other limits, e.g. an OOM kill with less memory, says nothing about these
+        for part in (dockerfile_content, self._get_context_digest(), self.test_command, self.limits.model_dump_json()):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def set_current_key(self, tag: str, key: Optional[str]):
+        """Record which Dockerfile the tag was last built from, None if the build failed."""
+        if key is None:
+            self._current_keys.pop(tag, None)
+        else:
+            self._current_keys[tag] = key
+
+    def get_current_key(self, tag: str) -> Optional[str]:
+        return self._current_keys.get(tag)
+
+    def get(self, key: str, image_exists: Optional[Callable[[str], bool]] = None) -> Optional[StoredImageResult]:
+        """
+        Return the stored result for the key, or None on a miss, an expired entry or an unreadable store.
+
+        :param image_exists: Checks the stored image is still there, the entry is removed if it is not
+        """
+        try:
+            with closing(self._connect()) as connection:
+                row = connection.execute(
+                    "SELECT image_id, test_passed, test_error, updated_at FROM results WHERE key = ?", (key,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            self.logger.warning(f"Failed to read the image result store: {e}")
+            return None
+        if row is None:
+            return None
+        image_id, test_passed, test_error, updated_at = row
+        if time.time() - (updated_at or 0) > self.max_age_seconds:
+            self.remove(key)
+            return None
+        if image_id and image_exists is not None and not image_exists(image_id):
+            self.logger.info(f"Image {image_id} was removed, forgetting its stored result")
+            self.remove(key)
+            return None
+        return StoredImageResult(
+            key=key,
+            image_id=image_id,
+            test_passed=None if test_passed is None else bool(test_passed),
+            test_error=test_error,
+        )
+
+    def record_build(self, key: str, image_id: str):
+        """Store the image built for the key, forgetting the test outcome of any previous image."""
+        self._execute(
+            "INSERT INTO results (key, image_id, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET image_id = excluded.image_id, test_passed = NULL, test_error = NULL, "
+            "updated_at = excluded.updated_at",
+            (key, image_id, time.time()),
+        )
+        self.evict()
+
+    def record_test(self, key: str, passed: bool, error: Optional[str] = None):
+        """Store the test outcome of the image built for the key."""
+        self._execute(
+            "UPDATE results SET test_passed = ?, test_error = ?, updated_at = ? WHERE key = ?",
+            (int(passed), error, time.time(), key),
+        )
+
+    def remove(self, key: str):
+        self._execute("DELETE FROM results WHERE key = ?", (key,))
+
+    def evict(self):
+        """Remove expired entries and the least recently updated ones above `max_entries`."""
+        self._execute("DELETE FROM results WHERE updated_at < ?", (time.time() - self.max_age_seconds,))
+        self._execute(
+            "DELETE FROM results WHERE key NOT IN (SELECT key FROM results ORDER BY updated_at DESC LIMIT ?)",
+            (self.max_entries,),
+        )
+
+    def _get_context_digest(self) -> str:
+        if self._context_digest is None:
+            digest = hashlib.sha256()
+            for name, path in sorted(self.manifest.items()):
+                with open(path, "rb") as f:
+                    content = f.read()
+                digest.update(name.encode("utf-8"))
+                digest.update(hashlib.sha256(content).digest())
+            self._context_digest = digest.hexdigest()
+        return self._context_digest
+
+    def _execute(self, statement: str, parameters: tuple):
+        try:
+            # A connection per operation, so the store can be used from any thread
+            with closing(self._connect()) as connection, connection:
+                connection.execute(statement, parameters)
+        except sqlite3.Error as e:
+            self.logger.warning(f"Failed to write the image result store: {e}")
+
+    def _connect(self) -> sqlite3.Connection:
+        directory = os.path.dirname(self.db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(self.db_path)
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "key TEXT PRIMARY KEY, image_id TEXT, test_passed INTEGER, test_error TEXT, updated_at REAL)"
+        )
+        return connection
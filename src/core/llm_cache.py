@@ -0,0 +1,111 @@
+import os
+import json
+import time
+import hashlib
+import logging
+from typing import Optional
+
+from src.constants import CacheConstants
+
+
+class LLMResponseCache:
+    """
+    Content-addressed on-disk cache for raw LLM responses.
+
+    Every entry is stored as a JSON file named after the SHA-256 of its key, so identical
+    prompts sent to the same provider/model/temperature resolve to the same file.
+    Entries older than `max_age_seconds` are ignored and removed, and the least recently
+    used entries are evicted once the cache holds more than `max_entries` files.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_entries: int = CacheConstants.MAX_ENTRIES,
+                 max_age_seconds: int = CacheConstants.MAX_AGE_SECONDS):
+        self.cache_dir = cache_dir or os.getenv(CacheConstants.CACHE_DIR_ENV_VAR, CacheConstants.DEFAULT_CACHE_DIR)
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self.logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def build_key(prompt: str, system_message: Optional[str], provider_name: str, model_name: Optional[str],
+                  temperature: Optional[float]) -> str:
+        """Hash everything that can change the response of an LLM call into a single key."""
+        payload = json.dumps(
+            {
+                "prompt": prompt,
+                "system_message": system_message,
+                "provider": provider_name,
+                "model_name": model_name,
+                "temperature": temperature,
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for the key, or None on a miss or expired entry."""
+        path = self._get_entry_path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age_seconds:
+                self._remove(path)
+                return None
+            with open(path, "r") as f:
+                response = json.load(f)["response"]
+            # Touch the entry so eviction is least-recently-used rather than oldest-written
+            os.utime(path)
+            self.logger.debug(f"LLM cache hit: {key}")
+            return response
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            self.logger.warning(f"Discarding unreadable LLM cache entry {key}: {e}")
+            self._remove(path)
+            return None
+
+    def set(self, key: str, response: str):
+        """Store a response and evict entries beyond the configured limits."""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._get_entry_path(key)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"response": response, "created_at": time.time()}, f)
+            os.replace(tmp_path, path)
+            self.evict()
+        except OSError as e:
+            self.logger.warning(f"Failed to write LLM cache entry {key}: {e}")
+
+    def evict(self):
+        """Remove expired entries and the least recently used ones above `max_entries`."""
+        try:
+            entries = [
+                os.path.join(self.cache_dir, name)
+                for name in os.listdir(self.cache_dir)
+                if name.endswith(".json")
+            ]
+        except FileNotFoundError:
+            return
+
+        now = time.time()
+        live_entries = []
+        for path in entries:
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                continue
+            if now - mtime > self.max_age_seconds:
+                self._remove(path)
+            else:
+                live_entries.append((mtime, path))
+
+        live_entries.sort(reverse=True)
+        for _, path in live_entries[self.max_entries:]:
+            self._remove(path)
+
+    def _get_entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
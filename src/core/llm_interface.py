@@ -1,32 +1,53 @@
 import os
 from abc import ABC, abstractmethod
-from typing import Dict, Optional, List
+from typing import Any, Dict, Iterator, Optional, List
 import uuid
 from langgraph.prebuilt import create_react_agent, ToolExecutor
 from langgraph.checkpoint.memory import MemorySaver
-from langchain_openai import ChatOpenAI
-from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain.schema import HumanMessage, SystemMessage
+from langchain_core.messages import AIMessageChunk
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import BaseTool
 
 from src.constants import LLMProviderConstants, TokenUsageConstants, VALID_VENDORS, ValidVendorArgument
 
 
+class ThreadBoundTool(BaseTool):
+    """
+    Stand-in for a tool in a provider's agent graph.
+
+    Pooled providers outlive the tools they were created with, which are bound to one build
+    context, so each call runs the instance bound to its thread through `bind_thread_tools`.
+    """
+
+    provider: Any
+    tool: BaseTool
+
+    def __init__(self, provider: "LLMProvider", tool: BaseTool):
+        super().__init__(name=tool.name, description=tool.description, args_schema=tool.args_schema,
+                         provider=provider, tool=tool)
+
+    def _run(self, config: RunnableConfig, run_manager=None, **kwargs):
+        thread_id = config.get("configurable", {}).get("thread_id")
+        tool = self.provider.get_thread_tool(thread_id, self.name) or self.tool
+        return tool.run(kwargs, callbacks=run_manager.get_child() if run_manager else None)
+
+
 class LLMProvider(ABC):
+    default_model_name: Optional[str] = None
+    default_temperature: Optional[float] = None
+
     def __init__(self, model_name: str = None, temperature: float = None, tools: Optional[List] = None, thread_id: Optional[str] = None):
         self.token_usage = TokenUsageConstants.DEFAULT_TOKEN_USAGE.copy()
+        self.token_usage_by_thread: Dict[str, Dict[str, int]] = {}
         self.tools = tools or []
+        self.tools_by_thread: Dict[str, Dict[str, BaseTool]] = {}
         self.thread_id = thread_id or str(uuid.uuid4())
-        self.llm = self.initialize_llm(model_name, temperature)
+        self.model_name = model_name or self.default_model_name
+        self.temperature = self.default_temperature if temperature is None else temperature
+        self.llm = self.initialize_llm(self.model_name, self.temperature)
         self.checkpointer = MemorySaver()
-        self.tool_executor = ToolExecutor(self.tools)
-
-        # Read the DEBUG_MODE environment variable
-        self.agent = create_react_agent(
-            model=self.llm,
-            tools=self.tool_executor,
-            checkpointer=self.checkpointer,
-            debug=self.debug_mode,
-        )
+        self.agent = self.build_agent()
 
     @property
     def debug_mode(self):
@@ -37,11 +58,65 @@ class LLMProvider(ABC):
         """Initialize the LLM instance."""
         pass
 
-    def generate_response(self, prompt: str, system_message: Optional[str] = None) -> str:
+    def build_agent(self):
+        """Compile the agent graph around the LLM instance."""
+        self.tool_executor = ToolExecutor([ThreadBoundTool(self, tool) for tool in self.tools])
+
+        # Read the DEBUG_MODE environment variable
+        return create_react_agent(
+            model=self.llm,
+            tools=self.tool_executor,
+            checkpointer=self.checkpointer,
+            debug=self.debug_mode,
+        )
+
+    def generate_response(self, prompt: str, system_message: Optional[str] = None, thread_id: Optional[str] = None) -> str:
         """Generate a response using the LLM."""
         messages = self._construct_messages(prompt, system_message)
-        config = {"configurable": {"thread_id": self.thread_id}}
+        config = {"configurable": {"thread_id": thread_id or self.thread_id}}
         response = self.agent.invoke({"messages": messages}, config=config)
+        return self._handle_response(response, thread_id or self.thread_id)
+
+    async def agenerate_response(self, prompt: str, system_message: Optional[str] = None, thread_id: Optional[str] = None) -> str:
+        """Generate a response using the LLM without blocking the event loop."""
+        messages = self._construct_messages(prompt, system_message)
+        config = {"configurable": {"thread_id": thread_id or self.thread_id}}
+        response = await self.agent.ainvoke({"messages": messages}, config=config)
+        return self._handle_response(response, thread_id or self.thread_id)
+
+    def stream_response(self, prompt: str, system_message: Optional[str] = None, thread_id: Optional[str] = None) -> Iterator[str]:
+        """Generate a response using the LLM, yielding the text as it arrives."""
+        messages = self._construct_messages(prompt, system_message)
+        thread_id = thread_id or self.thread_id
+        config = {"configurable": {"thread_id": thread_id}}
+        token_usage = TokenUsageConstants.DEFAULT_TOKEN_USAGE.copy()
+
+        try:
+            for chunk, _ in self.agent.stream({"messages": messages}, config=config, stream_mode="messages"):
+                if not isinstance(chunk, AIMessageChunk):
+                    continue
+                if chunk.usage_metadata:
+                    for key in token_usage:
+                        token_usage[key] += chunk.usage_metadata.get(key, 0)
+                text = self._get_chunk_text(chunk)
+                if text:
+                    yield text
+        finally:
+            # Also runs when the consumer aborts the stream early
+            self.token_usage = token_usage
+            self.token_usage_by_thread[thread_id] = token_usage
+
+    @staticmethod
+    def _get_chunk_text(chunk: AIMessageChunk) -> str:
+        if isinstance(chunk.content, str):
+            return chunk.content
+        return "".join(
+            part.get("text", "") if isinstance(part, dict) else str(part)
+            for part in chunk.content
+        )
+
+    def _handle_response(self, response: dict, thread_id: str) -> str:
+        """Record the token usage of the agent response and return its content."""
         ai_message = response["messages"][-1]
 
         # Extract token usage
@@ -51,6 +126,8 @@ class LLMProvider(ABC):
             "output_tokens": token_usage["output_tokens"],
             "total_tokens": token_usage["total_tokens"],
         }
+        # Pooled providers serve several conversations, so keep the latest usage of each one apart
+        self.token_usage_by_thread[thread_id] = self.token_usage
 
         return ai_message.content
 
@@ -62,22 +139,49 @@ class LLMProvider(ABC):
         messages.append(HumanMessage(content=prompt))
         return messages
 
-    def get_token_usage(self) -> Dict[str, int]:
-        """Retrieve token usage data."""
-        return self.token_usage
+    def bind_thread_tools(self, thread_id: str, tools: Optional[List[BaseTool]]):
+        """Run the given tool instances, instead of those the provider was created with, for a thread."""
+        if tools:
+            self.tools_by_thread[thread_id] = {tool.name: tool for tool in tools}
+
+    def get_thread_tool(self, thread_id: Optional[str], name: str) -> Optional[BaseTool]:
+        return self.tools_by_thread.get(thread_id, {}).get(name)
+
+    def release_thread(self, thread_id: str):
+        """Drop the conversation history and the tools stored for a thread."""
+        self.checkpointer.delete_thread(thread_id)
+        self.token_usage_by_thread.pop(thread_id, None)
+        self.tools_by_thread.pop(thread_id, None)
+
+    def get_token_usage(self, thread_id: Optional[str] = None) -> Dict[str, int]:
+        """Retrieve token usage data of the latest call, optionally for a specific thread."""
+        if thread_id is None:
+            return self.token_usage
+        return self.token_usage_by_thread.get(thread_id, TokenUsageConstants.DEFAULT_TOKEN_USAGE.copy())
 
 
 class GoogleGenerativeAIProvider(LLMProvider):
+    default_model_name = LLMProviderConstants.DEFAULT_GOOGLE_MODEL_NAME
+    default_temperature = LLMProviderConstants.DEFAULT_GOOGLE_TEMPERATURE
+
     def initialize_llm(self, model_name: str = None, temperature: float = None):
+        # Vendor SDKs are slow to import, so only the selected one is loaded
+        from langchain_google_genai import ChatGoogleGenerativeAI
+
         return ChatGoogleGenerativeAI(
             model=model_name or LLMProviderConstants.DEFAULT_GOOGLE_MODEL_NAME,
-            temperature=temperature or LLMProviderConstants.DEFAULT_GOOGLE_TEMPERATURE,
+            temperature=LLMProviderConstants.DEFAULT_GOOGLE_TEMPERATURE if temperature is None else temperature,
         )
 
 
 class OpenAIProvider(LLMProvider):
+    default_model_name = LLMProviderConstants.DEFAULT_OPENAI_MODEL_NAME
+    default_temperature = LLMProviderConstants.DEFAULT_OPENAI_TEMPERATURE
+
     def initialize_llm(self, model_name: str = None, temperature: float = None):
+        from langchain_openai import ChatOpenAI
+
         return ChatOpenAI(
             model_name=model_name or LLMProviderConstants.DEFAULT_OPENAI_MODEL_NAME,
-            temperature=temperature or LLMProviderConstants.DEFAULT_OPENAI_TEMPERATURE,
+            temperature=LLMProviderConstants.DEFAULT_OPENAI_TEMPERATURE if temperature is None else temperature,
         )
@@ -0,0 +1,72 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+from src.constants import LLMProviderConstants
+from src.core.llm_interface import LLMProvider
+
+
+logger = logging.getLogger(__name__)
+
+
+class LLMProviderPool:
+    """
+    Process-wide pool of LLM providers.
+
+    Building a provider creates a chat client, a checkpointer, a tool executor and a compiled
+    agent graph, so services borrow a shared instance keyed by vendor, model, temperature and
+    toolset instead. Services keep their conversations apart by passing their own thread ID.
+    Tools are keyed by name and type, as their instances are recreated for every build context;
+    services bind the current instances to their thread with `bind_thread_tools`.
+    """
+
+    _providers: "OrderedDict[tuple, LLMProvider]" = OrderedDict()
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_provider(
+            cls,
+            provider_class: type[LLMProvider],
+            tools: Optional[List] = None,
+            model_name: Optional[str] = None,
+            temperature: Optional[float] = None,
+    ) -> LLMProvider:
+        """
+        Return the pooled provider for the given configuration, creating it on first use.
+
+        Returns:
+            LLMProvider: A shared provider instance.
+        """
+        tools = tools or []
+        key = (
+            provider_class,
+            model_name,
+            temperature,
+            tuple((tool.name, type(tool)) for tool in tools),
+        )
+
+        with cls._lock:
+            provider = cls._providers.get(key)
+            if provider is not None:
+                cls._providers.move_to_end(key)
+                return provider
+
+            logger.debug(f"Creating pooled LLM provider: {provider_class.__name__}")
+            kwargs = {"tools": tools}
+            if model_name is not None:
+                kwargs["model_name"] = model_name
+            if temperature is not None:
+                kwargs["temperature"] = temperature
+            provider = provider_class(**kwargs)
+
+            cls._providers[key] = provider
+            while len(cls._providers) > LLMProviderConstants.PROVIDER_POOL_MAX_SIZE:
+                cls._providers.popitem(last=False)
+            return provider
+
+    @classmethod
+    def clear(cls):
+        """Drop every pooled provider."""
+        with cls._lock:
+            cls._providers.clear()
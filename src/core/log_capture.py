@@ -0,0 +1,63 @@
+from typing import Iterable
+
+from src.constants import DockerConstants
+from src.models.container_run import ContainerRunResult
+
+
+class LogCapture:
+    """
+    Captures a stream of log chunks within a fixed byte budget.
+
+    The first `head_bytes` and the last `tail_bytes` are kept, which is where a script's
+    startup output and its final error are, and everything in between is dropped. Memory
+    stays bounded however much a script prints, while `total_bytes` still counts it all.
+    """
+
+    def __init__(self, head_bytes: int = DockerConstants.LOG_CAPTURE_HEAD_BYTES,
+                 tail_bytes: int = DockerConstants.LOG_CAPTURE_TAIL_BYTES):
+        self.head_bytes = head_bytes
+        self.tail_bytes = tail_bytes
+        self.total_bytes = 0
+        self._head = bytearray()
+        self._tail = bytearray()
+
+    def feed(self, chunk: bytes):
+        self.total_bytes += len(chunk)
+        if len(self._head) < self.head_bytes:
+            missing = self.head_bytes - len(self._head)
+            self._head += chunk[:missing]
+            chunk = chunk[missing:]
+        self._tail += chunk
+        # Trim in batches rather than on every chunk, `[:-0]` would keep everything when no tail is wanted
+        if len(self._tail) > 2 * self.tail_bytes:
+            del self._tail[:len(self._tail) - self.tail_bytes]
+
+    def feed_all(self, chunks: Iterable[bytes]) -> "LogCapture":
+        for chunk in chunks:
+            self.feed(chunk)
+        return self
+
+    @classmethod
+    def capture_run_logs(cls, run: ContainerRunResult, chunks: Iterable[bytes]):
+        """Stream the output of a test run into its result, within the byte budget."""
+        capture = cls().feed_all(chunks)
+        run.logs = capture.get_text()
+        run.log_bytes = capture.total_bytes
+        run.captured_log_bytes = capture.captured_bytes
+
+    @property
+    def captured_bytes(self) -> int:
+        return len(self._head) + min(len(self._tail), self.tail_bytes)
+
+    @property
+    def truncated(self) -> bool:
+        return self.captured_bytes < self.total_bytes
+
+    def get_text(self) -> str:
+        """Decode the captured logs, marking where output was dropped."""
+        tail = bytes(self._tail[-self.tail_bytes:]) if self.tail_bytes else b""
+        head = self._head.decode("utf-8", errors="replace")
+        if not self.truncated:
+            return head + tail.decode("utf-8", errors="replace")
+        omitted = self.total_bytes - self.captured_bytes
+        return f"{head}\n... [{omitted} bytes omitted] ...\n{tail.decode('utf-8', errors='replace')}"
@@ -0,0 +1,175 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+from typing import Dict, Iterator, List, Optional
+
+from src.constants import ReplayConstants, TokenUsageConstants, VALID_VENDORS
+from src.core.llm_interface import LLMProvider, OpenAIProvider, GoogleGenerativeAIProvider
+
+
+class ReplayProvider(LLMProvider):
+    """
+    LLM provider that records real exchanges to a cassette file and replays them offline.
+
+    In record mode every call is forwarded to a real vendor provider and the response, its
+    usage metadata and its latency are appended to the cassette. In replay mode responses are
+    served from the cassette in recorded order per prompt, after a simulated latency, so the
+    full pipeline can be benchmarked without network access or API cost.
+    """
+
+    default_model_name = ReplayConstants.MODEL_NAME
+    # Guards cassette writes across instances, which may record to the same file
+    _cassette_lock = threading.Lock()
+
+    def __init__(self, model_name: str = None, temperature: float = None, tools: Optional[List] = None, thread_id: Optional[str] = None):
+        self.logger = logging.getLogger(__name__)
+        self.mode = os.getenv(ReplayConstants.MODE_ENV_VAR, ReplayConstants.DEFAULT_MODE).lower()
+        self.cassette_path = os.getenv(ReplayConstants.CASSETTE_PATH_ENV_VAR, ReplayConstants.DEFAULT_CASSETTE_PATH)
+        self.latency = os.getenv(ReplayConstants.LATENCY_ENV_VAR, ReplayConstants.DEFAULT_LATENCY)
+        if self.mode not in ("record", "replay"):
+            raise ValueError(f"Invalid replay mode: {self.mode}")
+
+        self._lock = threading.Lock()
+        self._replay_positions: Dict[str, int] = {}
+        self.recorder: Optional[LLMProvider] = None
+        self.interactions = self._load_cassette()
+        super().__init__(model_name=model_name, temperature=temperature, tools=tools, thread_id=thread_id)
+
+    def initialize_llm(self, model_name: str = None, temperature: float = None):
+        if self.mode == "record":
+            self.recorder = self._create_recorder(temperature)
+            return self.recorder.llm
+        return None
+
+    def build_agent(self):
+        # Recording goes through the recorder's own agent, replaying needs no agent at all
+        return None
+
+    def generate_response(self, prompt: str, system_message: Optional[str] = None, thread_id: Optional[str] = None) -> str:
+        thread_id = thread_id or self.thread_id
+        if self.mode == "record":
+            return self._record(prompt, system_message, thread_id)
+
+        interaction = self._get_interaction(prompt, system_message)
+        time.sleep(self._get_latency(interaction))
+        return self._replay(interaction, thread_id)
+
+    async def agenerate_response(self, prompt: str, system_message: Optional[str] = None, thread_id: Optional[str] = None) -> str:
+        thread_id = thread_id or self.thread_id
+        if self.mode == "record":
+            return await asyncio.to_thread(self._record, prompt, system_message, thread_id)
+
+        interaction = self._get_interaction(prompt, system_message)
+        await asyncio.sleep(self._get_latency(interaction))
+        return self._replay(interaction, thread_id)
+
+    def stream_response(self, prompt: str, system_message: Optional[str] = None, thread_id: Optional[str] = None) -> Iterator[str]:
+        thread_id = thread_id or self.thread_id
+        if self.mode == "record":
+            yield self._record(prompt, system_message, thread_id)
+            return
+
+        interaction = self._get_interaction(prompt, system_message)
+        lines = interaction["response"].splitlines(keepends=True) or [""]
+        delay = self._get_latency(interaction) / len(lines)
+        self._replay(interaction, thread_id)
+        for line in lines:
+            time.sleep(delay)
+            yield line
+
+    def bind_thread_tools(self, thread_id: str, tools: Optional[List]):
+        if self.recorder:
+            self.recorder.bind_thread_tools(thread_id, tools)
+
+    def release_thread(self, thread_id: str):
+        if self.recorder:
+            self.recorder.release_thread(thread_id)
+        self.token_usage_by_thread.pop(thread_id, None)
+
+    @staticmethod
+    def build_key(prompt: str, system_message: Optional[str]) -> str:
+        payload = json.dumps({"prompt": prompt, "system_message": system_message}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _create_recorder(self, temperature: Optional[float]) -> LLMProvider:
+        vendor = os.getenv(ReplayConstants.RECORD_VENDOR_ENV_VAR, ReplayConstants.DEFAULT_RECORD_VENDOR).lower()
+        if vendor == VALID_VENDORS[0]:
+            provider_class = OpenAIProvider
+        elif vendor == VALID_VENDORS[1]:
+            provider_class = GoogleGenerativeAIProvider
+        else:
+            raise ValueError(f"Unsupported LLM vendor to record: {vendor}")
+        return provider_class(temperature=temperature, tools=self.tools, thread_id=self.thread_id)
+
+    def _record(self, prompt: str, system_message: Optional[str], thread_id: str) -> str:
+        start = time.monotonic()
+        response = self.recorder.generate_response(prompt, system_message, thread_id=thread_id)
+        latency = time.monotonic() - start
+        token_usage = self.recorder.get_token_usage(thread_id)
+
+        interaction = {
+            "key": self.build_key(prompt, system_message),
+            "system_message": system_message,
+            "prompt": prompt,
+            "response": response,
+            "usage_metadata": token_usage,
+            "model_name": self.recorder.model_name,
+            "latency": latency,
+        }
+        with self._cassette_lock:
+            # Re-read first so recordings made by other instances since loading are kept
+            self.interactions = self._load_cassette() + [interaction]
+            self._save_cassette()
+
+        self._set_token_usage(token_usage, thread_id)
+        return response
+
+    def _replay(self, interaction: dict, thread_id: str) -> str:
+        self._set_token_usage(interaction.get("usage_metadata") or {}, thread_id)
+        return interaction["response"]
+
+    def _get_interaction(self, prompt: str, system_message: Optional[str]) -> dict:
+        """Return the next recorded interaction for the prompt, repeating the last one once exhausted."""
+        key = self.build_key(prompt, system_message)
+        matches = [interaction for interaction in self.interactions if interaction["key"] == key]
+        if not matches:
+            raise LookupError(f"No recorded response in {self.cassette_path} for prompt: {prompt[:80]}")
+
+        with self._lock:
+            position = self._replay_positions.get(key, 0)
+            self._replay_positions[key] = position + 1
+        return matches[min(position, len(matches) - 1)]
+
+    def _get_latency(self, interaction: dict) -> float:
+        if self.latency == ReplayConstants.RECORDED_LATENCY:
+            return interaction.get("latency", 0.0)
+        return float(self.latency)
+
+    def _set_token_usage(self, usage_metadata: dict, thread_id: str):
+        token_usage = TokenUsageConstants.DEFAULT_TOKEN_USAGE.copy()
+        for key in token_usage:
+            token_usage[key] = usage_metadata.get(key, 0)
+        self.token_usage = token_usage
+        self.token_usage_by_thread[thread_id] = token_usage
+
+    def _load_cassette(self) -> List[dict]:
+        try:
+            with open(self.cassette_path, "r") as f:
+                return json.load(f)["interactions"]
+        except FileNotFoundError:
+            if self.mode == "replay":
+                raise FileNotFoundError(f"Cassette not found: {self.cassette_path}")
+            return []
+
+    def _save_cassette(self):
+        directory = os.path.dirname(self.cassette_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.cassette_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"interactions": self.interactions}, f, indent=2)
+        os.replace(tmp_path, self.cassette_path)
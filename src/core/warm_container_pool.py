@@ -0,0 +1,173 @@
+import time
+import shlex
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from typing import Dict, List
+
+from docker.errors import DockerException
+
+from src.constants import DockerConstants
+from src.core.log_capture import LogCapture
+from src.models.container_run import ContainerLimits, ContainerRunResult
+
+
+class WarmContainer:
+    def __init__(self, container, image_id: str, entrypoint: List[str], default_command: List[str]):
+        self.container = container
+        self.image_id = image_id
+        self.entrypoint = entrypoint
+        self.default_command = default_command
+        self.uses = 0
+        self.running: List[ContainerRunResult] = []
+
+    def get_exec_command(self, test_command: str) -> List[str]:
+        """Build the command `containers.run(tag, command=test_command)` would have run."""
+        command = shlex.split(test_command) if test_command else self.default_command
+        return self.entrypoint + command
+
+
+class WarmContainerPool:
+    """
+    Long-lived idle containers, one per image tag, that test commands are executed in.
+
+    Starting and removing a container per test dominates the test time of small scripts, so
+    the container is started once with an idle entrypoint and every test command runs in it
+    through `docker exec`, with the image's own entrypoint prepended. A container is recycled
+    after `max_uses` tests, so state left behind by earlier tests cannot pile up, and killed
+    when a test times out. It is also replaced once its tag points to another image, so a
+    rebuild that only hits the cache keeps using it.
+    """
+
+    def __init__(self, client, limits: ContainerLimits, max_uses: int = DockerConstants.WARM_CONTAINER_MAX_USES):
+        self.client = client
+        self.limits = limits
+        self.max_uses = max_uses
+        self._containers: Dict[str, WarmContainer] = {}
+        self._lock = threading.Lock()
+        # Held while a tag's container is checked and started, so concurrent first tests start only one
+        self._tag_locks: Dict[str, threading.Lock] = {}
+        self._executor = ThreadPoolExecutor(thread_name_prefix="warm-container-exec")
+        self.logger = logging.getLogger(__name__)
+
+    def run(self, run: ContainerRunResult):
+        """
+        Run the test command of `run` in the warm container of its tag, filling in the outcome.
+
+        Raises DockerException if the image cannot be kept running, e.g. because it has no `sleep`.
+        """
+        warm_container = self._acquire(run)
+        start = time.monotonic()
+        command = warm_container.get_exec_command(run.test_command)
+        future = self._executor.submit(self._exec, warm_container, command, run)
+        try:
+            future.result(timeout=self.limits.timeout_seconds)
+        except TimeoutError:
+            # The exec cannot be stopped on its own, so the whole container goes
+            self.logger.warning(f"Test command timed out after {self.limits.timeout_seconds}s, killing the warm container")
+            self.discard(run.tag)
+            run.timed_out = True
+            run.duration_seconds = round(time.monotonic() - start, 3)
+            return
+        except DockerException:
+            # The container is gone once the test is cancelled
+            if not run.cancelled:
+                raise
+        finally:
+            with self._lock:
+                # Runs are compared by identity, as two runs of the same command are equal
+                warm_container.running = [other for other in warm_container.running if other is not run]
+
+        run.duration_seconds = round(time.monotonic() - start, 3)
+        if run.exit_code == DockerConstants.OOM_EXIT_CODE:
+            # The kernel may have killed the whole container rather than just the command
+            self.discard(run.tag)
+
+    def _exec(self, warm_container: WarmContainer, command: List[str], run: ContainerRunResult):
+        # The low-level API streams the output and still reports the exit code, unlike exec_run
+        exec_id = self.client.api.exec_create(warm_container.container.id, command)["Id"]
+        LogCapture.capture_run_logs(run, self.client.api.exec_start(exec_id, stream=True))
+        run.exit_code = self.client.api.exec_inspect(exec_id)["ExitCode"]
+
+    def discard(self, tag: str):
+        """Remove the warm container of a tag, e.g. because its test timed out."""
+        with self._lock:
+            warm_container = self._containers.pop(tag, None)
+        if warm_container:
+            self._remove(warm_container)
+
+    def cancel(self):
+        """Kill the warm containers running a test, marking those tests as cancelled."""
+        with self._lock:
+            busy = [(tag, warm_container) for tag, warm_container in self._containers.items() if warm_container.running]
+            for tag, warm_container in busy:
+                del self._containers[tag]
+                for run in warm_container.running:
+                    run.cancelled = True
+        for _, warm_container in busy:
+            self._remove(warm_container)
+
+    def close(self):
+        """Remove every warm container."""
+        with self._lock:
+            warm_containers = list(self._containers.values())
+            self._containers.clear()
+        for warm_container in warm_containers:
+            self._remove(warm_container)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _acquire(self, run: ContainerRunResult) -> WarmContainer:
+        """Return the warm container to run the test in, starting one if the tag has none yet."""
+        tag = run.tag
+        image = self.client.images.get(tag)
+        with self._lock:
+            tag_lock = self._tag_locks.setdefault(tag, threading.Lock())
+
+        with tag_lock:
+            with self._lock:
+                warm_container = self._containers.get(tag)
+                stale = warm_container is not None and (
+                    warm_container.image_id != image.id or warm_container.uses >= self.max_uses
+                )
+                if stale:
+                    del self._containers[tag]
+            if stale:
+                self.logger.debug(f"Replacing the warm container of {tag} after {warm_container.uses} uses")
+                self._remove(warm_container)
+
+            if warm_container is None or stale:
+                warm_container = self._start(tag, image)
+            with self._lock:
+                self._containers[tag] = warm_container
+                warm_container.uses += 1
+                warm_container.running.append(run)
+        return warm_container
+
+    def _start(self, tag: str, image) -> WarmContainer:
+        config = image.attrs.get("Config") or {}
+        container = self.client.containers.run(
+            tag,
+            entrypoint=DockerConstants.WARM_CONTAINER_IDLE_ENTRYPOINT,
+            command=[],
+            detach=True,
+            mem_limit=self.limits.mem_limit,
+            nano_cpus=self.limits.nano_cpus,
+            pids_limit=self.limits.pids_limit,
+        )
+        warm_container = WarmContainer(container, image.id, config.get("Entrypoint") or [], config.get("Cmd") or [])
+
+        try:
+            container.reload()
+            if container.status != "running":
+                raise DockerException(f"Idle container of {tag} exited with status {container.status}")
+        except DockerException:
+            self._remove(warm_container)
+            raise
+        self.logger.info(f"Started warm container for {tag}")
+        return warm_container
+
+    def _remove(self, warm_container: WarmContainer):
+        try:
+            warm_container.container.remove(force=True)
+        except DockerException as e:
+            self.logger.warning(f"Failed to remove warm container: {e}")
@@ -1,8 +1,10 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, Optional
 import os
 import shutil
 
+from src.constants import CacheConstants, DockerConstants
+
 class BuildContext(BaseModel):
     script_name: str
     script_path: str
@@ -16,9 +18,22 @@ class BuildContext(BaseModel):
         """Get the full path for the Dockerfile"""
         return os.path.join(self.get_context_directory(), "Dockerfile")
     
+    def get_optimization_report_path(self) -> str:
+        """Get the path of the comparison report of the optimized Dockerfile variants"""
+        return os.path.join(self.get_context_directory(), "optimization_report.md")
+
     def get_script_destination(self) -> str:
         """Get the destination path for the script"""
         return os.path.join(self.get_context_directory(), os.path.basename(self.script_path))
 
+    def get_manifest(self) -> Dict[str, str]:
+        """Map the files of the build context, other than the Dockerfile, to their source paths"""
+        return {os.path.basename(self.script_path): self.script_path}
+
+    def get_result_store_path(self) -> str:
+        """Get the path of the store of built images and test outcomes, shared by every script"""
+        directory = os.getenv(CacheConstants.RESULT_STORE_DIR_ENV_VAR, self.context_root)
+        return os.path.join(directory, CacheConstants.RESULT_STORE_FILENAME)
+
     def get_image_tag(self) -> str:
-        return f"script-container:{self.script_name}"
+        return f"{DockerConstants.IMAGE_REPOSITORY}:{self.script_name}"
@@ -0,0 +1,54 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class BuildStep(BaseModel):
+    number: int
+    instruction: str
+    duration_seconds: float = 0.0
+    cached: bool = False
+    log: List[str] = []
+
+
+class BuildResult(BaseModel):
+    tag: str
+    success: bool
+    image_id: Optional[str] = None
+    size: Optional[int] = None
+    duration_seconds: float = 0.0
+    steps: List[BuildStep] = []
+    error: Optional[str] = None
+    error_step: Optional[BuildStep] = None
+    error_log_tail: List[str] = []
+
+    def __bool__(self) -> bool:
+        return self.success
+
+    @property
+    def cache_hits(self) -> int:
+        return sum(1 for step in self.steps if step.cached)
+
+    @property
+    def cache_misses(self) -> int:
+        return sum(1 for step in self.steps if not step.cached)
+
+    def get_error_message(self) -> Optional[str]:
+        """Describe the failure by the failing step and its log tail, as handed to the LLM."""
+        if self.success:
+            return None
+        lines = []
+        if self.error_step:
+            lines.append(f"Step {self.error_step.number} failed: {self.error_step.instruction}")
+        lines.append(f"Error: {self.error}")
+        if self.error_log_tail:
+            lines.append("Log tail:")
+            lines.extend(self.error_log_tail)
+        return "\n".join(lines)
+
+
+class StoredImageResult(BaseModel):
+    """The image built from a Dockerfile/context/test command combination, and how its test went."""
+    key: str
+    image_id: Optional[str] = None
+    test_passed: Optional[bool] = None
+    test_error: Optional[str] = None
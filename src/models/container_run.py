@@ -0,0 +1,42 @@
+from pydantic import BaseModel
+from typing import Optional
+
+from src.constants import DockerConstants
+
+
+class ContainerLimits(BaseModel):
+    timeout_seconds: float = DockerConstants.TEST_TIMEOUT_SECONDS
+    mem_limit: str = DockerConstants.TEST_MEM_LIMIT
+    nano_cpus: int = DockerConstants.TEST_NANO_CPUS
+    pids_limit: int = DockerConstants.TEST_PIDS_LIMIT
+
+
+class ContainerRunResult(BaseModel):
+    tag: str
+    test_command: str
+    exit_code: Optional[int] = None
+    logs: str = ""
+    log_bytes: int = 0  # Bytes of output the command produced, of which `logs` keeps the start and end
+    captured_log_bytes: int = 0
+    duration_seconds: float = 0.0
+    timed_out: bool = False
+    oom_killed: bool = False
+    cancelled: bool = False  # Killed through `DockerManager.cancel_running`, e.g. once another candidate passed
+
+    def __bool__(self) -> bool:
+        return self.exit_code == 0 and not self.timed_out and not self.cancelled
+
+    def get_error_message(self) -> Optional[str]:
+        """Describe why the test run failed, as handed to the LLM."""
+        if self:
+            return None
+        if self.cancelled:
+            reason = "The test was cancelled before it finished."
+        elif self.timed_out:
+            reason = (f"The container did not finish within {self.duration_seconds:.0f} seconds and was killed. "
+                      f"Make sure the script does not wait for input or run forever.")
+        elif self.oom_killed:
+            reason = "The container was killed for exceeding its memory limit."
+        else:
+            reason = f"The container exited with code {self.exit_code}."
+        return f"{reason}\nTest command: {self.test_command}\nLogs:\n{self.logs}"
@@ -3,6 +3,7 @@ from typing import List, Optional
 import os
 from src.models.script_analysis import ScriptAnalysis
 from src.models.build_context import BuildContext
+from src.models.optimization import OptimizationReport
 
 
 class DockerfileGenerationRequest(BaseModel):
@@ -10,6 +11,7 @@ class DockerfileGenerationRequest(BaseModel):
     test_command: str
     build_context: BuildContext
     file_content: Optional[str] = None
+    optimization_report: Optional[OptimizationReport] = None
 
     def get_save_directory(self) -> str:
         """Determine the directory to save the Dockerfile."""
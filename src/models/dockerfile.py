@@ -0,0 +1,8 @@
+from pydantic import BaseModel
+
+
+class DockerfileInstruction(BaseModel):
+    instruction: str
+    arguments: str
+    line_number: int
+    raw: str
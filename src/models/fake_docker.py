@@ -0,0 +1,33 @@
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+
+from src.constants import FakeDockerConstants
+
+
+class FakeTiming(BaseModel):
+    """A simulated duration, drawn uniformly from `seconds - jitter` to `seconds + jitter`."""
+    seconds: float = 0.0
+    jitter: float = 0.0
+
+
+class FakeDockerConfig(BaseModel):
+    """Timings and failure distributions simulated by the fake Docker backend, all durations in seconds."""
+    seed: Optional[int] = None  # Fixes the drawn timings and failures, for repeatable benchmarks
+    time_scale: float = 1.0  # Every simulated duration is multiplied by this, e.g. 0.01 to run 100x faster
+    pull: FakeTiming = FakeTiming(seconds=5.0, jitter=2.0)
+    step: FakeTiming = FakeTiming(seconds=0.5)
+    run_step: FakeTiming = FakeTiming(seconds=10.0, jitter=5.0)  # RUN instructions, e.g. package installs
+    cached_step: FakeTiming = FakeTiming(seconds=0.05)
+    test: FakeTiming = FakeTiming(seconds=1.0, jitter=0.5)
+    pull_failure_rate: float = 0.0
+    build_failure_rate: float = 0.0  # Chance a build fails at one of its uncached steps
+    test_failure_rate: float = 0.0
+    test_timeout_rate: float = 0.0  # Chance a test hangs until it is killed
+    # Steps whose instruction contains any of these always fail, e.g. "apt-get install does-not-exist"
+    failing_instructions: List[str] = []
+    preloaded_images: List[str] = []  # Base images present without being pulled
+    base_image_bytes: Dict[str, int] = {}  # Size per base image, e.g. {"python:3.11-slim": 130000000}
+    default_base_image_bytes: int = FakeDockerConstants.DEFAULT_BASE_IMAGE_BYTES
+    layer_bytes: int = FakeDockerConstants.DEFAULT_LAYER_BYTES  # Size added by every step after FROM
+    test_output: str = "Test passed\n"
+    test_failure_output: str = "Traceback (most recent call last):\nError: simulated test failure\n"
@@ -0,0 +1,50 @@
+from pydantic import BaseModel
+from typing import List, Literal, Optional
+
+from src.constants import GCConstants
+
+
+GCItemKind = Literal["container", "image", "dangling image", "build context"]
+
+
+class GCPolicy(BaseModel):
+    """What to keep: anything older than `max_age_days` goes, then the least recently used beyond the limits."""
+    max_age_days: Optional[float] = GCConstants.DEFAULT_MAX_AGE_DAYS
+    max_images: Optional[int] = GCConstants.DEFAULT_MAX_IMAGES
+    max_image_bytes: Optional[int] = GCConstants.DEFAULT_MAX_IMAGE_BYTES
+    max_build_contexts: Optional[int] = GCConstants.DEFAULT_MAX_BUILD_CONTEXTS
+    dry_run: bool = False
+
+
+class GCItem(BaseModel):
+    kind: GCItemKind
+    name: str
+    size: Optional[int] = None
+    reason: str
+    error: Optional[str] = None  # Set if removing the item failed
+
+
+class GCReport(BaseModel):
+    dry_run: bool = False
+    items: List[GCItem] = []
+
+    @property
+    def reclaimed_bytes(self) -> int:
+        return sum(item.size or 0 for item in self.items if item.error is None)
+
+    @property
+    def failed_items(self) -> List[GCItem]:
+        return [item for item in self.items if item.error is not None]
+
+    def format(self) -> str:
+        """Render the collected items as a Markdown table."""
+        verb = "Would remove" if self.dry_run else "Removed"
+        lines = [f"{verb} {len(self.items) - len(self.failed_items)} item(s), "
+                 f"{self.reclaimed_bytes / 1_000_000:.1f} MB"]
+        if self.items:
+            lines += ["", "| Kind | Name | Size (MB) | Reason |", "| --- | --- | --- | --- |"]
+            for item in self.items:
+                size = f"{item.size / 1_000_000:.1f}" if item.size is not None else "-"
+                reason = f"{item.reason} (failed: {item.error})" if item.error else item.reason
+                lines.append(f"| {item.kind} | {item.name} | {size} | {reason} |")
+        return "\n".join(lines)
@@ -0,0 +1,36 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class ImageVariant(BaseModel):
+    name: str
+    dockerfile: str
+    passed: bool = False
+    size: Optional[int] = None
+    build_seconds: Optional[float] = None  # None when the image was reused rather than built
+    cached_steps: int = 0
+    error: Optional[str] = None
+
+
+class OptimizationReport(BaseModel):
+    goal: str
+    variants: List[ImageVariant] = []
+    selected: Optional[str] = None
+
+    def get_selected_variant(self) -> Optional[ImageVariant]:
+        return next((variant for variant in self.variants if variant.name == self.selected), None)
+
+    def format(self) -> str:
+        """Render the variants as a Markdown table, the selected one marked with an asterisk."""
+        lines = [
+            f"# Image {self.goal} optimization",
+            "",
+            "| Variant | Passed | Size (MB) | Build time (s) | Cached steps |",
+            "| --- | --- | --- | --- | --- |",
+        ]
+        for variant in self.variants:
+            name = f"{variant.name} *" if variant.name == self.selected else variant.name
+            size = f"{variant.size / 1_000_000:.1f}" if variant.size is not None else "-"
+            build_seconds = f"{variant.build_seconds:.1f}" if variant.build_seconds is not None else "reused"
+            lines.append(f"| {name} | {'yes' if variant.passed else 'no'} | {size} | {build_seconds} | {variant.cached_steps} |")
+        return "\n".join(lines)
@@ -0,0 +1,27 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+from src.constants import DockerBackendName, DockerConstants, GenerationConstants, HistoryMode, OptimizeGoal
+from src.models.container_run import ContainerLimits
+
+
+class RunOptions(BaseModel):
+    use_cache: bool = True
+    use_static_analysis: bool = True
+    token_budget: Optional[int] = None
+    cost_budget: Optional[float] = None
+    history_mode: HistoryMode = GenerationConstants.DEFAULT_HISTORY_MODE
+    stream: bool = False
+    use_templates: bool = True
+    in_memory_context: bool = True
+    normalize_dockerfile: bool = True
+    buildkit: bool = False
+    cache_from: List[str] = []
+    prefetch_base_image: bool = True
+    container_limits: ContainerLimits = ContainerLimits()
+    warm_containers: bool = False
+    memoize_results: bool = True
+    validate_dockerfile: bool = True
+    candidates: int = 1
+    optimize: OptimizeGoal = GenerationConstants.DEFAULT_OPTIMIZE_GOAL
+    docker_backend: DockerBackendName = DockerConstants.DEFAULT_BACKEND
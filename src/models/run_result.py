@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+from typing import Dict
+
+
+class RunResult(BaseModel):
+    success: bool
+    token_usage: Dict[str, float] = {}
+    stage_token_usage: Dict[str, Dict[str, float]] = {}
+
+    def __bool__(self) -> bool:
+        return self.success
@@ -6,5 +6,11 @@ class ScriptAnalysis(BaseModel):
     language: str
     version_requirements: dict
     system_dependencies: List[str]
+    package_dependencies: List[str] = []
     environment_variables: List[str]
     execution_pattern: dict
+
+
+class HeuristicScriptAnalysis(BaseModel):
+    analysis: ScriptAnalysis
+    confidence: float
@@ -0,0 +1,65 @@
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+
+from src.constants import TokenUsageConstants
+
+
+class TokenLedgerEntry(BaseModel):
+    stage: str
+    input_tokens: int = 0
+    output_tokens: int = 0
+    total_tokens: int = 0
+    cost: float = 0.0
+
+
+class TokenLedger(BaseModel):
+    max_total_tokens: Optional[int] = None
+    max_cost: Optional[float] = None
+    entries: List[TokenLedgerEntry] = []
+
+    def record(self, stage: str, token_usage: Dict[str, int], model_name: Optional[str] = None) -> TokenLedgerEntry:
+        """Add the token usage of a single LLM call to the ledger."""
+        pricing = TokenUsageConstants.PRICING_PER_MILLION_TOKENS.get(model_name, {})
+        input_tokens = token_usage.get("input_tokens", 0)
+        output_tokens = token_usage.get("output_tokens", 0)
+        entry = TokenLedgerEntry(
+            stage=stage,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            total_tokens=token_usage.get("total_tokens", input_tokens + output_tokens),
+            cost=(input_tokens * pricing.get("input", 0.0) + output_tokens * pricing.get("output", 0.0)) / 1_000_000,
+        )
+        self.entries.append(entry)
+        return entry
+
+    def get_totals(self) -> Dict[str, float]:
+        """Sum the token usage and cost of every recorded call."""
+        return self._sum(self.entries)
+
+    def get_stage_totals(self) -> Dict[str, Dict[str, float]]:
+        """Sum the token usage and cost per stage, in the order the stages were first seen."""
+        stages: Dict[str, List[TokenLedgerEntry]] = {}
+        for entry in self.entries:
+            stages.setdefault(entry.stage, []).append(entry)
+        return {stage: self._sum(entries) for stage, entries in stages.items()}
+
+    def is_budget_exceeded(self) -> bool:
+        """Check whether the run has used up its token or cost budget."""
+        totals = self.get_totals()
+        if self.max_total_tokens is not None and totals["total_tokens"] >= self.max_total_tokens:
+            return True
+        if self.max_cost is not None and totals["cost"] >= self.max_cost:
+            return True
+        return False
+
+    def reset(self):
+        self.entries = []
+
+    @staticmethod
+    def _sum(entries: List[TokenLedgerEntry]) -> Dict[str, float]:
+        return {
+            "input_tokens": sum(entry.input_tokens for entry in entries),
+            "output_tokens": sum(entry.output_tokens for entry in entries),
+            "total_tokens": sum(entry.total_tokens for entry in entries),
+            "cost": sum(entry.cost for entry in entries),
+        }
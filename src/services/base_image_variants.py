@@ -0,0 +1,62 @@
+import re
+from typing import List, Optional, Tuple
+
+from src.constants import GenerationConstants
+from src.services.dockerfile_parser import DockerfileParser
+
+
+class BaseImageVariants:
+    """
+    Rewrites the final stage of a Dockerfile onto smaller variants of its official base image.
+
+    `python:3.11` becomes `python:3.11-slim` and `python:3.11-alpine`, `debian:bookworm` becomes
+    `debian:bookworm-slim`. Only the base image changes, so whether a variant still works is
+    left to building and testing it.
+    """
+
+    FROM_PATTERN = re.compile(r'^(\s*FROM\s+(?:--platform=\S+\s+)?)(\S+)(.*)$', re.IGNORECASE)
+    OFFICIAL_PREFIXES = ("docker.io/library/", "library/")
+
+    def get_variants(self, content: str) -> List[Tuple[str, str]]:
+        """Return the name and content of every smaller base image variant of the Dockerfile."""
+        froms = [instruction for instruction in DockerfileParser.parse(content) if instruction.instruction == "FROM"]
+        if not froms:
+            return []
+
+        lines = content.split("\n")
+        index = froms[-1].line_number - 1
+        match = self.FROM_PATTERN.match(lines[index])
+        if not match:
+            return []
+
+        variants = []
+        for image in self._get_smaller_images(match.group(2)):
+            variant_lines = list(lines)
+            variant_lines[index] = f"{match.group(1)}{image}{match.group(3)}"
+            variants.append((image, "\n".join(variant_lines)))
+        return variants
+
+    def _get_smaller_images(self, image: str) -> List[str]:
+        # Digests pin an exact image, and stage names or private registries have no known variants
+        if "@" in image:
+            return []
+        prefix = next((prefix for prefix in self.OFFICIAL_PREFIXES if image.startswith(prefix)), "")
+        repository, _, tag = image[len(prefix):].partition(":")
+        suffixes = GenerationConstants.SMALLER_BASE_IMAGE_SUFFIXES.get(repository)
+        if not suffixes:
+            return []
+
+        tag_parts = tag.split("-") if tag else []
+        # Alpine is already the smallest variant there is
+        if "alpine" in tag_parts:
+            return []
+        version = tag_parts[0] if tag_parts and tag_parts[0] not in ("latest", *suffixes) else None
+        return [
+            f"{prefix}{repository}:{self._join(version, suffix)}"
+            for suffix in suffixes
+            if suffix not in tag_parts
+        ]
+
+    @staticmethod
+    def _join(version: Optional[str], suffix: str) -> str:
+        return f"{version}-{suffix}" if version else suffix
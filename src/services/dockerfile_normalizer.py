@@ -0,0 +1,152 @@
+import re
+import fnmatch
+import logging
+from typing import List, Optional
+
+from src.models.dockerfile import DockerfileInstruction
+from src.services.dockerfile_parser import DockerfileParser
+
+
+logger = logging.getLogger(__name__)
+
+
+class DockerfileNormalizer:
+    """
+    Rewrites a Dockerfile so that repeat builds reuse its expensive dependency layers.
+
+    Dependency installs placed after a COPY/ADD of the script are moved in front of it, so
+    editing the script, or retrying with a slightly different Dockerfile, does not invalidate
+    them. An install is only moved past files it does not name and that are not dependency
+    manifests. With BuildKit, pip, npm and Go installs also get a cache mount shared by every
+    build on the host.
+    """
+
+    INSTALL_PATTERN = re.compile(
+        r'\b(apt-get install|apk add|yum install|dnf install|pip3? install|npm (install|ci)|gem install|'
+        r'go (install|get|mod download))\b'
+    )
+    COPY_INSTRUCTIONS = {"COPY", "ADD"}
+    # Files package managers read implicitly, e.g. `npm ci` reads package-lock.json without naming it
+    DEPENDENCY_MANIFESTS = (
+        "package*.json", "npm-shrinkwrap.json", "yarn.lock", "pnpm-lock.yaml", "go.mod", "go.sum", "Gemfile*",
+        "*.gemspec", "requirements*.txt", "constraints*.txt", "pyproject.toml", "poetry.lock", "Pipfile*",
+        "setup.py", "setup.cfg", "Cargo.toml", "Cargo.lock", "composer.json", "composer.lock",
+    )
+    # Package managers whose caches can be shared through BuildKit cache mounts, with their cache directories
+    CACHE_MOUNTS = (
+        (re.compile(r'\bpip3? install\b'), ("/root/.cache/pip",)),
+        (re.compile(r'\bnpm (install|ci)\b'), ("/root/.npm",)),
+        (re.compile(r'\bgo (build|install|get|mod download)\b'), ("/root/.cache/go-build", "/go/pkg/mod")),
+    )
+    # Disabling the cache would make a cache mount pointless
+    NO_CACHE_FLAG_PATTERN = re.compile(r'\s--no-cache-dir\b')
+
+    def __init__(self, use_cache_mounts: bool = False):
+        self.use_cache_mounts = use_cache_mounts
+
+    def normalize(self, content: str) -> str:
+        """Return the normalized Dockerfile, or the content unchanged if there is nothing to improve."""
+        instructions = DockerfileParser.parse(content)
+        if not instructions:
+            return content
+
+        lines = content.split("\n")
+        blocks = self._split_blocks(lines, instructions)
+        suffix = lines[self._get_end_index(lines, instructions[-1].line_number - 1) + 1:]
+        entries = list(zip(instructions, blocks))
+
+        moved = self._move_installs_before_copies(entries)
+        if self.use_cache_mounts:
+            entries = [(instruction, self._add_cache_mounts(instruction, block)) for instruction, block in entries]
+
+        if moved:
+            logger.info(f"Moved {moved} dependency install(s) before the script COPY to reuse cached layers")
+        return "\n".join([line for _, block in entries for line in block] + suffix)
+
+    def _move_installs_before_copies(self, entries: list) -> int:
+        """Bubble every dependency install up past the COPY/ADD instructions it does not depend on."""
+        moved = 0
+        # Only the final stage, earlier stages may be copied from as a whole
+        stage_start = max(index for index, (instruction, _) in enumerate(entries) if instruction.instruction == "FROM")
+        for index in range(stage_start + 1, len(entries)):
+            instruction = entries[index][0]
+            if instruction.instruction != "RUN" or not self.INSTALL_PATTERN.search(instruction.arguments):
+                continue
+
+            position = index
+            while position - 1 > stage_start and self._can_move_before(instruction, entries[position - 1][0]):
+                entries[position - 1], entries[position] = entries[position], entries[position - 1]
+                position -= 1
+            if position != index:
+                moved += 1
+        return moved
+
+    def _can_move_before(self, install: DockerfileInstruction, copy: DockerfileInstruction) -> bool:
+        if copy.instruction not in self.COPY_INSTRUCTIONS:
+            return False
+        paths = self._get_copy_paths(copy)
+        if not paths or len(paths) < 2:
+            return False
+
+        *sources, destination = paths
+        for source in sources:
+            name = source.rstrip("/").rsplit("/", 1)[-1]
+            # Whole directories and globs may contain the files the install needs
+            if name in ("", ".", "..") or any(char in source for char in "*?["):
+                return False
+            if name in install.arguments or self._is_dependency_manifest(name):
+                return False
+
+        destination = destination.rstrip("/")
+        return destination in ("", ".") or destination not in install.arguments
+
+    def _is_dependency_manifest(self, name: str) -> bool:
+        return any(fnmatch.fnmatchcase(name, pattern) for pattern in self.DEPENDENCY_MANIFESTS)
+
+    @staticmethod
+    def _get_copy_paths(copy: DockerfileInstruction) -> Optional[List[str]]:
+        split = DockerfileParser.split_copy_arguments(copy.arguments)
+        if split is None:
+            return None
+        flags, paths = split
+        # Files copied from another stage or image may be what the install relies on
+        if any(flag.startswith("--from") for flag in flags):
+            return None
+        return paths
+
+    def _add_cache_mounts(self, instruction: DockerfileInstruction, block: List[str]) -> List[str]:
+        if instruction.instruction != "RUN" or instruction.arguments.startswith("--mount"):
+            return block
+
+        targets = [target for pattern, cache_targets in self.CACHE_MOUNTS if pattern.search(instruction.arguments)
+                   for target in cache_targets]
+        if not targets:
+            return block
+
+        mounts = " ".join(f"--mount=type=cache,target={target}" for target in targets)
+        # The keyword is on the first line of the block that is not a comment
+        index = next(index for index, line in enumerate(block) if line.strip()[:4].upper() == "RUN ")
+        block = [self.NO_CACHE_FLAG_PATTERN.sub("", line) for line in block]
+        keyword_position = block[index].upper().index("RUN ")
+        block[index] = f"{block[index][:keyword_position + 4]}{mounts} {block[index][keyword_position + 4:].lstrip()}"
+        return block
+
+    def _split_blocks(self, lines: List[str], instructions: List[DockerfileInstruction]) -> List[List[str]]:
+        """Split the lines into one block per instruction, each with the comments leading up to it."""
+        blocks = []
+        start = 0
+        for instruction in instructions:
+            end = self._get_end_index(lines, instruction.line_number - 1)
+            blocks.append(lines[start:end + 1])
+            start = end + 1
+        return blocks
+
+    @staticmethod
+    def _get_end_index(lines: List[str], index: int) -> int:
+        """Return the index of the last line of the instruction starting at the given index."""
+        while index < len(lines) - 1:
+            stripped = lines[index].strip()
+            if stripped and not stripped.startswith("#") and not stripped.endswith("\\"):
+                break
+            index += 1
+        return index
@@ -0,0 +1,219 @@
+import re
+import json
+import shlex
+import logging
+from typing import List, Optional, Tuple
+
+from src.models.dockerfile import DockerfileInstruction
+
+
+logger = logging.getLogger(__name__)
+
+
+class DockerfileStreamAbortedError(ValueError):
+    """Raised when a streamed completion is clearly not a valid Dockerfile."""
+
+
+class DockerfileParser:
+    """
+    Incremental Dockerfile parser.
+
+    Text can be fed in arbitrary chunks; every call returns the instructions completed by it.
+    Line continuations are joined, while comments and parser directives are skipped. The `escape`
+    directive changes the continuation character to a backtick, as it does for Docker. Heredoc
+    bodies (`RUN <<EOF`) belong to the instruction that opens them and are skipped.
+    """
+
+    DEFAULT_ESCAPE = "\\"
+    DIRECTIVE_PATTERN = re.compile(r'^#\s*([A-Za-z]\w*)\s*=\s*(\S*)\s*$')
+    HEREDOC_INSTRUCTIONS = {"RUN", "COPY", "ADD"}
+    # Heredocs continue until a line holding only the delimiter, a word that starts like an
+    # identifier, unlike the shift in `$((1<<2))`. Here-strings (`<<<`) are not heredocs.
+    HEREDOC_PATTERN = re.compile(r'(?<!<)<<-?\s*["\']?([A-Za-z_]\w*)["\']?')
+    ARITHMETIC_PATTERN = re.compile(r'\$\(\(.*?\)\)')
+
+    VALID_INSTRUCTIONS = {
+        "ADD", "ARG", "CMD", "COPY", "ENTRYPOINT", "ENV", "EXPOSE", "FROM", "HEALTHCHECK", "LABEL",
+        "MAINTAINER", "ONBUILD", "RUN", "SHELL", "STOPSIGNAL", "USER", "VOLUME", "WORKDIR",
+    }
+
+    def __init__(self):
+        self._buffer = ""
+        self._line_number = 0
+        self._pending: List[str] = []
+        self._pending_line_number: Optional[int] = None
+        self._escape = self.DEFAULT_ESCAPE
+        # Parser directives are only read before the first comment, blank line or instruction
+        self._reading_directives = True
+        # Delimiters of the heredocs opened by the last instruction, whose bodies follow in order
+        self._heredoc_delimiters: List[str] = []
+
+    @classmethod
+    def parse(cls, content: str) -> List[DockerfileInstruction]:
+        """Parse a complete Dockerfile."""
+        parser = cls()
+        return parser.feed(content) + parser.close()
+
+    def feed(self, text: str) -> List[DockerfileInstruction]:
+        """Consume a chunk of text and return the instructions it completed."""
+        self._buffer += text
+        *lines, self._buffer = self._buffer.split("\n")
+        instructions = []
+        for line in lines:
+            instruction = self._consume_line(line)
+            if instruction:
+                instructions.append(instruction)
+        return instructions
+
+    def close(self) -> List[DockerfileInstruction]:
+        """Flush whatever is left once the input is complete."""
+        instructions = []
+        if self._buffer:
+            instruction = self._consume_line(self._buffer)
+            self._buffer = ""
+            if instruction:
+                instructions.append(instruction)
+        if self._pending:
+            instructions.append(self._build_instruction())
+        return instructions
+
+    @staticmethod
+    def split_copy_arguments(arguments: str) -> Optional[Tuple[List[str], List[str]]]:
+        """
+        Split the arguments of a COPY/ADD instruction into its flags and paths, the last path being the destination.
+
+        :return: The flags and the paths, or None if the arguments cannot be parsed
+        """
+        try:
+            tokens = shlex.split(arguments)
+        except ValueError:
+            return None
+        flags = [token for token in tokens if token.startswith("--")]
+        paths = [token for token in tokens if not token.startswith("--")]
+        if paths and paths[0].startswith("["):
+            try:
+                paths = json.loads(" ".join(paths))
+            except ValueError:
+                return None
+        return flags, paths
+
+    def _consume_line(self, line: str) -> Optional[DockerfileInstruction]:
+        self._line_number += 1
+        stripped = line.strip()
+
+        if self._heredoc_delimiters:
+            if stripped == self._heredoc_delimiters[0]:
+                self._heredoc_delimiters.pop(0)
+            return None
+
+        if self._reading_directives:
+            directive = self.DIRECTIVE_PATTERN.match(stripped)
+            if directive and directive.group(1).lower() == "escape" and directive.group(2) in ("\\", "`"):
+                self._escape = directive.group(2)
+            self._reading_directives = directive is not None
+
+        # Comments are dropped, including those interleaved with continuation lines
+        if not stripped or stripped.startswith("#"):
+            return None
+
+        if not self._pending:
+            self._pending_line_number = self._line_number
+        if stripped.endswith(self._escape):
+            self._pending.append(stripped[:-1].strip())
+            return None
+
+        self._pending.append(stripped)
+        return self._build_instruction()
+
+    def _build_instruction(self) -> DockerfileInstruction:
+        raw = " ".join(part for part in self._pending if part)
+        keyword, _, arguments = raw.partition(" ")
+        instruction = DockerfileInstruction(
+            instruction=keyword.upper(),
+            arguments=arguments.strip(),
+            line_number=self._pending_line_number,
+            raw=raw,
+        )
+        self._pending = []
+        self._pending_line_number = None
+        if instruction.instruction in self.HEREDOC_INSTRUCTIONS:
+            self._heredoc_delimiters = self.HEREDOC_PATTERN.findall(self.ARITHMETIC_PATTERN.sub("", arguments))
+        return instruction
+
+
+class DockerfileStreamReader:
+    """
+    Reads a Dockerfile from a streamed LLM completion.
+
+    Markdown fences around the Dockerfile are dropped and anything after the closing fence is
+    ignored. The stream is aborted as soon as it starts with something other than a Dockerfile
+    or contains an unknown instruction, so a bad completion does not have to finish first.
+    """
+
+    FIRST_INSTRUCTIONS = {"FROM", "ARG"}
+
+    def __init__(self):
+        self.parser = DockerfileParser()
+        self.instructions: List[DockerfileInstruction] = []
+        self.finished = False
+        self._lines: List[str] = []
+        self._buffer = ""
+        self._inside_fence = False
+
+    @property
+    def content(self) -> str:
+        return "\n".join(self._lines).strip()
+
+    def feed(self, chunk: str) -> List[DockerfileInstruction]:
+        """Consume a streamed chunk and return the instructions it completed."""
+        self._buffer += chunk
+        *lines, self._buffer = self._buffer.split("\n")
+        instructions = []
+        for line in lines:
+            instructions.extend(self._consume_line(line))
+        return instructions
+
+    def close(self) -> List[DockerfileInstruction]:
+        """Flush the remaining text and make sure a Dockerfile was actually streamed."""
+        instructions = []
+        if self._buffer:
+            instructions.extend(self._consume_line(self._buffer))
+            self._buffer = ""
+        if not self.finished:
+            instructions.extend(self._check(self.parser.close()))
+        if not self.instructions:
+            raise DockerfileStreamAbortedError("The response did not contain any Dockerfile instructions")
+        return instructions
+
+    def _consume_line(self, line: str) -> List[DockerfileInstruction]:
+        if self.finished:
+            return []
+
+        stripped = line.strip()
+        if stripped.startswith("```"):
+            if not self._lines and not self._inside_fence:
+                self._inside_fence = True
+            else:
+                # The closing fence ends the Dockerfile, any explanation after it is ignored
+                self.finished = True
+                return self._check(self.parser.close())
+            return []
+        if not self._lines and not stripped:
+            return []
+
+        self._lines.append(line)
+        return self._check(self.parser.feed(line + "\n"))
+
+    def _check(self, instructions: List[DockerfileInstruction]) -> List[DockerfileInstruction]:
+        for instruction in instructions:
+            if not self.instructions and instruction.instruction not in self.FIRST_INSTRUCTIONS:
+                raise DockerfileStreamAbortedError(
+                    f"Line {instruction.line_number}: expected the Dockerfile to start with FROM, got: {instruction.raw[:80]}"
+                )
+            if instruction.instruction not in DockerfileParser.VALID_INSTRUCTIONS:
+                raise DockerfileStreamAbortedError(
+                    f"Line {instruction.line_number}: unknown Dockerfile instruction: {instruction.raw[:80]}"
+                )
+            logger.debug(f"Streamed Dockerfile instruction: {instruction.raw}")
+            self.instructions.append(instruction)
+        return instructions
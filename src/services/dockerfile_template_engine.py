@@ -0,0 +1,165 @@
+import os
+import re
+import json
+import logging
+from typing import Optional
+
+from src.models.script_analysis import ScriptAnalysis
+
+
+logger = logging.getLogger(__name__)
+
+
+class DockerfileTemplateEngine:
+    """
+    Renders a Dockerfile for common script types straight from a `ScriptAnalysis`.
+
+    The generated Dockerfiles for these scripts are nearly identical: a base image for the
+    language, the system and package dependencies, the script and an entrypoint. Rendering
+    them locally takes microseconds, so the LLM is only needed when the template fails.
+    """
+
+    LANGUAGE_ALIASES = {
+        'python': 'python',
+        'python3': 'python',
+        'bash': 'bash',
+        'shell': 'bash',
+        'sh': 'bash',
+        'ruby': 'ruby',
+        'go': 'go',
+        'golang': 'go',
+        'javascript': 'javascript',
+        'js': 'javascript',
+        'node': 'javascript',
+        'node.js': 'javascript',
+        'nodejs': 'javascript',
+    }
+    BASE_IMAGES = {
+        'python': ('python', '3.11'),
+        'bash': ('debian', 'bookworm'),
+        'ruby': ('ruby', '3.2'),
+        'go': ('golang', '1.22'),
+        'javascript': ('node', '20'),
+    }
+    # Versions a base image is picked from when the analysis only bounds the version, oldest first
+    SUPPORTED_VERSIONS = {
+        'python': ('3.8', '3.9', '3.10', '3.11', '3.12'),
+        'ruby': ('3.0', '3.1', '3.2', '3.3'),
+        'go': ('1.20', '1.21', '1.22'),
+        'javascript': ('16', '18', '20', '22'),
+    }
+    # Keys the analysis may use for the language version, checked in order
+    VERSION_KEYS = {
+        'python': ('python', 'python3'),
+        'ruby': ('ruby',),
+        'go': ('go', 'golang'),
+        'javascript': ('node', 'nodejs', 'node.js', 'javascript'),
+    }
+    PACKAGE_INSTALL_COMMANDS = {
+        'python': 'pip install --no-cache-dir {packages}',
+        'ruby': 'gem install {packages}',
+        'javascript': 'npm install --omit=dev {packages}',
+    }
+    INTERPRETERS = {'python': 'python', 'bash': 'bash', 'ruby': 'ruby', 'javascript': 'node'}
+    APT_PACKAGE_PATTERN = re.compile(r'^[a-z0-9][a-z0-9+.-]+$')
+    # Operators that pin a version rather than set a lower bound
+    PINNING_OPERATORS = ('==', '~=', '~', '^', '=')
+    LOWER_BOUND_PATTERN = re.compile(r'\+|higher|later|above|newer|or greater', re.IGNORECASE)
+    UPPER_BOUND_PATTERN = re.compile(r'<(=?)\s*(\d+(?:\.\d+)*)')
+    MINIMUM_PATTERN = re.compile(r'>(=?)\s*(\d+(?:\.\d+)*)')
+    WORKDIR = '/app'
+
+    def render(self, analysis: ScriptAnalysis, script_filename: str) -> Optional[str]:
+        """Render a Dockerfile for the analysis, or return None when the script is not supported."""
+        language = self.LANGUAGE_ALIASES.get(analysis.language.lower().strip())
+        if not language:
+            logger.info(f"No Dockerfile template for language: {analysis.language}")
+            return None
+        # Third-party Go packages need a go.mod, which the build context does not have
+        if language == 'go' and analysis.package_dependencies:
+            return None
+
+        system_dependencies = [dependency for dependency in analysis.system_dependencies
+                               if self.APT_PACKAGE_PATTERN.match(dependency)]
+        if len(system_dependencies) != len(analysis.system_dependencies):
+            logger.info(f"Unsupported system dependencies for a template: {analysis.system_dependencies}")
+            return None
+
+        base_image = self.get_base_image(language, analysis.version_requirements)
+        if not base_image:
+            logger.info(f"No supported {language} version matches: {analysis.version_requirements}")
+            return None
+
+        lines = [f"FROM {base_image}", ""]
+        if system_dependencies:
+            lines += [
+                "RUN apt-get update \\",
+                f"    && apt-get install -y --no-install-recommends {' '.join(system_dependencies)} \\",
+                "    && rm -rf /var/lib/apt/lists/*",
+                "",
+            ]
+
+        lines += [f"WORKDIR {self.WORKDIR}", ""]
+        if analysis.package_dependencies and language in self.PACKAGE_INSTALL_COMMANDS:
+            packages = ' '.join(analysis.package_dependencies)
+            lines += [f"RUN {self.PACKAGE_INSTALL_COMMANDS[language].format(packages=packages)}", ""]
+
+        script_path = f"{self.WORKDIR}/{script_filename}"
+        lines.append(f"COPY {script_filename} {script_path}")
+        if language == 'go':
+            binary_path = f"{self.WORKDIR}/{os.path.splitext(script_filename)[0]}"
+            lines.append(f"RUN go build -o {binary_path} {script_path}")
+            entrypoint = [binary_path]
+        else:
+            entrypoint = [self.INTERPRETERS[language], script_path]
+        lines.append(f"ENTRYPOINT {json.dumps(entrypoint)}")
+        return "\n".join(lines) + "\n"
+
+    def predict_base_image(self, analysis: ScriptAnalysis) -> Optional[str]:
+        """Return the base image a Dockerfile for the analysis most likely starts from."""
+        language = self.LANGUAGE_ALIASES.get(analysis.language.lower().strip())
+        if not language:
+            return None
+        return self.get_base_image(language, analysis.version_requirements)
+
+    def get_base_image(self, language: str, version_requirements: dict) -> Optional[str]:
+        """
+        Pick the base image for the language, honouring a pinned version when there is one.
+
+        :return: The base image, or None if the version is capped below every supported version
+        """
+        image, default_tag = self.BASE_IMAGES[language]
+        for key in self.VERSION_KEYS.get(language, ()):
+            requirement = str(version_requirements.get(key, '')).strip()
+            if self.UPPER_BOUND_PATTERN.search(requirement):
+                version = self._get_bounded_version(language, requirement, default_tag)
+                return f"{image}:{version}" if version else None
+            if self.LOWER_BOUND_PATTERN.search(requirement):
+                continue
+            if requirement.startswith(self.PINNING_OPERATORS) or re.match(r'^\d', requirement):
+                version = re.search(r'\d+(\.\d+)?', requirement)
+                if version:
+                    return f"{image}:{version.group(0)}"
+        return f"{image}:{default_tag}"
+
+    def _get_bounded_version(self, language: str, requirement: str, default_tag: str) -> Optional[str]:
+        """Return the default version if it is within the bounds, else the highest supported one that is."""
+        def matches(version: str) -> bool:
+            parsed = self._parse_version(version)
+            for inclusive, bound in self.UPPER_BOUND_PATTERN.findall(requirement):
+                if not (parsed <= self._parse_version(bound) if inclusive else parsed < self._parse_version(bound)):
+                    return False
+            for inclusive, bound in self.MINIMUM_PATTERN.findall(requirement):
+                # A minimum of 3.9.2 is met by the 3.9 image, which runs the latest patch release
+                minimum = self._parse_version(bound)[:len(parsed)]
+                if not (parsed >= minimum if inclusive else parsed > minimum):
+                    return False
+            return True
+
+        if matches(default_tag):
+            return default_tag
+        return next((version for version in reversed(self.SUPPORTED_VERSIONS.get(language, ())) if matches(version)), None)
+
+    @staticmethod
+    def _parse_version(version: str) -> tuple:
+        return tuple(int(part) for part in version.split('.'))
@@ -0,0 +1,98 @@
+import fnmatch
+import logging
+import posixpath
+from typing import Iterable, List, Optional
+
+from src.models.dockerfile import DockerfileInstruction
+from src.services.dockerfile_parser import DockerfileParser
+
+
+logger = logging.getLogger(__name__)
+
+
+class DockerfileValidator:
+    """
+    Checks a Dockerfile for mistakes that would fail the build, without calling Docker.
+
+    Leftover markdown fences, unknown instructions, a missing FROM and COPY/ADD sources that
+    are not in the build context are all reported in one go, so the LLM can fix them before
+    paying for a build.
+    """
+
+    FENCE_PREFIX = "```"
+    COPY_INSTRUCTIONS = {"COPY", "ADD"}
+    URL_PREFIXES = ("http://", "https://", "git@")
+
+    def __init__(self, context_files: Iterable[str]):
+        """
+        :param context_files: Paths of the files in the build context, relative to its root
+        """
+        self.context_files = {posixpath.normpath(name) for name in context_files}
+
+    def validate(self, content: str) -> List[str]:
+        """Return a description of every problem found, empty if the Dockerfile looks buildable."""
+        errors = []
+        for line_number, line in enumerate(content.split("\n"), start=1):
+            if line.strip().startswith(self.FENCE_PREFIX):
+                errors.append(f"Line {line_number}: remove the markdown code fence, only the Dockerfile itself is expected")
+
+        instructions = DockerfileParser.parse(content)
+        instructions = [i for i in instructions if not i.raw.startswith(self.FENCE_PREFIX)]
+        if not instructions:
+            return errors + ["The Dockerfile does not contain any instructions"]
+
+        first = next((i for i in instructions if i.instruction != "ARG"), None)
+        if first is None or first.instruction != "FROM":
+            errors.append("The Dockerfile must start with a FROM instruction (optionally preceded by ARG)")
+
+        for instruction in instructions:
+            if instruction.instruction not in DockerfileParser.VALID_INSTRUCTIONS:
+                errors.append(f"Line {instruction.line_number}: unknown instruction: {instruction.raw[:80]}")
+            elif instruction.instruction in self.COPY_INSTRUCTIONS:
+                errors.extend(self._validate_copy(instruction))
+
+        if errors:
+            logger.info(f"Dockerfile failed validation with {len(errors)} error(s)")
+        return errors
+
+    def _validate_copy(self, instruction: DockerfileInstruction) -> List[str]:
+        split = DockerfileParser.split_copy_arguments(instruction.arguments)
+        if split is None:
+            return []
+        flags, paths = split
+        if len(paths) < 2:
+            return [f"Line {instruction.line_number}: {instruction.instruction} needs at least a source and a destination"]
+        # Sources of other stages and images are not in the build context
+        if any(flag.startswith("--from") for flag in flags):
+            return []
+
+        errors = []
+        for source in paths[:-1]:
+            error = self._validate_source(source)
+            if error:
+                errors.append(f"Line {instruction.line_number}: {error}")
+        return errors
+
+    def _validate_source(self, source: str) -> Optional[str]:
+        # URLs, and paths built from variables, cannot be checked locally. Heredocs are inline files.
+        if source.startswith(self.URL_PREFIXES) or source.startswith("<<") or "$" in source:
+            return None
+        path = posixpath.normpath(source.lstrip("/"))
+        if path == ".":
+            return None
+        if path == ".." or path.startswith("../"):
+            return f"{source} is outside of the build context"
+
+        candidates = self.context_files | {parent for name in self.context_files for parent in self._get_parents(name)}
+        if any(fnmatch.fnmatchcase(candidate, path) for candidate in candidates):
+            return None
+        return f"{source} is not in the build context, which only contains: {', '.join(sorted(self.context_files))}"
+
+    @staticmethod
+    def _get_parents(name: str) -> List[str]:
+        parents = []
+        while "/" in name:
+            name = name.rsplit("/", 1)[0]
+            parents.append(name)
+        return parents
+
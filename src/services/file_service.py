@@ -1,11 +1,18 @@
+import os
+import time
+import logging
+from typing import List, Optional
+
 from src.core.file_interface import FileInterface
 from src.models.build_context import BuildContext
 from src.models.docker_file_generation import DockerfileGenerationRequest
+from src.models.garbage_collection import GCItem, GCPolicy
 
 
 class FileService:
     def __init__(self):
         self.file_interface = FileInterface()
+        self.logger = logging.getLogger(__name__)
 
     def prepare_build_context(self, build_context: BuildContext):
         """Prepare the build context directory and copy the script."""
@@ -18,3 +25,48 @@ class FileService:
         dockerfile_path = request.build_context.get_dockerfile_path()
         self.file_interface.write_file(dockerfile_path, request.file_content)
         return dockerfile_path
+
+    def save_optimization_report(self, request: DockerfileGenerationRequest) -> str:
+        """Save the comparison report of the optimized Dockerfile variants."""
+        report_path = request.build_context.get_optimization_report_path()
+        self.file_interface.write_file(report_path, request.optimization_report.format())
+        return report_path
+
+    def collect_garbage(self, context_root: str, policy: GCPolicy, now: Optional[float] = None) -> List[GCItem]:
+        """
+        Remove stale build context directories, most recently used first kept, according to the policy.
+
+        :return: What was removed, or only would be with `policy.dry_run`
+        """
+        now = now or time.time()
+        if not os.path.isdir(context_root):
+            return []
+
+        contexts = []
+        for name in os.listdir(context_root):
+            directory = os.path.join(context_root, name)
+            # Files such as the result store are shared by every context
+            if os.path.isdir(directory) and not os.path.islink(directory):
+                size, modified = self.file_interface.get_directory_stats(directory)
+                contexts.append((modified, size, directory))
+        contexts.sort(reverse=True)
+
+        items = []
+        for index, (modified, size, directory) in enumerate(contexts):
+            age = now - modified
+            if policy.max_age_days is not None and age > policy.max_age_days * 86400:
+                reason = f"unused for {age / 86400:.1f} days"
+            elif policy.max_build_contexts is not None and index >= policy.max_build_contexts:
+                reason = f"beyond the {policy.max_build_contexts} most recently used build contexts"
+            else:
+                continue
+
+            item = GCItem(kind="build context", name=directory, size=size, reason=reason)
+            if not policy.dry_run:
+                try:
+                    self.file_interface.remove_directory(directory)
+                except OSError as e:
+                    item.error = str(e)
+                    self.logger.warning(f"Failed to remove build context {directory}: {e}")
+            items.append(item)
+        return items
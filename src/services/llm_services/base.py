@@ -1,16 +1,50 @@
 from abc import ABC, abstractmethod
 import logging
-from typing import List
+import uuid
+from typing import List, Optional
 from langchain_core.tools import BaseTool
 
 from src.core.llm_interface import LLMProvider
+from src.core.llm_cache import LLMResponseCache
+from src.core.llm_provider_pool import LLMProviderPool
+from src.models.token_ledger import TokenLedger
 
 
 class LLMService(ABC):
-    def __init__(self, llm_provider: type[LLMProvider], tools: List[BaseTool] = None):
-        self.llm = llm_provider(tools=tools or [])
+    # Only services whose responses depend solely on the prompt may be served from the cache
+    cacheable: bool = False
+    # Name under which the token usage of this service is recorded in the ledger
+    stage_name: str = "llm"
+
+    def __init__(
+            self,
+            llm_provider: type[LLMProvider],
+            tools: List[BaseTool] = None,
+            cache: Optional[LLMResponseCache] = None,
+            ledger: Optional[TokenLedger] = None,
+    ):
+        self.llm_provider = llm_provider
+        self.tools = tools
+        self._llm: Optional[LLMProvider] = None
+        self.thread_id = str(uuid.uuid4())
+        self.cache = cache if self.cacheable else None
+        self.ledger = ledger
         self.logger = logging.getLogger(__name__)
 
+    @property
+    def llm(self) -> LLMProvider:
+        """The pooled provider, created on first use so runs answered locally never build one."""
+        if self._llm is None:
+            self._llm = LLMProviderPool.get_provider(self.llm_provider, tools=self.tools)
+        # The thread changes between conversations, and the pooled provider may predate these tools
+        self._llm.bind_thread_tools(self.thread_id, self.tools)
+        return self._llm
+
+    def _release_thread(self):
+        """Drop this service's conversation from the pooled provider, if it ever used one."""
+        if self._llm is not None:
+            self._llm.release_thread(self.thread_id)
+
     @abstractmethod
     def _get_system_message(self) -> str:
         """Returns the system message for the LLM"""
@@ -26,13 +60,71 @@ class LLMService(ABC):
         """Parses the LLM response"""
         pass
 
-    def _execute(self, *args, system_message=True, **kwargs):
+    def _execute(self, *args, system_message=True, stage: Optional[str] = None, **kwargs):
         """Execute the LLM tool with error handling"""
         try:
             prompt = self._get_prompt(*args, **kwargs)
             system_message = self._get_system_message() if system_message else None
-            response = self.llm.generate_response(prompt, system_message)
-            return self._parse_response(response)
+            cache_key = self._get_cache_key(prompt, system_message)
+            response = self._get_cached_response(cache_key)
+            if response is not None:
+                return self._parse_response(response)
+            response = self.llm.generate_response(prompt, system_message, thread_id=self.thread_id)
+            self._record_token_usage(stage or self.stage_name)
+            # Only well-formed responses are cached, a malformed one would be replayed on every run
+            result = self._parse_response(response)
+            self._store_cached_response(cache_key, response)
+            return result
         except Exception as e:
             self.logger.error(f"Error in {self.__class__.__name__}: {e}")
-            raise 
\ No newline at end of file
+            raise
+
+    async def _aexecute(self, *args, system_message=True, stage: Optional[str] = None, **kwargs):
+        """Asynchronous counterpart of `_execute`"""
+        try:
+            prompt = self._get_prompt(*args, **kwargs)
+            system_message = self._get_system_message() if system_message else None
+            cache_key = self._get_cache_key(prompt, system_message)
+            response = self._get_cached_response(cache_key)
+            if response is not None:
+                return self._parse_response(response)
+            response = await self.llm.agenerate_response(prompt, system_message, thread_id=self.thread_id)
+            self._record_token_usage(stage or self.stage_name)
+            # Only well-formed responses are cached, a malformed one would be replayed on every run
+            result = self._parse_response(response)
+            self._store_cached_response(cache_key, response)
+            return result
+        except Exception as e:
+            self.logger.error(f"Error in {self.__class__.__name__}: {e}")
+            raise
+
+    def _record_token_usage(self, stage: str, llm: Optional[LLMProvider] = None, thread_id: Optional[str] = None):
+        if self.ledger is None:
+            return
+        llm = llm or self.llm
+        token_usage = llm.get_token_usage(thread_id or self.thread_id)
+        self.ledger.record(stage, token_usage, model_name=getattr(llm, "model_name", None))
+
+    def _get_cache_key(self, prompt: str, system_message: Optional[str]) -> Optional[str]:
+        if not self.cache:
+            return None
+        # Pooled providers use the class defaults, so a cache hit does not need to build one
+        return self.cache.build_key(
+            prompt=prompt,
+            system_message=system_message,
+            provider_name=self.llm_provider.__name__,
+            model_name=getattr(self.llm_provider, "default_model_name", None),
+            temperature=getattr(self.llm_provider, "default_temperature", None),
+        )
+
+    def _get_cached_response(self, cache_key: Optional[str]) -> Optional[str]:
+        if not cache_key:
+            return None
+        response = self.cache.get(cache_key)
+        if response is not None:
+            self.logger.info(f"Using cached LLM response for {self.__class__.__name__}")
+        return response
+
+    def _store_cached_response(self, cache_key: Optional[str], response: str):
+        if cache_key:
+            self.cache.set(cache_key, response)
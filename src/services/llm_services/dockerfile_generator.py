@@ -1,24 +1,52 @@
 from src.core.llm_interface import LLMProvider
+from src.core.llm_provider_pool import LLMProviderPool
 from src.services.llm_services.base import LLMService
 from src.models.docker_file_generation import DockerfileGenerationRequest
-from src.constants import PromptConstants, MAX_GENERATION_ATTEMPTS
+from src.constants import PromptConstants, GenerationConstants, HistoryMode, OptimizeGoal, MAX_GENERATION_ATTEMPTS
+from src.models.optimization import ImageVariant, OptimizationReport
+from src.models.token_ledger import TokenLedger
 import os
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Optional, Tuple
 
+from src.services.base_image_variants import BaseImageVariants
+from src.services.dockerfile_parser import DockerfileStreamReader, DockerfileStreamAbortedError
+from src.services.dockerfile_normalizer import DockerfileNormalizer
+from src.services.dockerfile_template_engine import DockerfileTemplateEngine
 from src.services.tool_services.build_image import BuildImageTool
 from src.services.tool_services.test_container import TestContainerTool
 
 
 class DockerfileGenerator(LLMService):
+    stage_name = "generation"
+
     def __init__(
             self,
             llm_provider: type[LLMProvider],
             build_image_tool: BuildImageTool,
             test_container_tool: TestContainerTool,
+            ledger: Optional[TokenLedger] = None,
+            history_mode: HistoryMode = GenerationConstants.DEFAULT_HISTORY_MODE,
+            streaming: bool = False,
+            use_templates: bool = True,
+            normalizer: Optional[DockerfileNormalizer] = None,
+            candidates: int = 1,
+            max_concurrent_builds: int = GenerationConstants.MAX_CONCURRENT_CANDIDATE_BUILDS,
+            optimize: OptimizeGoal = GenerationConstants.DEFAULT_OPTIMIZE_GOAL,
     ):
         self.build_image_tool = build_image_tool
         self.test_container_tool = test_container_tool
         self.max_attempts = MAX_GENERATION_ATTEMPTS  # Set the maximum attempts
-        super().__init__(llm_provider, tools=[build_image_tool, test_container_tool])
+        self.history_mode = history_mode
+        self.streaming = streaming
+        self.template_engine = DockerfileTemplateEngine() if use_templates else None
+        self.normalizer = normalizer
+        self.candidates = candidates
+        self.max_concurrent_builds = max_concurrent_builds
+        self.optimize = optimize
+        super().__init__(llm_provider, tools=[build_image_tool, test_container_tool], ledger=ledger)
 
     def _get_system_message(self) -> str:
         return PromptConstants.SYSTEM_MESSAGE_DOCKERFILE_GENERATOR
@@ -29,45 +57,342 @@ class DockerfileGenerator(LLMService):
             script_name: str,
             test_command: str,
             error=None,
+            previous_dockerfile: Optional[str] = None,
+            error_trail: Optional[List[str]] = None,
             *_, **__,
     ) -> str:
-        if error:
-            return PromptConstants.PROMPT_DOCKERFILE_ERROR.format(error=error)
-
         script_filename = os.path.basename(script_name)
-        return PromptConstants.PROMPT_DOCKERFILE_GENERATOR.format(
+        requirements_prompt = PromptConstants.PROMPT_DOCKERFILE_GENERATOR.format(
             requirements=script_analysis.model_dump_json(),
             script_filename=script_filename,
             command=test_command,
         )
 
+        if error and error_trail is not None:
+            # Compact mode starts a fresh conversation, so restate everything the model needs
+            return PromptConstants.PROMPT_DOCKERFILE_COMPACT_RETRY.format(
+                requirements_prompt=requirements_prompt.strip(),
+                dockerfile=previous_dockerfile,
+                error_trail=self._summarise_errors(error_trail),
+            )
+        if error:
+            return PromptConstants.PROMPT_DOCKERFILE_ERROR.format(error=error)
+
+        return requirements_prompt
+
+    @staticmethod
+    def _summarise_errors(error_trail: List[str]) -> str:
+        """Keep the tail of the latest error and a one-line summary of the few before it."""
+        recent_errors = error_trail[-GenerationConstants.MAX_ERROR_TRAIL_ENTRIES:]
+        first_attempt = len(error_trail) - len(recent_errors) + 1
+        lines = []
+        for attempt, error in enumerate(recent_errors[:-1], start=first_attempt):
+            first_line = error.strip().splitlines()[0] if error.strip() else ""
+            lines.append(f"Attempt {attempt}: {first_line[:GenerationConstants.MAX_SUMMARISED_ERROR_CHARS]}")
+        latest_error = recent_errors[-1].strip()[-GenerationConstants.MAX_LATEST_ERROR_CHARS:]
+        lines.append(f"Attempt {len(error_trail)}: {latest_error}")
+        return "\n".join(lines)
+
     def _parse_response(self, response: str) -> str:
         """Clean excess markdown from the response"""
         cleaned_response = response.strip('```dockerfile\n').strip('```').strip()
         return cleaned_response
 
     def generate_dockerfile(self, request: DockerfileGenerationRequest) -> DockerfileGenerationRequest:
+        passed = self._generate_passing_dockerfile(request)
+        if passed and self.optimize == "size":
+            self._optimize_size(request)
+        return request
+
+    def _generate_passing_dockerfile(self, request: DockerfileGenerationRequest) -> bool:
+        """Set the Dockerfile of the request, returning whether it builds and passes the test command."""
+        template_content = self._generate_from_template(request)
+        if template_content:
+            request.file_content = template_content
+            return True
+
         first_run = True
         error = False
         dockerfile_content = None
         attempts = 0  # Initialize attempt counter
+        compact_history = self.history_mode == "compact"
+        error_trail = []
+        # Set when the conversation has to restate the requirements, as the previous attempt was not made in it
+        fresh_thread = False
 
-        while (first_run or error) and attempts < self.max_attempts:
-            dockerfile_content = self._execute(
-                script_analysis=request.script_analysis,
-                script_name=request.build_context.script_name,
-                test_command=request.test_command,
-                error=error,
-                system_message=first_run,
-            )
+        if self.candidates > 1:
+            candidate_content, candidate_error = self._generate_candidates(request)
+            if not candidate_error:
+                request.file_content = candidate_content
+                return True
+            attempts = 1
+            if candidate_content is not None:
+                # Carry on one attempt at a time, fixing the most promising candidate
+                dockerfile_content, error = candidate_content, candidate_error
+                first_run, fresh_thread = False, True
+                error_trail.append(error)
 
-            first_run = False
-            error = self.build_image_tool._run(dockerfile_content)
+        try:
+            while (first_run or error) and attempts < self.max_attempts:
+                if self.ledger is not None and self.ledger.is_budget_exceeded():
+                    self.logger.warning(f"Token budget exhausted after {attempts} attempts, stopping generation")
+                    break
 
-            if not error:
-                error = self.test_container_tool._run()
+                if compact_history and not first_run:
+                    self._start_new_thread()
+
+                execute = self._execute_streaming if self.streaming else self._execute
+                result = execute(
+                    script_analysis=request.script_analysis,
+                    script_name=request.build_context.script_name,
+                    test_command=request.test_command,
+                    error=error,
+                    previous_dockerfile=dockerfile_content,
+                    error_trail=error_trail if compact_history or fresh_thread else None,
+                    system_message=first_run or compact_history or fresh_thread,
+                    stage=f"{self.stage_name}_attempt_{attempts + 1}",
+                )
+                dockerfile_content, error = result if self.streaming else (result, None)
+
+                first_run = False
+                fresh_thread = False
+                if not error:
+                    dockerfile_content = self._normalize(dockerfile_content)
+                    error = self.build_image_tool._run(dockerfile_content)
 
-            attempts += 1  # Increment the attempt counter
+                if not error:
+                    error = self.test_container_tool._run()
+
+                if error:
+                    error_trail.append(error)
+
+                attempts += 1  # Increment the attempt counter
+        finally:
+            # The provider is shared, so drop this conversation once it is no longer needed
+            self.llm.release_thread(self.thread_id)
 
         request.file_content = dockerfile_content
-        return request
+        return not first_run and not error
+
+    def _optimize_size(self, request: DockerfileGenerationRequest):
+        """
+        Build and test smaller variants of the passing Dockerfile and keep the smallest that passes.
+
+        The variants are the final stage on slim and Alpine bases, and a multi-stage rewrite by the
+        LLM. Their size, build time and outcome are kept in the request's optimization report.
+        """
+        baseline = request.file_content
+        # At most `max_concurrent_builds` variants are built and tested at once
+        executor = ThreadPoolExecutor(max_workers=self.max_concurrent_builds, thread_name_prefix="dockerfile-variant")
+        contents = {baseline}
+        futures = [executor.submit(self._measure_variant, 0, "baseline", baseline)]
+        for name, content in BaseImageVariants().get_variants(baseline):
+            content = self._normalize(content)
+            if content not in contents:
+                contents.add(content)
+                futures.append(executor.submit(self._measure_variant, len(futures), name, content))
+
+        # Generated while the base image variants are being built
+        content = self._generate_size_variant(request, baseline)
+        if content and content not in contents:
+            futures.append(executor.submit(self._measure_variant, len(futures), "multi-stage", content))
+
+        try:
+            variants = [future.result() for future in futures]
+        finally:
+            executor.shutdown(wait=False)
+
+        passing = [variant for variant in variants if variant.passed and variant.size is not None]
+        # The baseline is listed first, so it wins ties
+        selected = min(passing, key=lambda variant: variant.size) if passing else variants[0]
+        request.file_content = selected.dockerfile
+        request.optimization_report = OptimizationReport(goal="size", variants=variants, selected=selected.name)
+        self.logger.info(f"Selected the {selected.name} variant\n{request.optimization_report.format()}")
+
+    def _generate_size_variant(self, request: DockerfileGenerationRequest, dockerfile_content: str) -> Optional[str]:
+        """Ask the LLM for a smaller, e.g. multi-stage, rewrite of a passing Dockerfile."""
+        if self.ledger is not None and self.ledger.is_budget_exceeded():
+            self.logger.info("Token budget exhausted, not asking for a multi-stage variant")
+            return None
+
+        self._start_new_thread()
+        prompt = PromptConstants.PROMPT_DOCKERFILE_OPTIMIZE_SIZE.format(
+            dockerfile=dockerfile_content,
+            command=request.test_command,
+        )
+        try:
+            response = self.llm.generate_response(prompt, self._get_system_message(), thread_id=self.thread_id)
+            self._record_token_usage(f"{self.stage_name}_optimization")
+            return self._normalize(self._parse_response(response))
+        except Exception as e:
+            self.logger.warning(f"Failed to generate a multi-stage variant: {e}")
+            return None
+        finally:
+            self.llm.release_thread(self.thread_id)
+
+    def _measure_variant(self, index: int, name: str, dockerfile_content: str) -> ImageVariant:
+        """Build and test a variant under its own tag, recording its size and build time."""
+        tag = f"{self.build_image_tool.tag}-variant-{index}"
+        build_image_tool = self.build_image_tool.for_tag(tag)
+        variant = ImageVariant(name=name, dockerfile=dockerfile_content)
+        variant.error = build_image_tool._run(dockerfile_content)
+        if not variant.error:
+            variant.error = self.test_container_tool.for_tag(tag)._run()
+        variant.passed = variant.error is None
+
+        build_result = build_image_tool.last_result
+        if build_result is not None:
+            variant.build_seconds = build_result.duration_seconds
+            variant.cached_steps = build_result.cache_hits
+            variant.size = build_result.size
+        if variant.passed and variant.size is None:
+            # Reused from an earlier run rather than built
+            variant.size = self.build_image_tool.docker_manager.get_image_size(tag)
+        return variant
+
+    def _generate_candidates(self, request: DockerfileGenerationRequest) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Generate several diverse Dockerfiles at once, then build and test them concurrently.
+
+        Candidates differ in temperature and in the base image variant they are asked for. The
+        first one to pass wins and the others are cancelled: those still waiting for a build
+        slot are skipped and their running test containers are killed.
+
+        :return: The winning Dockerfile and None, or the most promising failed candidate and its error
+        """
+        if self.ledger is not None and self.ledger.is_budget_exceeded():
+            self.logger.warning("Token budget exhausted, not generating candidates")
+            return None, "Token budget exhausted"
+
+        passed = threading.Event()
+        build_slots = threading.Semaphore(self.max_concurrent_builds)
+        executor = ThreadPoolExecutor(max_workers=self.candidates, thread_name_prefix="dockerfile-candidate")
+        futures = {
+            executor.submit(self._generate_candidate, index, request, passed, build_slots): index
+            for index in range(self.candidates)
+        }
+        failures = {}
+        try:
+            for future in as_completed(futures):
+                dockerfile_content, error = future.result()
+                if error is None:
+                    self.logger.info(f"Candidate {futures[future] + 1} of {self.candidates} passed")
+                    passed.set()
+                    self.test_container_tool.docker_manager.cancel_running()
+                    return dockerfile_content, None
+                failures[futures[future]] = (dockerfile_content, error)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        self.logger.info(f"None of the {self.candidates} candidates passed")
+        # A candidate that built and only failed its test is the closest to working
+        ranked = sorted(failures.items(), key=lambda item: (
+            item[1][0] is None,
+            not item[1][1].startswith("Container test failed"),
+            item[0],
+        ))
+        return ranked[0][1]
+
+    def _generate_candidate(
+            self,
+            index: int,
+            request: DockerfileGenerationRequest,
+            passed: threading.Event,
+            build_slots: threading.Semaphore,
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """Generate, build and test one candidate under its own tag, returning its Dockerfile and error."""
+        temperature = GenerationConstants.CANDIDATE_TEMPERATURES[index % len(GenerationConstants.CANDIDATE_TEMPERATURES)]
+        hint = PromptConstants.DOCKERFILE_CANDIDATE_HINTS[index % len(PromptConstants.DOCKERFILE_CANDIDATE_HINTS)]
+        # Every candidate asks the LLM, so the budget may have run out while the others were generating
+        if self.ledger is not None and self.ledger.is_budget_exceeded():
+            return None, "Token budget exhausted"
+
+        llm = None
+        thread_id = str(uuid.uuid4())
+        try:
+            # Inside the try, so a provider that cannot be created only fails this candidate
+            llm = LLMProviderPool.get_provider(self.llm_provider, tools=self.tools, temperature=temperature)
+            llm.bind_thread_tools(thread_id, self.tools)
+            prompt = self._get_prompt(request.script_analysis, request.build_context.script_name, request.test_command)
+            response = llm.generate_response(f"{prompt}\n{hint}" if hint else prompt, self._get_system_message(),
+                                             thread_id=thread_id)
+            self._record_token_usage(f"{self.stage_name}_candidate_{index + 1}", llm=llm, thread_id=thread_id)
+            dockerfile_content = self._normalize(self._parse_response(response))
+        except Exception as e:
+            self.logger.warning(f"Failed to generate candidate {index + 1}: {e}")
+            return None, str(e)
+        finally:
+            if llm is not None:
+                llm.release_thread(thread_id)
+
+        tag = f"{self.build_image_tool.tag}-candidate-{index + 1}"
+        with build_slots:
+            if passed.is_set():
+                return dockerfile_content, "Cancelled, another candidate passed"
+            error = self.build_image_tool.for_tag(tag)._run(dockerfile_content)
+            if not error:
+                if passed.is_set():
+                    return dockerfile_content, "Cancelled, another candidate passed"
+                error = self.test_container_tool.for_tag(tag)._run()
+        return dockerfile_content, error
+
+    def _generate_from_template(self, request: DockerfileGenerationRequest) -> Optional[str]:
+        """
+        Render the Dockerfile from a template and check it builds and passes the test command.
+
+        :return: The template Dockerfile if it works, otherwise None so the LLM takes over
+        """
+        if self.template_engine is None:
+            return None
+
+        script_filename = os.path.basename(request.build_context.script_path)
+        dockerfile_content = self.template_engine.render(request.script_analysis, script_filename)
+        if not dockerfile_content:
+            return None
+
+        dockerfile_content = self._normalize(dockerfile_content)
+        error = self.build_image_tool._run(dockerfile_content)
+        if not error:
+            error = self.test_container_tool._run()
+        if error:
+            self.logger.info(f"Template Dockerfile failed, falling back to the LLM: {error[:200]}")
+            return None
+
+        self.logger.info("Generated the Dockerfile from a template")
+        return dockerfile_content
+
+    def _normalize(self, dockerfile_content: str) -> str:
+        """Reorder the Dockerfile for layer reuse before building it, so the saved Dockerfile is the one built."""
+        if self.normalizer is None:
+            return dockerfile_content
+        return self.normalizer.normalize(dockerfile_content)
+
+    def _execute_streaming(self, *args, system_message=True, stage: Optional[str] = None, **kwargs) -> Tuple[str, Optional[str]]:
+        """
+        Stream the completion, stopping as soon as it is clearly not a Dockerfile.
+
+        :return: The streamed Dockerfile content and the reason the stream was aborted, if it was
+        """
+        prompt = self._get_prompt(*args, **kwargs)
+        system_message = self._get_system_message() if system_message else None
+        reader = DockerfileStreamReader()
+        stream = self.llm.stream_response(prompt, system_message, thread_id=self.thread_id)
+
+        try:
+            for chunk in stream:
+                reader.feed(chunk)
+                if reader.finished:
+                    break
+            reader.close()
+            return reader.content, None
+        except DockerfileStreamAbortedError as e:
+            self.logger.warning(f"Aborted streamed Dockerfile generation: {e}")
+            return reader.content, f"The response was not a valid Dockerfile. {e}"
+        finally:
+            stream.close()
+            self._record_token_usage(stage or self.stage_name)
+
+    def _start_new_thread(self):
+        """Drop the current conversation and continue in a fresh one, so history does not pile up."""
+        self.llm.release_thread(self.thread_id)
+        self.thread_id = str(uuid.uuid4())
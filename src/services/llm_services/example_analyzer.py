@@ -1,7 +1,17 @@
+from typing import Optional
+
 from .base import LLMService
 from src.constants import PromptConstants
+from src.services.markdown_command_extractor import MarkdownCommandExtractor
 
 class ExampleAnalyzer(LLMService):
+    cacheable = True
+    stage_name = "example_analysis"
+
+    def __init__(self, llm_provider, *args, use_static_analysis: bool = True, **kwargs):
+        super().__init__(llm_provider, *args, **kwargs)
+        self.command_extractor = MarkdownCommandExtractor() if use_static_analysis else None
+
     def _get_system_message(self) -> str:
         return PromptConstants.SYSTEM_MESSAGE_EXAMPLE_ANALYZER
 
@@ -19,7 +29,27 @@ class ExampleAnalyzer(LLMService):
             
         return command
 
-    def analyze_example(self, example_path: str) -> str:
+    def _extract_locally(self, example_content: str, script_path: Optional[str]) -> Optional[str]:
+        """Return the example arguments when the Markdown contains exactly one matching command."""
+        if not self.command_extractor or not script_path:
+            return None
+        command = self.command_extractor.extract_arguments(example_content, script_path)
+        if command:
+            self.logger.info("Extracted the example command from the Markdown code blocks, skipping the LLM")
+        return command
+
+    def analyze_example(self, example_path: str, script_path: Optional[str] = None) -> str:
+        with open(example_path, 'r') as file:
+            example_content = file.read()
+        try:
+            return self._extract_locally(example_content, script_path) or self._execute(example_content)
+        finally:
+            self._release_thread()
+
+    async def aanalyze_example(self, example_path: str, script_path: Optional[str] = None) -> str:
         with open(example_path, 'r') as file:
             example_content = file.read()
-        return self._execute(example_content) 
\ No newline at end of file
+        try:
+            return self._extract_locally(example_content, script_path) or await self._aexecute(example_content)
+        finally:
+            self._release_thread()
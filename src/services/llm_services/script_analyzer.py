@@ -1,9 +1,19 @@
+from typing import Optional
+
 from src.services.llm_services.base import LLMService
+from src.services.static_script_analyzer import StaticScriptAnalyzer
 from src.models.script_analysis import ScriptAnalysis
-from src.constants import PromptConstants
+from src.constants import PromptConstants, StaticAnalysisConstants
 
 
 class ScriptAnalyzer(LLMService):
+    cacheable = True
+    stage_name = "script_analysis"
+
+    def __init__(self, llm_provider, *args, use_static_analysis: bool = True, **kwargs):
+        super().__init__(llm_provider, *args, **kwargs)
+        self.static_analyzer = StaticScriptAnalyzer() if use_static_analysis else None
+
     def _get_system_message(self) -> str:
         return PromptConstants.SYSTEM_MESSAGE_SCRIPT_ANALYZER
 
@@ -15,7 +25,28 @@ class ScriptAnalyzer(LLMService):
         cleaned_response = response.strip('```json\n').strip('```').strip()
         return ScriptAnalysis.model_validate_json(cleaned_response)
 
+    def _analyze_statically(self, script_path: str, script_content: str) -> Optional[ScriptAnalysis]:
+        """Return the local analysis of the script when it is confident enough to skip the LLM."""
+        if not self.static_analyzer:
+            return None
+        result = self.static_analyzer.analyze(script_path, script_content)
+        if not result or result.confidence < StaticAnalysisConstants.MIN_CONFIDENCE:
+            return None
+        self.logger.info(f"Using static analysis (confidence {result.confidence:.2f}), skipping the LLM")
+        return result.analysis
+
     def analyze_script(self, script_path: str) -> ScriptAnalysis:
         with open(script_path, 'r') as file:
             script_content = file.read()
-        return self._execute(script_content)
+        try:
+            return self._analyze_statically(script_path, script_content) or self._execute(script_content)
+        finally:
+            self._release_thread()
+
+    async def aanalyze_script(self, script_path: str) -> ScriptAnalysis:
+        with open(script_path, 'r') as file:
+            script_content = file.read()
+        try:
+            return self._analyze_statically(script_path, script_content) or await self._aexecute(script_content)
+        finally:
+            self._release_thread()
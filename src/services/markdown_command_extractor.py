@@ -0,0 +1,123 @@
+import os
+import re
+import shlex
+import logging
+from typing import List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+class MarkdownCommandExtractor:
+    """
+    Extracts the example command of a script from the code blocks of a Markdown file.
+
+    Candidates come from fenced and inline code. Only commands that run the script itself
+    (`./script.sh ...`, `python script.py ...`, `go run main.go ...`) are kept and reduced to
+    the arguments passed to it, which is what the container's entrypoint receives.
+    """
+
+    FENCE_PATTERN = re.compile(r'^[ \t]*(```|~~~)[^\n]*\n(.*?)^[ \t]*\1[ \t]*$', re.MULTILINE | re.DOTALL)
+    INLINE_CODE_PATTERN = re.compile(r'(?<!`)`([^`\n]+)`(?!`)')
+    PLACEHOLDER_PATTERN = re.compile(r'<[^<>\s][^<>]*>')
+    PROMPT_PREFIXES = ('$ ', '> ', '% ')
+    INTERPRETERS = {
+        'bash', 'bun', 'deno', 'node', 'perl', 'php', 'python', 'python3', 'ruby', 'sh', 'ts-node', 'zsh',
+    }
+    # Interpreters that take a subcommand before the script, e.g. "go run main.go"
+    SUBCOMMAND_INTERPRETERS = {'go': 'run', 'deno': 'run', 'bundle': 'exec'}
+
+    def extract_candidates(self, content: str) -> List[str]:
+        """Return every command found in fenced code blocks and inline code spans."""
+        candidates = []
+        for _, block in self.FENCE_PATTERN.findall(content):
+            candidates.extend(self._split_commands(block))
+
+        # Inline code only outside fences, so fenced commands are not seen twice
+        without_fences = self.FENCE_PATTERN.sub('', content)
+        candidates.extend(code.strip() for code in self.INLINE_CODE_PATTERN.findall(without_fences))
+        return [candidate for candidate in candidates if candidate]
+
+    def extract_arguments(self, content: str, script_path: str) -> Optional[str]:
+        """
+        Return the arguments of the example command for the script.
+
+        :return: The arguments when exactly one distinct example matches, otherwise None
+        """
+        script_filename = os.path.basename(script_path)
+        arguments = []
+        for candidate in self.extract_candidates(content):
+            candidate_arguments = self._get_script_arguments(candidate, script_filename)
+            if candidate_arguments and candidate_arguments not in arguments:
+                arguments.append(candidate_arguments)
+
+        # Usage lines with placeholders such as '<input_text>' only count when there is nothing better
+        concrete_arguments = [argument for argument in arguments if not self.PLACEHOLDER_PATTERN.search(argument)]
+        if concrete_arguments:
+            arguments = concrete_arguments
+
+        if len(arguments) != 1:
+            logger.info(f"Found {len(arguments)} candidate example commands for {script_filename}")
+            return None
+        return arguments[0]
+
+    def _split_commands(self, block: str) -> List[str]:
+        """Split a code block into commands, joining continuations and multi-line quoted strings."""
+        commands = []
+        pending = ""
+        continued = False
+        for line in block.splitlines():
+            if not pending:
+                line = line.strip()
+                for prefix in self.PROMPT_PREFIXES:
+                    if line.startswith(prefix):
+                        line = line[len(prefix):]
+                if not line or line.startswith('#'):
+                    continue
+            if continued:
+                pending = f"{pending} {line.strip()}"
+            else:
+                pending = f"{pending}\n{line}" if pending else line
+
+            continued = pending.endswith('\\')
+            if continued:
+                pending = pending[:-1].rstrip()
+                continue
+            try:
+                shlex.split(pending)
+            except ValueError:
+                # Unbalanced quotes, the argument continues on the next line
+                continue
+            commands.append(pending.strip())
+            pending = ""
+
+        if pending.strip():
+            commands.append(pending.strip())
+        return commands
+
+    def _get_script_arguments(self, command: str, script_filename: str) -> Optional[str]:
+        try:
+            tokens = shlex.split(command)
+        except ValueError:
+            return None
+        if not tokens:
+            return None
+
+        position = 0
+        if tokens[0] in self.INTERPRETERS:
+            position = 1
+        elif tokens[0] in self.SUBCOMMAND_INTERPRETERS and len(tokens) > 1 \
+                and tokens[1] == self.SUBCOMMAND_INTERPRETERS[tokens[0]]:
+            position = 2
+        # Skip interpreter options such as "python -u script.py"
+        while position and position < len(tokens) and tokens[position].startswith('-'):
+            position += 1
+
+        if position >= len(tokens) or os.path.basename(tokens[position]) != script_filename:
+            return None
+
+        # Take the raw text after the script so the original quoting is preserved
+        match = re.search(rf'(?:^|\s)\S*{re.escape(script_filename)}(?=\s|$)', command)
+        if not match:
+            return None
+        return command[match.end():].strip() or None
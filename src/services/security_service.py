@@ -11,7 +11,7 @@ class SecurityService:
     # Allowed file extensions for scripts
     ALLOWED_EXTENSIONS = {'.py', '.js', '.rb', '.sh', '.php', '.pl', '.java', '.go', '.md'}
     # Allowed models
-    ALLOWED_MODELS = {'openai', 'google'}
+    ALLOWED_MODELS = {'openai', 'google', 'replay'}
     # Maximum file size (5MB)
     MAX_FILE_SIZE = 5 * 1024 * 1024
     # Prompt injection patterns
@@ -0,0 +1,325 @@
+import ast
+import os
+import re
+import sys
+import logging
+from typing import List, Optional, Set
+
+from src.models.script_analysis import ScriptAnalysis, HeuristicScriptAnalysis
+
+
+logger = logging.getLogger(__name__)
+
+
+class StaticScriptAnalyzer:
+    """
+    Derives a `ScriptAnalysis` locally for common script types, without calling the LLM.
+
+    Every result carries a confidence score; anything the heuristics cannot account for
+    (local modules, dynamic imports, unknown packages) lowers it, so callers can fall back
+    to the LLM when the score is too low.
+    """
+
+    EXTENSIONS = {
+        '.py': 'python',
+        '.sh': 'bash',
+        '.rb': 'ruby',
+        '.go': 'go',
+        '.js': 'javascript',
+        '.mjs': 'javascript',
+        '.cjs': 'javascript',
+    }
+    SHEBANG_INTERPRETERS = {
+        'python': 'python',
+        'python3': 'python',
+        'bash': 'bash',
+        'sh': 'bash',
+        'ruby': 'ruby',
+        'node': 'javascript',
+    }
+    # Python modules whose pip package has a different name
+    PYTHON_PACKAGE_NAMES = {
+        'bs4': 'beautifulsoup4',
+        'cv2': 'opencv-python',
+        'dateutil': 'python-dateutil',
+        'dotenv': 'python-dotenv',
+        'PIL': 'pillow',
+        'sklearn': 'scikit-learn',
+        'yaml': 'pyyaml',
+    }
+    # Shell builtins, keywords and commands available in every Debian-based image
+    SHELL_BUILTIN_COMMANDS = {
+        'alias', 'break', 'case', 'cd', 'continue', 'declare', 'do', 'done', 'echo', 'elif', 'else', 'esac',
+        'eval', 'exec', 'exit', 'export', 'false', 'fi', 'for', 'function', 'getopts', 'if', 'in', 'let',
+        'local', 'printf', 'read', 'readonly', 'return', 'select', 'set', 'shift', 'source', 'test', 'then',
+        'trap', 'true', 'type', 'ulimit', 'umask', 'unset', 'until', 'wait', 'while',
+        'awk', 'basename', 'cat', 'chmod', 'chown', 'cp', 'cut', 'date', 'dirname', 'du', 'env', 'expr',
+        'find', 'grep', 'head', 'id', 'ln', 'ls', 'mkdir', 'mktemp', 'mv', 'nl', 'od', 'paste', 'pwd', 'rev',
+        'rm', 'sed', 'seq', 'sleep', 'sort', 'split', 'stat', 'tac', 'tail', 'tee', 'touch', 'tr', 'uname',
+        'uniq', 'wc', 'whoami', 'xargs', 'yes',
+    }
+    SHELL_ENVIRONMENT_VARIABLES = {'HOME', 'IFS', 'OLDPWD', 'PATH', 'PPID', 'PWD', 'RANDOM', 'SHELL', 'USER'}
+    RUBY_STANDARD_LIBRARIES = {
+        'base64', 'benchmark', 'bigdecimal', 'cgi', 'csv', 'date', 'digest', 'erb', 'etc', 'fileutils', 'find',
+        'forwardable', 'io/console', 'ipaddr', 'json', 'logger', 'matrix', 'net/http', 'observer', 'open-uri',
+        'open3', 'openssl', 'optparse', 'ostruct', 'pathname', 'pp', 'prime', 'pstore', 'securerandom', 'set',
+        'shellwords', 'singleton', 'socket', 'stringio', 'strscan', 'tempfile', 'time', 'timeout', 'tmpdir',
+        'uri', 'yaml', 'zlib',
+    }
+    NODE_BUILTIN_MODULES = {
+        'assert', 'buffer', 'child_process', 'cluster', 'crypto', 'dgram', 'dns', 'events', 'fs', 'fs/promises',
+        'http', 'http2', 'https', 'net', 'os', 'path', 'perf_hooks', 'process', 'querystring', 'readline',
+        'stream', 'string_decoder', 'timers', 'tls', 'tty', 'url', 'util', 'v8', 'vm', 'worker_threads', 'zlib',
+    }
+    DEFAULT_VERSIONS = {
+        'python': '>=3.6',
+        'bash': '>=3.0',
+        'ruby': '>=2.7',
+        'go': '>=1.18',
+        'javascript': '>=14',
+    }
+    VERSION_KEYS = {'python': 'python', 'bash': 'bash', 'ruby': 'ruby', 'go': 'go', 'javascript': 'node'}
+    COMMANDS = {
+        'python': 'python {filename}',
+        'bash': 'bash {filename}',
+        'ruby': 'ruby {filename}',
+        'go': 'go run {filename}',
+        'javascript': 'node {filename}',
+    }
+
+    # Confidence scoring
+    BASE_CONFIDENCE = 0.95
+    KNOWN_PACKAGE_PENALTY = 0.05
+    UNCERTAIN_DEPENDENCY_PENALTY = 0.1
+    DYNAMIC_IMPORT_PENALTY = 0.3
+    LOCAL_MODULE_CONFIDENCE = 0.4
+
+    def analyze(self, script_path: str, script_content: str) -> Optional[HeuristicScriptAnalysis]:
+        """Analyze a script locally, returning None when its language is not supported."""
+        language = self.detect_language(script_path, script_content)
+        if not language:
+            return None
+
+        analyzer = getattr(self, f"_analyze_{language}")
+        try:
+            result = analyzer(script_path, script_content)
+        except (SyntaxError, ValueError) as e:
+            logger.info(f"Static analysis of {script_path} failed: {e}")
+            return None
+        logger.info(f"Static analysis of {script_path}: {language} with confidence {result.confidence:.2f}")
+        return result
+
+    def detect_language(self, script_path: str, script_content: str) -> Optional[str]:
+        first_line = script_content.splitlines()[0] if script_content else ""
+        parts = first_line[2:].split() if first_line.startswith("#!") else []
+        # Handle both "#!/usr/bin/python3" and "#!/usr/bin/env python3"
+        if len(parts) > 1 and os.path.basename(parts[0]) == "env":
+            parts = parts[1:]
+        if parts and os.path.basename(parts[0]) in self.SHEBANG_INTERPRETERS:
+            return self.SHEBANG_INTERPRETERS[os.path.basename(parts[0])]
+        return self.EXTENSIONS.get(os.path.splitext(script_path)[1].lower())
+
+    def _analyze_python(self, script_path: str, script_content: str) -> HeuristicScriptAnalysis:
+        tree = ast.parse(script_content)
+        confidence = self.BASE_CONFIDENCE
+        modules: Set[str] = set()
+        environment_variables: List[str] = []
+        minimum_version = (3, 6)
+
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                modules.update(alias.name.split('.')[0] for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+                modules.add(node.module.split('.')[0])
+            elif isinstance(node, ast.ImportFrom):
+                confidence = min(confidence, self.LOCAL_MODULE_CONFIDENCE)
+            elif isinstance(node, ast.Call) and self._get_call_name(node) in ('__import__', 'importlib.import_module'):
+                confidence -= self.DYNAMIC_IMPORT_PENALTY
+            elif isinstance(node, ast.NamedExpr):
+                minimum_version = max(minimum_version, (3, 8))
+            elif hasattr(ast, 'Match') and isinstance(node, ast.Match):
+                minimum_version = max(minimum_version, (3, 10))
+
+            variable = self._get_python_environment_variable(node)
+            if variable and variable not in environment_variables:
+                environment_variables.append(variable)
+
+        script_directory = os.path.dirname(os.path.abspath(script_path))
+        packages = []
+        for module in sorted(modules):
+            if module in sys.stdlib_module_names:
+                continue
+            if os.path.exists(os.path.join(script_directory, f"{module}.py")) or \
+                    os.path.isdir(os.path.join(script_directory, module)):
+                # Sibling modules are not part of the build context
+                confidence = min(confidence, self.LOCAL_MODULE_CONFIDENCE)
+                continue
+            if module in self.PYTHON_PACKAGE_NAMES:
+                packages.append(self.PYTHON_PACKAGE_NAMES[module])
+                confidence -= self.KNOWN_PACKAGE_PENALTY
+            else:
+                packages.append(module)
+                confidence -= self.UNCERTAIN_DEPENDENCY_PENALTY
+
+        version = f">={minimum_version[0]}.{minimum_version[1]}"
+        return self._build_result('python', script_path, [], packages, environment_variables, confidence, version)
+
+    def _analyze_bash(self, script_path: str, script_content: str) -> HeuristicScriptAnalysis:
+        content = self._strip_shell_comments_and_strings(script_content)
+        functions = set(re.findall(r'^\s*(?:function\s+)?([A-Za-z_][\w-]*)\s*\(\)', content, re.MULTILINE))
+        functions.update(re.findall(r'^\s*function\s+([A-Za-z_][\w-]*)', content, re.MULTILINE))
+        commands = re.findall(r'(?:^|[|;&(]|\$\(|`|\{\s|\bthen\b|\bdo\b|\belse\b)\s*([A-Za-z_][\w.+-]*)(?![\w.+-]*=)', content, re.MULTILINE)
+
+        confidence = self.BASE_CONFIDENCE
+        system_dependencies = []
+        for command in commands:
+            if command in self.SHELL_BUILTIN_COMMANDS or command in functions or command in system_dependencies:
+                continue
+            system_dependencies.append(command)
+            confidence -= self.UNCERTAIN_DEPENDENCY_PENALTY
+
+        assigned = set(re.findall(r'(?:^|[\s;])(?:export\s+|local\s+|readonly\s+)?([A-Za-z_]\w*)=', content, re.MULTILINE))
+        environment_variables = []
+        for variable in re.findall(r'\$\{?([A-Z_][A-Z0-9_]*)', script_content):
+            if variable in assigned or variable in self.SHELL_ENVIRONMENT_VARIABLES or variable in environment_variables:
+                continue
+            environment_variables.append(variable)
+
+        if re.search(r'\b(source|\.)\s+\S+\.sh\b', content):
+            confidence = min(confidence, self.LOCAL_MODULE_CONFIDENCE)
+
+        return self._build_result('bash', script_path, system_dependencies, [], environment_variables, confidence)
+
+    def _analyze_ruby(self, script_path: str, script_content: str) -> HeuristicScriptAnalysis:
+        confidence = self.BASE_CONFIDENCE
+        if re.search(r'^\s*(require_relative|load)\b', script_content, re.MULTILINE):
+            confidence = min(confidence, self.LOCAL_MODULE_CONFIDENCE)
+
+        packages = []
+        for library in re.findall(r'^\s*require\s*\(?\s*[\'"]([^\'"]+)[\'"]', script_content, re.MULTILINE):
+            if library in self.RUBY_STANDARD_LIBRARIES or library in packages:
+                continue
+            packages.append(library.split('/')[0])
+            confidence -= self.UNCERTAIN_DEPENDENCY_PENALTY
+
+        environment_variables = self._unique(
+            re.findall(r'ENV(?:\[|\.fetch\()\s*[\'"]([^\'"]+)[\'"]', script_content)
+        )
+        return self._build_result('ruby', script_path, [], packages, environment_variables, confidence)
+
+    def _analyze_go(self, script_path: str, script_content: str) -> HeuristicScriptAnalysis:
+        if not re.search(r'^\s*package\s+main\b', script_content, re.MULTILINE):
+            raise ValueError("Not a Go main package")
+
+        imports = re.findall(r'^\s*import\s+(?:\w+\s+)?"([^"]+)"', script_content, re.MULTILINE)
+        for block in re.findall(r'^\s*import\s*\((.*?)\)', script_content, re.MULTILINE | re.DOTALL):
+            imports.extend(re.findall(r'"([^"]+)"', block))
+
+        confidence = self.BASE_CONFIDENCE
+        packages = []
+        for package in imports:
+            # Standard library import paths never contain a domain
+            if '.' not in package.split('/')[0]:
+                continue
+            packages.append(package)
+            # Third-party packages need a go.mod, which the build context does not have
+            confidence -= 2 * self.UNCERTAIN_DEPENDENCY_PENALTY
+
+        environment_variables = self._unique(re.findall(r'os\.(?:Getenv|LookupEnv)\(\s*"([^"]+)"', script_content))
+        return self._build_result('go', script_path, [], self._unique(packages), environment_variables, confidence)
+
+    def _analyze_javascript(self, script_path: str, script_content: str) -> HeuristicScriptAnalysis:
+        modules = re.findall(r'\brequire\s*\(\s*[\'"]([^\'"]+)[\'"]\s*\)', script_content)
+        modules += re.findall(r'^\s*import\s+(?:[^\'"]+?\s+from\s+)?[\'"]([^\'"]+)[\'"]', script_content, re.MULTILINE)
+        modules += re.findall(r'\bimport\s*\(\s*[\'"]([^\'"]+)[\'"]\s*\)', script_content)
+
+        confidence = self.BASE_CONFIDENCE
+        packages = []
+        for module in modules:
+            if module.startswith('.') or module.startswith('/'):
+                confidence = min(confidence, self.LOCAL_MODULE_CONFIDENCE)
+                continue
+            if module.startswith('node:') or module in self.NODE_BUILTIN_MODULES:
+                continue
+            parts = module.split('/')
+            package = '/'.join(parts[:2]) if module.startswith('@') else parts[0]
+            if package not in packages:
+                packages.append(package)
+                confidence -= self.UNCERTAIN_DEPENDENCY_PENALTY
+
+        environment_variables = self._unique(
+            re.findall(r'process\.env(?:\.([A-Za-z_]\w*)|\[\s*[\'"]([^\'"]+)[\'"]\s*\])', script_content),
+        )
+        return self._build_result('javascript', script_path, [], packages, environment_variables, confidence)
+
+    def _build_result(
+            self,
+            language: str,
+            script_path: str,
+            system_dependencies: List[str],
+            package_dependencies: List[str],
+            environment_variables: List[str],
+            confidence: float,
+            version: Optional[str] = None,
+    ) -> HeuristicScriptAnalysis:
+        command = self.COMMANDS[language].format(filename=os.path.basename(script_path))
+        analysis = ScriptAnalysis(
+            language=language,
+            version_requirements={self.VERSION_KEYS[language]: version or self.DEFAULT_VERSIONS[language]},
+            system_dependencies=system_dependencies,
+            package_dependencies=package_dependencies,
+            environment_variables=environment_variables,
+            execution_pattern={
+                "description": "The script is executed directly and takes its input from the command line arguments.",
+                "command": command,
+                "args": ["<arguments>"],
+            },
+        )
+        return HeuristicScriptAnalysis(analysis=analysis, confidence=max(0.0, round(confidence, 2)))
+
+    @staticmethod
+    def _get_call_name(node: ast.Call) -> str:
+        func = node.func
+        if isinstance(func, ast.Name):
+            return func.id
+        if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name):
+            return f"{func.value.id}.{func.attr}"
+        return ""
+
+    def _get_python_environment_variable(self, node: ast.AST) -> Optional[str]:
+        """Extract the variable name from os.getenv("X"), os.environ.get("X") and os.environ["X"]."""
+        argument = None
+        if isinstance(node, ast.Call) and node.args:
+            name = self._get_call_name(node)
+            is_environ_get = isinstance(node.func, ast.Attribute) and node.func.attr == 'get' and \
+                isinstance(node.func.value, ast.Attribute) and node.func.value.attr == 'environ'
+            if name in ('os.getenv', 'getenv') or is_environ_get:
+                argument = node.args[0]
+        elif isinstance(node, ast.Subscript) and isinstance(node.value, ast.Attribute) and node.value.attr == 'environ':
+            argument = node.slice
+
+        if isinstance(argument, ast.Constant) and isinstance(argument.value, str):
+            return argument.value
+        return None
+
+    @staticmethod
+    def _strip_shell_comments_and_strings(content: str) -> str:
+        # Strings go first so a '#' inside one is not mistaken for a comment.
+        # Command substitutions inside double quotes are kept, only the plain text is dropped.
+        content = re.sub(
+            r'"(?:[^"\\]|\\.)*"',
+            lambda match: '"' + " ".join(re.findall(r'\$\([^)]*\)', match.group(0))) + '"',
+            content,
+        )
+        content = re.sub(r"'[^']*'", "''", content)
+        return re.sub(r'(^|\s)#.*$', '', content, flags=re.MULTILINE)
+
+    @staticmethod
+    def _unique(values) -> List[str]:
+        unique_values = []
+        for value in values:
+            if isinstance(value, tuple):
+                value = next((part for part in value if part), None)
+            if value and value not in unique_values:
+                unique_values.append(value)
+        return unique_values
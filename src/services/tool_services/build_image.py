@@ -1,12 +1,17 @@
+import copy
 import logging
 from typing import Optional, Type
 from langchain.callbacks.manager import CallbackManagerForToolRun
 from langchain_core.tools import BaseTool
 from pydantic import BaseModel
 
+from src.core.build_context_archive import BuildContextArchive
 from src.core.docker_manager import DockerManager
 from src.core.file_interface import FileInterface
+from src.core.image_result_store import ImageResultStore
+from src.models.build_result import BuildResult
 from src.models.tool_input import BuildInput
+from src.services.dockerfile_validator import DockerfileValidator
 
 
 logger = logging.getLogger(__name__)
@@ -25,14 +30,34 @@ class BuildImageTool(BaseTool):
     class Config:
       extra = "allow"
 
-    def __init__(self, docker_manager: DockerManager, file_interface: FileInterface, dockerfile_path: str, tag: str):
+    def __init__(
+            self,
+            docker_manager: DockerManager,
+            file_interface: FileInterface,
+            dockerfile_path: str,
+            tag: str,
+            context_archive: Optional[BuildContextArchive] = None,
+            result_store: Optional[ImageResultStore] = None,
+            validator: Optional[DockerfileValidator] = None,
+    ):
         super().__init__()
         self.docker_manager = docker_manager
+        self.context_archive = context_archive
+        self.result_store = result_store
+        self.validator = validator
+        # The result of the latest build, None if the image was reused or never built
+        self.last_result: Optional[BuildResult] = None
         self.file_interface = file_interface
         self.dockerfile_path = dockerfile_path
         self.tag = tag
         self.logger = logging.getLogger(__name__)
 
+    def for_tag(self, tag: str) -> "BuildImageTool":
+        """A copy of the tool that builds under another tag, e.g. one of several candidates built concurrently."""
+        tool = copy.copy(self)
+        tool.tag = tag
+        return tool
+
     def _run(self, dockerfile_content: str, run_manager: Optional[CallbackManagerForToolRun] = None) -> Optional[str]:
         """
         Save the dockerfile and build the image
@@ -43,11 +68,41 @@ class BuildImageTool(BaseTool):
         """
         self.logger.info(f"Trying to build Docker image with tag: {self.tag}")
         self.logger.debug(f"Dockerfile content: {dockerfile_content}")
-        self.file_interface.write_file(self.dockerfile_path, dockerfile_content)
-        directory = self.file_interface.get_directory(self.dockerfile_path)
+        self.last_result = None
+
+        if self.validator:
+            errors = self.validator.validate(dockerfile_content)
+            if errors:
+                # Caught without a build, so the LLM gets to fix them right away
+                return "The Dockerfile is invalid and was not built:\n" + "\n".join(f"- {error}" for error in errors)
 
         try:
-            self.docker_manager.build_image(directory, self.tag)
-            return None
+            key = self.result_store.get_key(dockerfile_content) if self.result_store else None
+            if key and self._reuse_stored_image(key):
+                return None
+
+            if self.context_archive:
+                # The context is assembled in memory, so nothing is written to disk per attempt
+                context = self.context_archive.build(dockerfile_content)
+                result = self.docker_manager.build_image(None, self.tag, fileobj=context)
+            else:
+                self.file_interface.write_file(self.dockerfile_path, dockerfile_content)
+                directory = self.file_interface.get_directory(self.dockerfile_path)
+                result = self.docker_manager.build_image(directory, self.tag)
+            self.last_result = result
+            if self.result_store:
+                self.result_store.set_current_key(self.tag, key if result else None)
+                if result and result.image_id:
+                    self.result_store.record_build(key, result.image_id)
+            return result.get_error_message()
         except Exception as e:
             return str(e)
+
+    def _reuse_stored_image(self, key: str) -> bool:
+        """Tag the image already built from this Dockerfile and context, if there is one."""
+        stored = self.result_store.get(key, image_exists=self.docker_manager.image_exists)
+        if stored and stored.image_id and self.docker_manager.tag_image(stored.image_id, self.tag):
+            self.logger.info(f"Dockerfile was already built as {stored.image_id}, skipping the build")
+            self.result_store.set_current_key(self.tag, key)
+            return True
+        return False
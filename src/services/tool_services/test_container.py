@@ -1,3 +1,4 @@
+import copy
 import logging
 from typing import Optional, Type
 from langchain.callbacks.manager import CallbackManagerForToolRun
@@ -5,6 +6,7 @@ from langchain_core.tools import BaseTool
 from pydantic import BaseModel
 
 from src.core.docker_manager import DockerManager
+from src.core.image_result_store import ImageResultStore
 from src.models.tool_input import TestContainerInput
 
 
@@ -23,13 +25,21 @@ class TestContainerTool(BaseTool):
     class Config:
         extra = "allow"
 
-    def __init__(self, docker_manager: DockerManager, tag: str, test_command: str):
+    def __init__(self, docker_manager: DockerManager, tag: str, test_command: str,
+                 result_store: Optional[ImageResultStore] = None):
         super().__init__()
         self.docker_manager = docker_manager
+        self.result_store = result_store
         self.tag = tag
         self.test_command = test_command
         self.logger = logging.getLogger(__name__)
 
+    def for_tag(self, tag: str) -> "TestContainerTool":
+        """A copy of the tool that tests another image, e.g. one of several candidates tested concurrently."""
+        tool = copy.copy(self)
+        tool.tag = tag
+        return tool
+
     def _run(self, run_manager: Optional[CallbackManagerForToolRun] = None) -> Optional[str]:
         """
         Run a test command inside the Docker container.
@@ -39,10 +49,18 @@ class TestContainerTool(BaseTool):
         """
         self.logger.info(f"Testing Docker container with tag: {self.tag}")
 
+        key = self.result_store.get_current_key(self.tag) if self.result_store else None
+        stored = self.result_store.get(key) if key else None
+        if stored and stored.test_passed is not None:
+            self.logger.info("Image was already tested with this command, reusing the outcome")
+            return None if stored.test_passed else f"Container test failed. {stored.test_error}"
+
         try:
-            success = self.docker_manager.test_container(self.tag, self.test_command)
-            run_logs = self.docker_manager.run_history[-1]
-            return None if success else f"Container test failed. Logs: {run_logs}"
+            run = self.docker_manager.run_test(self.tag, self.test_command)
+            # A timeout may be a slow machine rather than the Dockerfile, so it is worth retrying
+            if key and not run.timed_out and not run.cancelled:
+                self.result_store.record_test(key, bool(run), run.get_error_message())
+            return None if run else f"Container test failed. {run.get_error_message()}"
         except Exception as e:
             self.logger.warning(f"Error testing Docker container: {e}")
             return str(e)
@@ -1,15 +1,20 @@
 import pytest
 from pathlib import Path
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 from tests.mocks.docker_mocks import MockDockerClient
 from langchain_core.messages import AIMessage
+from src.core.docker_client_pool import DockerClientPool
+from src.core.llm_provider_pool import LLMProviderPool
 
 
 @pytest.fixture
-def setup_env(monkeypatch):
+def setup_env(monkeypatch, tmp_path):
     # Mock environment
     monkeypatch.setenv("OPENAI_API_KEY", "test-key")
     monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+    monkeypatch.setenv("LLM_CACHE_DIR", str(tmp_path / "llm_cache"))
+    # Outcomes memoised by one case or run would otherwise skip the builds and tests of the next
+    monkeypatch.setenv("RESULT_STORE_DIR", str(tmp_path / "results"))
 
 
 @pytest.fixture
@@ -19,9 +24,12 @@ def should_docker_client_succeed():
 
 @pytest.fixture
 def mock_docker_client(should_docker_client_succeed):
+    # The shared client would otherwise outlive the patch
+    DockerClientPool.clear()
     with patch('docker.from_env',
                return_value=MockDockerClient(should_succeed=should_docker_client_succeed)) as docker_client:
         yield docker_client
+    DockerClientPool.clear()
 
 
 @pytest.fixture
@@ -71,10 +79,13 @@ CMD ["node", "vowel_counter.js"]""",
     # Create a mock agent
     mock_agent = MagicMock()
     mock_agent.invoke.side_effect = _mock_invoke
+    mock_agent.ainvoke = AsyncMock(side_effect=_mock_invoke)
 
-    # Patch the create_react_agent to return the mock agent
+    # Patch the create_react_agent to return the mock agent, without leaking pooled providers between tests
+    LLMProviderPool.clear()
     with patch('src.core.llm_interface.create_react_agent', return_value=mock_agent):
         yield mock_agent
+    LLMProviderPool.clear()
 
 
 def get_example_scripts():
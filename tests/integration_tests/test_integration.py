@@ -72,9 +72,23 @@ class TestIntegration:
             assert_that(e.code).is_equal_to(0)
 
         mock_docker_client_instance = mock_docker_client()
-        assert_that(mock_docker_client_instance.images.build.called).is_true()
-        mock_docker_client_instance.images.build.assert_called_with(
+        assert_that(mock_docker_client_instance.api.build.called).is_true()
+        mock_docker_client_instance.api.build.assert_called_with(
             path="build_context/char_counter",
             tag="script-container:char_counter",
-            rm=True
+            rm=True,
+            decode=True
         )
+
+    @pytest.mark.parametrize("should_docker_client_succeed", [False])
+    @pytest.mark.parametrize("script_example_paths", get_example_scripts()[:1])
+    def test_token_budget_stops_generation(self, script_example_paths, monkeypatch, mock_llm_invoke):
+        script_path, example_path = script_example_paths
+        test_args = ['main.py', script_path, example_path, '--token-budget', '1']
+        monkeypatch.setattr(sys, 'argv', test_args)
+
+        with pytest.raises(SystemExit) as e:
+            main()
+
+        assert_that(e.value.code).is_equal_to(1)
+        assert_that(mock_llm_invoke.invoke.call_count).is_less_than_or_equal_to(1)
@@ -5,11 +5,17 @@ class MockContainer:
         self.exit_code = exit_code
         self.attrs = {'State': {'ExitCode': exit_code}}
     
-    def wait(self):
+    def wait(self, timeout=None):
         return {'StatusCode': self.exit_code}
+
+    def kill(self):
+        pass
+
+    def reload(self):
+        pass
     
-    def logs(self):
-        return b"Mock container logs"
+    def logs(self, stream=False):
+        return iter([b"Mock container logs"]) if stream else b"Mock container logs"
     
     def remove(self):
         pass
@@ -22,15 +28,35 @@ class MockImageBuilder:
     def build(self, **kwargs):
         return [{'stream': 'Step 1/5: Mock build step'}]
 
+class MockBuildStream:
+    def build(self, **kwargs):
+        return [
+            {'stream': 'Step 1/2 : FROM python:3.11\n'},
+            {'stream': ' ---> Using cache\n ---> 1a2b3c4d5e6f\n'},
+            {'stream': 'Step 2/2 : COPY script.py /app/\n'},
+            {'stream': ' ---> 6f5e4d3c2b1a\n'},
+            {'aux': {'ID': 'sha256:6f5e4d3c2b1a'}},
+            {'stream': 'Successfully built 6f5e4d3c2b1a\n'},
+        ]
+
 class MockDockerClient:
     def __init__(self, should_succeed=True):
         self.images = MagicMock()
         self.containers = MagicMock()
+        self.api = MagicMock()
         self.should_succeed = should_succeed
         
         # Setup image building
         self.images.build.return_value = MockImageBuilder().build()
+        self.api.build.return_value = MockBuildStream().build()
+        self.images.get.return_value.attrs = {'Size': 1024}
         
         # Setup container running
         container = MockContainer(exit_code=0 if should_succeed else 1)
-        self.containers.run.return_value = container 
\ No newline at end of file
+        self.containers.run.return_value = container 
+
+    def ping(self):
+        return True
+
+    def close(self):
+        pass
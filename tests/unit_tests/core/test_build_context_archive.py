@@ -0,0 +1,43 @@
+import os
+import tarfile
+from src.core.build_context_archive import BuildContextArchive
+from src.models.build_context import BuildContext
+
+
+class TestBuildContextArchive:
+    def read_archive(self, fileobj):
+        with tarfile.open(fileobj=fileobj) as tar:
+            return {member.name: (tar.extractfile(member).read(), member.mode) for member in tar.getmembers()}
+
+    def test_build_contains_dockerfile_and_manifest(self, tmp_path):
+        # Setup
+        script = tmp_path / "script.sh"
+        script.write_text("echo hello\n")
+        os.chmod(script, 0o755)
+        build_context = BuildContext(script_name="script", script_path=str(script))
+        archive = BuildContextArchive(build_context.get_manifest())
+
+        # Execute
+        files = self.read_archive(archive.build("FROM debian:bookworm\n"))
+
+        # Verify
+        assert files == {
+            "Dockerfile": (b"FROM debian:bookworm\n", 0o644),
+            "script.sh": (b"echo hello\n", 0o755),
+        }
+
+    def test_manifest_files_are_read_once(self, tmp_path):
+        # Setup
+        script = tmp_path / "script.py"
+        script.write_text("print('hello')\n")
+        os.chmod(script, 0o644)
+        archive = BuildContextArchive({"script.py": str(script)})
+
+        # Execute
+        first = self.read_archive(archive.build("FROM python:3.11\n"))
+        script.write_text("print('changed')\n")
+        second = self.read_archive(archive.build("FROM python:3.12\n"))
+
+        # Verify
+        assert first["script.py"] == second["script.py"] == (b"print('hello')\n", 0o644)
+        assert second["Dockerfile"][0] == b"FROM python:3.12\n"
@@ -0,0 +1,52 @@
+import pytest
+from unittest.mock import Mock, patch
+from docker.errors import APIError
+from src.constants import DockerConstants
+from src.core.docker_client_pool import DockerClientPool
+
+
+class TestDockerClientPool:
+    @pytest.fixture(autouse=True)
+    def clear_pool(self):
+        DockerClientPool.clear()
+        yield
+        DockerClientPool.clear()
+
+    @pytest.fixture
+    def from_env(self):
+        with patch('docker.from_env', side_effect=lambda **kwargs: Mock()) as from_env:
+            yield from_env
+
+    def test_same_configuration_shares_client(self, from_env):
+        first = DockerClientPool.get_client()
+        second = DockerClientPool.get_client()
+
+        assert first is second
+        from_env.assert_called_once_with(max_pool_size=DockerConstants.DEFAULT_CLIENT_POOL_SIZE)
+
+    def test_pool_size_from_environment(self, from_env, monkeypatch):
+        monkeypatch.setenv(DockerConstants.CLIENT_POOL_SIZE_ENV_VAR, "32")
+
+        default = DockerClientPool.get_client()
+        other = DockerClientPool.get_client(max_pool_size=4)
+
+        assert default is not other
+        assert [call.kwargs["max_pool_size"] for call in from_env.call_args_list] == [32, 4]
+
+    def test_unhealthy_client_is_replaced(self, from_env, monkeypatch):
+        first = DockerClientPool.get_client()
+        first.ping.side_effect = APIError("daemon restarted")
+        monkeypatch.setattr(DockerConstants, "CLIENT_HEALTH_CHECK_INTERVAL_SECONDS", 0)
+
+        second = DockerClientPool.get_client()
+
+        assert second is not first
+        first.close.assert_called_once()
+
+    def test_healthy_client_is_kept(self, from_env, monkeypatch):
+        first = DockerClientPool.get_client()
+        first.ping.return_value = True
+        monkeypatch.setattr(DockerConstants, "CLIENT_HEALTH_CHECK_INTERVAL_SECONDS", 0)
+
+        assert DockerClientPool.get_client() is first
+        first.ping.assert_called_once()
@@ -1,8 +1,22 @@
 import pytest
 from unittest.mock import Mock, patch
+import subprocess
+from datetime import datetime, timezone
+from docker.errors import APIError, DockerException, ImageNotFound
+from requests.exceptions import ChunkedEncodingError, HTTPError, ReadTimeout
+from src.constants import DockerConstants
+from src.core.docker_client_pool import DockerClientPool
 from src.core.docker_manager import DockerManager
+from src.models.container_run import ContainerLimits
+from src.models.garbage_collection import GCPolicy
 
 class TestDockerManager:
+    @pytest.fixture(autouse=True)
+    def clear_client_pool(self):
+        DockerClientPool.clear()
+        yield
+        DockerClientPool.clear()
+
     @pytest.fixture
     def mock_docker_client(self):
         return Mock()
@@ -11,38 +25,185 @@ class TestDockerManager:
     def docker_manager(self, mock_docker_client):
         with patch('docker.from_env', return_value=mock_docker_client):
             manager = DockerManager()
-            return manager
+            yield manager
 
     def test_build_image_success(self, docker_manager, mock_docker_client):
         # Setup
         dockerfile_path = "/path/to/dockerfile"
         tag = "test:latest"
-        
+        mock_docker_client.api.build.return_value = [
+            {"stream": "Step 1/2 : FROM python:3.11\n"},
+            {"stream": " ---> Using cache\n ---> 1a2b3c\n"},
+            {"stream": "Step 2/2 : RUN pip install requests\n"},
+            {"stream": " ---> Running in 9f8e7d\nCollecting requests\n"},
+            {"aux": {"ID": "sha256:4d5e6f"}},
+            {"stream": "Successfully built 4d5e6f\n"},
+        ]
+        mock_docker_client.images.get.return_value.attrs = {"Size": 2048}
+        on_step = Mock()
+
         # Execute
-        result = docker_manager.build_image(dockerfile_path, tag)
-        
+        result = docker_manager.build_image(dockerfile_path, tag, on_step=on_step)
+
         # Verify
-        assert result is True
-        mock_docker_client.images.build.assert_called_once_with(
+        assert result
+        assert result.image_id == "sha256:4d5e6f"
+        assert result.size == 2048
+        assert [step.instruction for step in result.steps] == ["FROM python:3.11", "RUN pip install requests"]
+        assert [step.cached for step in result.steps] == [True, False]
+        assert (result.cache_hits, result.cache_misses) == (1, 1)
+        assert result.steps[1].log == [" ---> Running in 9f8e7d", "Collecting requests"]
+        assert on_step.call_count == 2
+        assert result.get_error_message() is None
+        mock_docker_client.api.build.assert_called_once_with(
             path=str(dockerfile_path),
             tag=tag,
-            rm=True
+            rm=True,
+            decode=True
         )
+        mock_docker_client.images.get.assert_called_once_with("sha256:4d5e6f")
 
     def test_build_image_failure(self, docker_manager, mock_docker_client):
         # Setup
-        mock_docker_client.images.build.side_effect = Exception("Build failed")
-        
-        # Execute and verify
-        with pytest.raises(Exception) as exc_info:
-            docker_manager.build_image("/path/to/dockerfile", "test:latest")
-        assert str(exc_info.value) == "Build failed"
+        mock_docker_client.api.build.return_value = [
+            {"stream": "Step 1/2 : FROM python:3.11\n"},
+            {"stream": " ---> Using cache\n"},
+            {"stream": "Step 2/2 : RUN apt-get install -y foo\n"},
+            {"stream": "".join(f"line {i}\n" for i in range(30))},
+            {"error": "The command returned a non-zero code: 100", "errorDetail": {"message": "returned a non-zero code: 100"}},
+        ]
+
+        # Execute
+        result = docker_manager.build_image("/path/to/dockerfile", "test:latest")
+
+        # Verify
+        assert not result
+        assert result.error == "returned a non-zero code: 100"
+        assert result.error_step.number == 2
+        assert result.error_log_tail == [f"line {i}" for i in range(10, 30)]
+        message = result.get_error_message()
+        assert message.startswith("Step 2 failed: RUN apt-get install -y foo\nError: returned a non-zero code: 100")
+        assert "line 29" in message
+        assert "line 9\n" not in message
+        mock_docker_client.images.get.assert_not_called()
+
+    def test_build_image_from_fileobj(self, docker_manager, mock_docker_client):
+        # Setup
+        mock_docker_client.api.build.return_value = [{"stream": "Step 1/1 : FROM python:3.11\n"}]
+        context = Mock()
+
+        # Execute
+        result = docker_manager.build_image(None, "test:latest", fileobj=context)
+
+        # Verify
+        assert result
+        mock_docker_client.api.build.assert_called_once_with(
+            fileobj=context,
+            custom_context=True,
+            tag="test:latest",
+            rm=True,
+            decode=True
+        )
+
+    def test_build_image_with_cache_from(self, mock_docker_client):
+        # Setup
+        mock_docker_client.api.build.return_value = []
+        with patch('docker.from_env', return_value=mock_docker_client):
+            manager = DockerManager(cache_from=["registry/app:latest"])
+
+            # Execute
+            manager.build_image("/path/to/dockerfile", "test:latest")
+
+        # Verify
+        assert mock_docker_client.api.build.call_args.kwargs["cache_from"] == ["registry/app:latest"]
+
+    def test_build_image_with_buildkit(self, mock_docker_client, mocker):
+        # Setup
+        output = [
+            "#1 [internal] load build definition from Dockerfile",
+            "#1 DONE 0.0s",
+            "#4 [1/3] FROM docker.io/library/python:3.11",
+            "#4 CACHED",
+            "#5 [2/3] RUN pip install requests",
+            "#5 0.512 Collecting requests",
+            "#5 DONE 3.2s",
+            "#6 [3/3] COPY script.py /app/",
+            "#6 DONE 0.1s",
+        ]
+        process = mocker.patch("subprocess.Popen").return_value
+        process.stdout = [f"{line}\n".encode() for line in output]
+        process.wait.return_value = 0
+        mock_docker_client.images.get.return_value.attrs = {"Size": 4096}
+        context = Mock()
+        context.read.return_value = b"tar"
+        with patch('docker.from_env', return_value=mock_docker_client):
+            manager = DockerManager(use_buildkit=True, cache_from=["registry/app:latest"])
+
+            # Execute
+            result = manager.build_image(None, "test:latest", fileobj=context)
+
+        # Verify
+        assert result
+        assert [(step.number, step.cached, step.duration_seconds) for step in result.steps] == [(1, True, 0.0), (2, False, 3.2), (3, False, 0.1)]
+        assert result.steps[1].log == ["Collecting requests"]
+        assert result.size == 4096
+        command = subprocess.Popen.call_args.args[0]
+        assert command[:2] == ["docker", "build"]
+        assert command[-3:] == ["--cache-from", "registry/app:latest", "-"]
+        assert subprocess.Popen.call_args.kwargs["env"]["DOCKER_BUILDKIT"] == "1"
+        process.stdin.write.assert_called_once_with(b"tar")
+
+    def test_build_image_with_buildkit_failure(self, mock_docker_client, mocker):
+        # Setup
+        output = [
+            "#4 [1/2] FROM docker.io/library/python:3.11",
+            "#4 CACHED",
+            "#5 [2/2] RUN pip install does-not-exist",
+            "#5 1.2 ERROR: No matching distribution found for does-not-exist",
+            "#5 ERROR: process \"/bin/sh -c pip install does-not-exist\" did not complete successfully: exit code: 1",
+            "ERROR: failed to solve: process \"/bin/sh -c pip install does-not-exist\" did not complete successfully: exit code: 1",
+        ]
+        process = mocker.patch("subprocess.Popen").return_value
+        process.stdout = [f"{line}\n".encode() for line in output]
+        process.wait.return_value = 1
+        with patch('docker.from_env', return_value=mock_docker_client):
+            manager = DockerManager(use_buildkit=True)
+
+            # Execute
+            result = manager.build_image("/path/to/context", "test:latest")
+
+        # Verify
+        assert not result
+        assert result.error_step.instruction == "RUN pip install does-not-exist"
+        assert result.error_log_tail == ["ERROR: No matching distribution found for does-not-exist"]
+        assert result.error.startswith("failed to solve")
+        assert subprocess.Popen.call_args.args[0][-1] == "/path/to/context"
+
+    def test_build_image_docker_error(self, docker_manager, mock_docker_client):
+        # Setup
+        mock_docker_client.api.build.side_effect = DockerException("Cannot connect to the Docker daemon")
+
+        # Execute
+        result = docker_manager.build_image("/path/to/dockerfile", "test:latest")
+
+        # Verify
+        assert not result
+        assert result.error == "Cannot connect to the Docker daemon"
+        assert result.steps == []
+
+    def test_build_image_connection_error(self, docker_manager, mock_docker_client):
+        mock_docker_client.api.build.side_effect = ChunkedEncodingError("Connection broken")
+
+        result = docker_manager.build_image("/path/to/dockerfile", "test:latest")
+
+        assert not result
+        assert result.error == "Connection broken"
 
     def test_test_container_success(self, docker_manager, mock_docker_client):
         # Setup
         mock_container = Mock()
         mock_container.wait.return_value = {"StatusCode": 0}
-        mock_container.logs.return_value = b"Test logs"
+        mock_container.logs.return_value = [b"Test logs"]
         mock_docker_client.containers.run.return_value = mock_container
         
         # Execute
@@ -55,18 +216,234 @@ class TestDockerManager:
             command="python test.py",
             detach=True,
             stdout=True,
-            stderr=True
+            stderr=True,
+            mem_limit="512m",
+            nano_cpus=1_000_000_000,
+            pids_limit=256
         )
+        mock_container.wait.assert_called_once_with(timeout=60)
+        mock_container.logs.assert_called_once_with(stream=True)
+        assert docker_manager.run_history[-1].exit_code == 0
 
     def test_test_container_failure(self, docker_manager, mock_docker_client):
         # Setup
         mock_container = Mock()
         mock_container.wait.return_value = {"StatusCode": 1}
-        mock_container.logs.return_value = b"Error logs"
+        mock_container.logs.return_value = [b"Error logs"]
         mock_docker_client.containers.run.return_value = mock_container
         
         # Execute
         result = docker_manager.test_container("test:latest", "python test.py")
         
         # Verify
-        assert result is False 
\ No newline at end of file
+        assert result is False
+        assert docker_manager.run_history[-1].get_error_message().startswith("The container exited with code 1.")
+
+    def test_test_container_timeout_kills_container(self, mock_docker_client):
+        # Setup
+        mock_container = Mock()
+        mock_container.wait.side_effect = ReadTimeout("Read timed out")
+        mock_container.logs.return_value = [b"Enter your name:"]
+        mock_docker_client.containers.run.return_value = mock_container
+        with patch('docker.from_env', return_value=mock_docker_client):
+            manager = DockerManager(limits=ContainerLimits(timeout_seconds=5, mem_limit="1g", nano_cpus=500_000_000))
+
+            # Execute
+            result = manager.test_container("test:latest", "python test.py")
+
+        # Verify
+        assert result is False
+        run = manager.run_history[-1]
+        assert run.timed_out and run.exit_code is None
+        assert "did not finish" in run.get_error_message()
+        assert "Enter your name:" in run.get_error_message()
+        mock_container.wait.assert_called_once_with(timeout=5)
+        mock_container.kill.assert_called_once()
+        mock_container.remove.assert_called_once_with(force=True)
+        assert mock_docker_client.containers.run.call_args.kwargs["mem_limit"] == "1g"
+        assert mock_docker_client.containers.run.call_args.kwargs["nano_cpus"] == 500_000_000
+
+    def test_test_container_daemon_error_is_not_a_timeout(self, docker_manager, mock_docker_client):
+        # Setup
+        mock_container = Mock()
+        mock_container.wait.side_effect = HTTPError("500 Server Error")
+        mock_docker_client.containers.run.return_value = mock_container
+
+        # Execute and verify
+        with pytest.raises(HTTPError):
+            docker_manager.test_container("test:latest", "python test.py")
+        mock_container.kill.assert_not_called()
+        mock_container.remove.assert_called_once_with(force=True)
+
+    def test_test_container_out_of_memory(self, docker_manager, mock_docker_client):
+        # Setup
+        mock_container = Mock()
+        mock_container.wait.return_value = {"StatusCode": 137}
+        mock_container.attrs = {"State": {"OOMKilled": True}}
+        mock_container.logs.return_value = [b""]
+        mock_docker_client.containers.run.return_value = mock_container
+
+        # Execute
+        result = docker_manager.test_container("test:latest", "python test.py")
+
+        # Verify
+        assert result is False
+        assert "memory limit" in docker_manager.run_history[-1].get_error_message()
+
+    def test_client_is_created_on_first_use(self):
+        with patch('docker.from_env') as from_env:
+            manager = DockerManager()
+            from_env.assert_not_called()
+
+            assert manager.client is manager.client
+            assert DockerManager().client is manager.client
+            from_env.assert_called_once()
+
+    def test_prefetch_image_pulls_missing_image_once(self, docker_manager, mock_docker_client):
+        # Setup
+        mock_docker_client.images.get.side_effect = ImageNotFound("missing")
+
+        # Execute
+        first = docker_manager.prefetch_image("python:3.11")
+        second = docker_manager.prefetch_image("python:3.11")
+
+        # Verify
+        assert first is second
+        assert first.result(timeout=5) is True
+        mock_docker_client.images.pull.assert_called_once_with("python", tag="3.11")
+
+    def test_prefetch_image_after_close_pulls_again(self, docker_manager, mock_docker_client):
+        # Setup
+        mock_docker_client.images.get.side_effect = ImageNotFound("missing")
+        docker_manager.prefetch_image("python:3.11").result(timeout=5)
+
+        # Execute
+        docker_manager.close()
+        future = docker_manager.prefetch_image("python:3.11")
+
+        # Verify
+        assert future.result(timeout=5) is True
+        assert mock_docker_client.images.pull.call_count == 2
+
+    def test_prefetch_image_skips_present_image(self, docker_manager, mock_docker_client):
+        # Execute
+        pulled = docker_manager.prefetch_image("node:20").result(timeout=5)
+
+        # Verify
+        assert pulled is False
+        mock_docker_client.images.pull.assert_not_called()
+
+    def test_prefetch_image_failure_is_not_raised(self, docker_manager, mock_docker_client):
+        # Setup
+        mock_docker_client.images.get.side_effect = ImageNotFound("missing")
+        mock_docker_client.images.pull.side_effect = APIError("pull access denied")
+
+        # Execute and verify
+        assert docker_manager.prefetch_image("private/image").result(timeout=5) is False
+
+    def test_run_history_is_bounded(self, docker_manager, mock_docker_client):
+        # Setup
+        mock_container = Mock()
+        mock_container.wait.return_value = {"StatusCode": 0}
+        mock_container.logs.side_effect = lambda stream: iter([b"x" * 10_000] * 10)
+        mock_docker_client.containers.run.return_value = mock_container
+
+        # Execute
+        for _ in range(DockerConstants.RUN_HISTORY_SIZE + 10):
+            docker_manager.test_container("test:latest", "python test.py")
+
+        # Verify
+        run = docker_manager.run_history[-1]
+        assert len(docker_manager.run_history) == DockerConstants.RUN_HISTORY_SIZE
+        assert run.log_bytes == 100_000
+        assert run.captured_log_bytes == DockerConstants.LOG_CAPTURE_HEAD_BYTES + DockerConstants.LOG_CAPTURE_TAIL_BYTES
+        assert "bytes omitted" in run.logs
+        assert docker_manager.captured_log_bytes == DockerConstants.RUN_HISTORY_SIZE * run.captured_log_bytes
+
+    def test_tag_image(self, docker_manager, mock_docker_client):
+        # Execute
+        tagged = docker_manager.tag_image("sha256:abc", "script-container:script")
+
+        # Verify
+        assert tagged
+        mock_docker_client.images.get.assert_called_once_with("sha256:abc")
+        mock_docker_client.images.get.return_value.tag.assert_called_once_with("script-container", tag="script")
+
+    def test_tag_missing_image(self, docker_manager, mock_docker_client):
+        # Setup
+        mock_docker_client.images.get.side_effect = ImageNotFound("gone")
+
+        # Execute & Verify
+        assert not docker_manager.tag_image("sha256:abc", "script-container:script")
+
+    def test_cancel_running_marks_run_cancelled(self, docker_manager, mock_docker_client):
+        # Setup
+        mock_container = Mock()
+        mock_container.wait.side_effect = lambda timeout: docker_manager.cancel_running() or {"StatusCode": 137}
+        mock_container.logs.return_value = [b""]
+        mock_docker_client.containers.run.return_value = mock_container
+
+        # Execute
+        run = docker_manager.run_test("test:latest", "python test.py")
+
+        # Verify
+        assert not run
+        assert run.cancelled
+        assert run.get_error_message().startswith("The test was cancelled")
+        mock_container.kill.assert_called_once()
+
+    def test_collect_garbage(self, docker_manager, mock_docker_client):
+        # Setup
+        def image(tags, created, size, last_tag_time=None):
+            return Mock(tags=tags, id=f"sha256:{tags[0] if tags else 'dangling'}", short_id="sha256:abc",
+                        attrs={"Created": created, "Size": size, "Metadata": {"LastTagTime": last_tag_time}})
+
+        generated = [
+            image(["script-container:fresh"], "2026-01-10T00:00:00.123456789Z", 300),
+            # Built long ago, but re-tagged from the result store yesterday
+            image(["script-container:reused"], "2025-01-01T00:00:00Z", 300, "2026-01-09T00:00:00Z"),
+            image(["script-container:big", "script-container:big-candidate-1"], "2026-01-08T00:00:00Z", 600),
+            image(["script-container:old"], "2025-12-01T00:00:00Z", 100),
+        ]
+        dangling = [image([], "2026-01-01T00:00:00Z", 50), image([], "2026-01-10T23:59:00Z", 50)]
+        mock_docker_client.images.list.side_effect = lambda name=None, filters=None: dangling if filters else generated
+        exited = Mock(status="exited", attrs={"Config": {"Image": "script-container:fresh"}, "Created": "2026-01-10T00:00:00Z"})
+        warm = Mock(status="running", attrs={"Config": {"Image": "script-container:fresh"}, "Created": "2026-01-10T00:00:00Z"})
+        other = Mock(status="exited", attrs={"Config": {"Image": "postgres:16"}, "Created": "2025-01-01T00:00:00Z"})
+        # Exited a minute ago, its run may not have read the logs yet
+        just_exited = Mock(status="exited", attrs={"Config": {"Image": "script-container:big"}, "Created": "2026-01-10T23:58:00Z",
+                                                   "State": {"FinishedAt": "2026-01-10T23:59:00Z"}})
+        exited.name = "confident_turing"
+        mock_docker_client.containers.list.return_value = [exited, warm, other, just_exited]
+        policy = GCPolicy(max_age_days=7, max_images=10, max_image_bytes=1000)
+        now = datetime(2026, 1, 11, tzinfo=timezone.utc).timestamp()
+
+        # Execute
+        items = docker_manager.collect_garbage(policy, now=now)
+
+        # Verify
+        assert [(item.kind, item.name.split(" ")[0], item.reason.split(" ")[0]) for item in items] == [
+            ("container", "confident_turing", "left"),
+            ("image", "script-container:big,", "beyond"),
+            ("image", "script-container:old", "unused"),
+            ("dangling image", "sha256:abc", "left"),
+        ]
+        exited.remove.assert_called_once_with(force=True)
+        warm.remove.assert_not_called()
+        just_exited.remove.assert_not_called()
+        removed = [call.args[0] for call in mock_docker_client.images.remove.call_args_list]
+        assert removed == ["script-container:big", "script-container:big-candidate-1", "script-container:old",
+                           "sha256:dangling"]
+
+    def test_collect_garbage_dry_run(self, docker_manager, mock_docker_client):
+        # Setup
+        old = Mock(tags=["script-container:old"], attrs={"Created": "2020-01-01T00:00:00Z", "Size": 100})
+        mock_docker_client.images.list.side_effect = lambda name=None, filters=None: [] if filters else [old]
+        mock_docker_client.containers.list.return_value = []
+
+        # Execute
+        items = docker_manager.collect_garbage(GCPolicy(dry_run=True))
+
+        # Verify
+        assert [item.name for item in items] == ["script-container:old"]
+        mock_docker_client.images.remove.assert_not_called()
@@ -0,0 +1,189 @@
+import json
+import threading
+import pytest
+from src.constants import FakeDockerConstants
+from src.core.build_context_archive import BuildContextArchive
+from src.core.docker_backend import DaemonDockerBackend, get_docker_backend
+from src.core.docker_manager import DockerManager
+from src.core.fake_docker_backend import FakeDockerBackend
+from src.models.container_run import ContainerLimits
+from src.models.fake_docker import FakeDockerConfig, FakeTiming
+from src.models.garbage_collection import GCPolicy
+
+
+DOCKERFILE = """FROM python:3.11
+RUN pip install requests
+COPY script.py /app/
+ENTRYPOINT ["python", "/app/script.py"]
+"""
+
+
+def create_manager(**config) -> DockerManager:
+    # No simulated time passes, so the tests only check the outcomes
+    return DockerManager(backend=FakeDockerBackend(FakeDockerConfig(seed=1, time_scale=0, **config)))
+
+
+class TestFakeDockerBackend:
+    @pytest.fixture
+    def context_directory(self, tmp_path):
+        (tmp_path / "Dockerfile").write_text(DOCKERFILE)
+        (tmp_path / "script.py").write_text("print('hello')\n")
+        return tmp_path
+
+    def test_build_reuses_cached_layers(self, context_directory):
+        # Setup
+        manager = create_manager(layer_bytes=10, default_base_image_bytes=100)
+
+        # Execute
+        first = manager.build_image(str(context_directory), "script-container:test")
+        second = manager.build_image(str(context_directory), "script-container:test")
+        (context_directory / "script.py").write_text("print('changed')\n")
+        third = manager.build_image(str(context_directory), "script-container:test")
+
+        # Verify
+        assert first and second and third
+        assert [step.cached for step in first.steps] == [False, False, False, False]
+        assert [step.cached for step in second.steps] == [False, True, True, True]
+        assert [step.cached for step in third.steps] == [False, True, False, False]
+        assert second.image_id == first.image_id != third.image_id
+        assert first.size == 130
+        assert manager.client.images.get("script-container:test").id == third.image_id
+
+    def test_build_from_in_memory_context(self, context_directory):
+        manager = create_manager()
+        archive = BuildContextArchive({"script.py": str(context_directory / "script.py")})
+
+        result = manager.build_image(None, "script-container:test", fileobj=archive.build(DOCKERFILE))
+
+        assert result
+        assert manager.client.images.get(result.image_id).attrs["Config"]["Entrypoint"] == ["python", "/app/script.py"]
+
+    def test_failing_instruction_fails_build(self, context_directory):
+        # Setup
+        manager = create_manager(failing_instructions=["pip install"])
+
+        # Execute
+        result = manager.build_image(str(context_directory), "script-container:test")
+
+        # Verify
+        assert not result
+        assert result.error == "The command '/bin/sh -c pip install requests' returned a non-zero code: 1"
+        assert result.error_step.instruction == "RUN pip install requests"
+
+    def test_failed_pull_fails_build(self, context_directory):
+        manager = create_manager(pull_failure_rate=1)
+
+        result = manager.build_image(str(context_directory), "script-container:test")
+
+        assert not result
+        assert "pull access denied for python:3.11" in result.error
+
+    @pytest.mark.parametrize("config,exit_code,timed_out", [
+        ({}, 0, False),
+        ({"test_failure_rate": 1}, 1, False),
+        ({"test_timeout_rate": 1}, None, True),
+    ])
+    def test_run_test_outcomes(self, context_directory, config, exit_code, timed_out):
+        # Setup
+        manager = create_manager(**config)
+        manager.build_image(str(context_directory), "script-container:test")
+
+        # Execute
+        run = manager.run_test("script-container:test", "input.txt")
+
+        # Verify
+        assert (run.exit_code, run.timed_out) == (exit_code, timed_out)
+        assert manager.client.containers.list(all=True) == []
+
+    def test_cancel_running_kills_hanging_test(self, context_directory):
+        # Setup
+        manager = DockerManager(
+            # Only the test takes real time, hanging until it is killed
+            backend=FakeDockerBackend(FakeDockerConfig(test_timeout_rate=1, pull=FakeTiming(), step=FakeTiming(),
+                                                       run_step=FakeTiming(), cached_step=FakeTiming())),
+            limits=ContainerLimits(timeout_seconds=30),
+        )
+        manager.build_image(str(context_directory), "script-container:test")
+        runs = []
+        thread = threading.Thread(target=lambda: runs.append(manager.run_test("script-container:test", "")))
+
+        # Execute
+        thread.start()
+        while not manager.client.containers.list():
+            pass
+        manager.cancel_running()
+        thread.join(timeout=5)
+
+        # Verify
+        assert runs[0].cancelled
+        assert runs[0].exit_code == FakeDockerConstants.KILLED_EXIT_CODE
+
+    def test_cancel_running_kills_hanging_warm_test(self, context_directory):
+        # Setup
+        manager = DockerManager(
+            backend=FakeDockerBackend(FakeDockerConfig(test_timeout_rate=1, pull=FakeTiming(), step=FakeTiming(),
+                                                       run_step=FakeTiming(), cached_step=FakeTiming())),
+            limits=ContainerLimits(timeout_seconds=30),
+            warm_containers=True,
+        )
+        manager.build_image(str(context_directory), "script-container:test")
+        runs = []
+        thread = threading.Thread(target=lambda: runs.append(manager.run_test("script-container:test", "")))
+
+        # Execute
+        thread.start()
+        while not manager.client.api._execs:
+            pass
+        manager.cancel_running()
+        thread.join(timeout=5)
+
+        # Verify
+        assert runs[0].cancelled
+        assert manager.client.containers.list(all=True) == []
+
+    def test_warm_containers(self, context_directory):
+        # Setup
+        manager = create_manager()
+        manager.warm_containers = True
+        manager.build_image(str(context_directory), "script-container:test")
+
+        # Execute
+        runs = [manager.run_test("script-container:test", "input.txt") for _ in range(2)]
+        manager.close()
+
+        # Verify
+        assert all(run.exit_code == 0 and run.logs == "Test passed\n" for run in runs)
+        assert manager.client.containers.list(all=True) == []
+
+    def test_collect_garbage(self, context_directory):
+        # Setup
+        manager = create_manager()
+        manager.build_image(str(context_directory), "script-container:test")
+
+        # Execute
+        items = manager.collect_garbage(GCPolicy(max_images=0))
+
+        # Verify
+        assert [(item.kind, item.name) for item in items] == [("image", "script-container:test")]
+        assert manager.client.images.list(name="script-container") == []
+
+    def test_buildkit_falls_back_to_classic_builder(self):
+        manager = DockerManager(use_buildkit=True, backend=FakeDockerBackend())
+
+        assert not manager.use_buildkit
+
+    def test_get_docker_backend(self, tmp_path, monkeypatch):
+        # Setup
+        config_path = tmp_path / "fake_docker.json"
+        config_path.write_text(json.dumps({"build_failure_rate": 0.5, "run_step": {"seconds": 3}}))
+        monkeypatch.setenv(FakeDockerConstants.CONFIG_PATH_ENV_VAR, str(config_path))
+
+        # Execute
+        fake = get_docker_backend("fake")
+
+        # Verify
+        assert isinstance(get_docker_backend("daemon"), DaemonDockerBackend)
+        assert fake.config.build_failure_rate == 0.5
+        assert fake.config.run_step.seconds == 3
+        with pytest.raises(ValueError):
+            get_docker_backend("podman")
@@ -0,0 +1,78 @@
+import pytest
+from src.core.image_result_store import ImageResultStore
+from src.models.container_run import ContainerLimits
+
+
+class TestImageResultStore:
+    @pytest.fixture
+    def script_path(self, tmp_path):
+        path = tmp_path / "script.py"
+        path.write_text("print('hello')")
+        return path
+
+    @pytest.fixture
+    def store(self, tmp_path, script_path):
+        return ImageResultStore(str(tmp_path / "store" / "results.sqlite3"), {"script.py": str(script_path)}, "python script.py")
+
+    def test_key_depends_on_dockerfile_script_test_command_and_limits(self, tmp_path, store, script_path):
+        key = store.get_key("FROM python:3.11")
+
+        assert key == store.get_key("FROM python:3.11")
+        assert key != store.get_key("FROM python:3.12")
+        assert key != ImageResultStore(store.db_path, store.manifest, "python script.py --verbose").get_key("FROM python:3.11")
+        assert key == ImageResultStore(store.db_path, store.manifest, store.test_command, ContainerLimits()).get_key("FROM python:3.11")
+        for limits in (ContainerLimits(mem_limit="1g"), ContainerLimits(timeout_seconds=5)):
+            assert key != ImageResultStore(store.db_path, store.manifest, store.test_command, limits).get_key("FROM python:3.11")
+        script_path.write_text("print('changed')")
+        assert key != ImageResultStore(store.db_path, store.manifest, store.test_command).get_key("FROM python:3.11")
+
+    def test_build_and_test_are_recorded(self, store):
+        key = store.get_key("FROM python:3.11")
+        assert store.get(key) is None
+
+        store.record_build(key, "sha256:abc")
+        store.record_test(key, False, "exit code 1")
+
+        stored = store.get(key)
+        assert (stored.image_id, stored.test_passed, stored.test_error) == ("sha256:abc", False, "exit code 1")
+
+    def test_rebuild_forgets_test_outcome(self, store):
+        key = store.get_key("FROM python:3.11")
+        store.record_build(key, "sha256:abc")
+        store.record_test(key, True)
+
+        store.record_build(key, "sha256:def")
+
+        stored = store.get(key)
+        assert (stored.image_id, stored.test_passed) == ("sha256:def", None)
+
+    def test_entry_of_removed_image_is_pruned(self, store):
+        key = store.get_key("FROM python:3.11")
+        store.record_build(key, "sha256:abc")
+
+        assert store.get(key, image_exists=lambda image_id: False) is None
+        assert store.get(key) is None
+
+    def test_expired_and_excess_entries_are_evicted(self, store, mocker):
+        # Setup
+        store.max_entries = 2
+        time = mocker.patch("src.core.image_result_store.time.time", return_value=1000.0)
+        keys = [store.get_key(f"FROM python:3.{minor}") for minor in range(3)]
+
+        # Execute
+        for offset, key in enumerate(keys):
+            time.return_value = 1000.0 + offset
+            store.record_build(key, f"sha256:{offset}")
+
+        # Verify
+        assert [store.get(key) is not None for key in keys] == [False, True, True]
+        time.return_value = 1002.0 + store.max_age_seconds
+        assert store.get(keys[1]) is None
+        assert store.get(keys[2]) is not None
+
+    def test_current_key_per_tag(self, store):
+        store.set_current_key("script-container:script", "key")
+        assert store.get_current_key("script-container:script") == "key"
+
+        store.set_current_key("script-container:script", None)
+        assert store.get_current_key("script-container:script") is None
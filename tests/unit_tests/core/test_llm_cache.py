@@ -0,0 +1,47 @@
+import os
+import time
+import pytest
+from src.core.llm_cache import LLMResponseCache
+
+
+class TestLLMResponseCache:
+    @pytest.fixture
+    def cache(self, tmp_path):
+        return LLMResponseCache(cache_dir=str(tmp_path), max_entries=2, max_age_seconds=60)
+
+    def test_build_key_depends_on_every_input(self):
+        base = dict(prompt="p", system_message="s", provider_name="OpenAIProvider", model_name="m", temperature=0.3)
+        key = LLMResponseCache.build_key(**base)
+
+        assert key == LLMResponseCache.build_key(**base)
+        for field, value in [("prompt", "other"), ("system_message", None), ("provider_name", "Google"),
+                             ("model_name", "m2"), ("temperature", 0.5)]:
+            assert key != LLMResponseCache.build_key(**{**base, field: value})
+
+    def test_set_and_get(self, cache):
+        cache.set("key", "response")
+
+        assert cache.get("key") == "response"
+        assert cache.get("missing") is None
+
+    def test_expired_entry_is_ignored(self, cache, tmp_path):
+        cache.set("key", "response")
+        expired = time.time() - 120
+        os.utime(tmp_path / "key.json", (expired, expired))
+
+        assert cache.get("key") is None
+        assert not (tmp_path / "key.json").exists()
+
+    def test_least_recently_used_entry_is_evicted(self, cache, tmp_path):
+        cache.set("first", "1")
+        cache.set("second", "2")
+        older = time.time() - 30
+        os.utime(tmp_path / "first.json", (older, older))
+        os.utime(tmp_path / "second.json", (older + 1, older + 1))
+        cache.get("first")
+
+        cache.set("third", "3")
+
+        assert cache.get("first") == "1"
+        assert cache.get("second") is None
+        assert cache.get("third") == "3"
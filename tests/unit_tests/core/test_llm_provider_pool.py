@@ -0,0 +1,72 @@
+import pytest
+from unittest.mock import Mock
+from langchain_core.tools import StructuredTool
+from src.core.llm_interface import LLMProvider, ThreadBoundTool
+from src.core.llm_provider_pool import LLMProviderPool
+
+
+class FakeProvider:
+    def __init__(self, tools, model_name=None, temperature=None):
+        self.tools = tools
+        self.model_name = model_name
+        self.temperature = temperature
+
+
+class FakeTool:
+    def __init__(self, name):
+        self.name = name
+
+
+class TestLLMProviderPool:
+    @pytest.fixture(autouse=True)
+    def clear_pool(self):
+        LLMProviderPool.clear()
+        yield
+        LLMProviderPool.clear()
+
+    def test_same_configuration_shares_provider(self):
+        first = LLMProviderPool.get_provider(FakeProvider)
+        second = LLMProviderPool.get_provider(FakeProvider)
+
+        assert first is second
+
+    def test_different_configuration_gets_new_provider(self):
+        default = LLMProviderPool.get_provider(FakeProvider)
+        other_model = LLMProviderPool.get_provider(FakeProvider, model_name="other")
+        other_temperature = LLMProviderPool.get_provider(FakeProvider, temperature=0.9)
+
+        assert default is not other_model
+        assert default is not other_temperature
+        assert other_model.model_name == "other"
+        assert other_temperature.temperature == 0.9
+
+    def test_toolsets_are_keyed_by_name_and_type(self):
+        tool = FakeTool("build_image")
+        recreated_tool = FakeTool("build_image")
+        other_tool = FakeTool("test_container")
+
+        with_tool = LLMProviderPool.get_provider(FakeProvider, tools=[tool])
+
+        assert LLMProviderPool.get_provider(FakeProvider, tools=[recreated_tool]) is with_tool
+        assert LLMProviderPool.get_provider(FakeProvider, tools=[other_tool]) is not with_tool
+        assert with_tool.tools == [tool]
+
+
+class TestThreadBoundTool:
+    def test_runs_the_tool_bound_to_the_thread(self):
+        # Setup
+        created_with = StructuredTool.from_function(lambda text: f"stale {text}", name="echo", description="Echo")
+        bound = StructuredTool.from_function(lambda text: f"current {text}", name="echo", description="Echo")
+        provider = Mock(spec=LLMProvider)
+        provider.tools_by_thread = {}
+        provider.get_thread_tool = lambda thread_id, name: LLMProvider.get_thread_tool(provider, thread_id, name)
+        LLMProvider.bind_thread_tools(provider, "thread", [bound])
+        tool = ThreadBoundTool(provider, created_with)
+
+        # Execute
+        current = tool.invoke({"text": "hi"}, config={"configurable": {"thread_id": "thread"}})
+        unbound = tool.invoke({"text": "hi"}, config={"configurable": {"thread_id": "other"}})
+
+        # Verify
+        assert current == "current hi"
+        assert unbound == "stale hi"
@@ -0,0 +1,28 @@
+from src.core.log_capture import LogCapture
+
+
+class TestLogCapture:
+    def test_small_output_is_kept_whole(self):
+        capture = LogCapture(head_bytes=8, tail_bytes=8).feed_all([b"hello ", b"world"])
+
+        assert capture.get_text() == "hello world"
+        assert not capture.truncated
+
+    def test_large_output_keeps_head_and_tail(self):
+        capture = LogCapture(head_bytes=4, tail_bytes=6)
+
+        for chunk in [b"start-", b"x" * 1000, b"-the-end"]:
+            capture.feed(chunk)
+
+        assert capture.total_bytes == 1014
+        assert capture.captured_bytes == 10
+        assert capture.get_text() == "star\n... [1004 bytes omitted] ...\nhe-end"
+
+    def test_zero_tail_keeps_only_head(self):
+        capture = LogCapture(head_bytes=4, tail_bytes=0)
+
+        for _ in range(100):
+            capture.feed(b"x" * 1000)
+
+        assert len(capture._tail) == 0
+        assert capture.get_text() == "xxxx\n... [99996 bytes omitted] ...\n"
@@ -0,0 +1,87 @@
+import asyncio
+import time
+import pytest
+from unittest.mock import Mock, patch
+from src.core.replay_provider import ReplayProvider
+
+
+class TestReplayProvider:
+    @pytest.fixture
+    def cassette_path(self, tmp_path, monkeypatch):
+        path = tmp_path / "cassette.json"
+        monkeypatch.setenv("LLM_CASSETTE_PATH", str(path))
+        return path
+
+    @pytest.fixture
+    def recorder(self):
+        recorder = Mock()
+        recorder.model_name = "gpt-4o-mini"
+        recorder.generate_response.side_effect = ["first answer", "second answer"]
+        recorder.get_token_usage.return_value = {"input_tokens": 10, "output_tokens": 5, "total_tokens": 15}
+        return recorder
+
+    @pytest.fixture
+    def recorded_cassette(self, cassette_path, recorder, monkeypatch):
+        monkeypatch.setenv("LLM_REPLAY_MODE", "record")
+        with patch.object(ReplayProvider, "_create_recorder", return_value=recorder):
+            provider = ReplayProvider()
+            provider.generate_response("prompt", "system")
+            provider.generate_response("prompt", "system")
+        monkeypatch.setenv("LLM_REPLAY_MODE", "replay")
+        return cassette_path
+
+    def test_record_writes_cassette(self, recorded_cassette, recorder):
+        assert recorded_cassette.exists()
+        assert recorder.generate_response.call_count == 2
+
+    def test_explicit_zero_temperature_is_kept(self, recorded_cassette):
+        assert ReplayProvider(temperature=0.0).temperature == 0.0
+
+    def test_replay_serves_recorded_responses_in_order(self, recorded_cassette):
+        provider = ReplayProvider()
+
+        assert provider.generate_response("prompt", "system", thread_id="t") == "first answer"
+        assert provider.get_token_usage("t") == {"input_tokens": 10, "output_tokens": 5, "total_tokens": 15}
+        assert provider.generate_response("prompt", "system") == "second answer"
+        assert provider.generate_response("prompt", "system") == "second answer"
+        assert asyncio.run(provider.agenerate_response("prompt", "system")) == "second answer"
+
+    def test_replay_unknown_prompt_fails(self, recorded_cassette):
+        provider = ReplayProvider()
+
+        with pytest.raises(LookupError):
+            provider.generate_response("another prompt", "system")
+
+    def test_replay_simulates_latency(self, recorded_cassette, monkeypatch):
+        monkeypatch.setenv("LLM_REPLAY_LATENCY", "0.05")
+        provider = ReplayProvider()
+
+        start = time.monotonic()
+        assert "".join(provider.stream_response("prompt", "system")) == "first answer"
+        assert time.monotonic() - start >= 0.05
+
+    def test_replay_without_cassette_fails(self, cassette_path):
+        with pytest.raises(FileNotFoundError):
+            ReplayProvider()
+
+    def test_record_keeps_interactions_of_other_instances(self, cassette_path, monkeypatch):
+        # Setup
+        monkeypatch.setenv("LLM_REPLAY_MODE", "record")
+        recorders = []
+        for answer in ("first answer", "second answer"):
+            recorder = Mock(model_name="gpt-4o-mini")
+            recorder.generate_response.return_value = answer
+            recorder.get_token_usage.return_value = {}
+            recorders.append(recorder)
+        with patch.object(ReplayProvider, "_create_recorder", side_effect=recorders):
+            first, second = ReplayProvider(), ReplayProvider()
+
+        # Execute
+        first.generate_response("first prompt", "system")
+        second.generate_response("second prompt", "system")
+        monkeypatch.setenv("LLM_REPLAY_MODE", "replay")
+        provider = ReplayProvider()
+
+        # Verify
+        assert provider.generate_response("first prompt", "system") == "first answer"
+        assert provider.generate_response("second prompt", "system") == "second answer"
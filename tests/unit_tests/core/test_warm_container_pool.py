@@ -0,0 +1,183 @@
+import time
+import threading
+import pytest
+from unittest.mock import Mock, patch
+from docker.errors import APIError, DockerException, NotFound
+from src.core.docker_client_pool import DockerClientPool
+from src.core.docker_manager import DockerManager
+from src.core.warm_container_pool import WarmContainerPool
+from src.models.container_run import ContainerLimits, ContainerRunResult
+
+
+class TestWarmContainerPool:
+    @pytest.fixture
+    def container(self):
+        container = Mock()
+        container.status = "running"
+        container.id = "abc123"
+        return container
+
+    @pytest.fixture
+    def client(self, container):
+        client = Mock()
+        client.images.get.return_value.attrs = {"Config": {"Entrypoint": ["python", "/app/word_counter.py"], "Cmd": None}}
+        client.containers.run.return_value = container
+        client.api.exec_create.return_value = {"Id": "exec1"}
+        client.api.exec_start.side_effect = lambda exec_id, stream: iter([b"2", b"\n"])
+        client.api.exec_inspect.return_value = {"ExitCode": 0}
+        return client
+
+    def test_container_is_reused_with_image_entrypoint(self, client, container):
+        # Setup
+        pool = WarmContainerPool(client, ContainerLimits())
+
+        # Execute
+        runs = [ContainerRunResult(tag="test:latest", test_command=command) for command in ["'Hello world'", "'a b c'"]]
+        for run in runs:
+            pool.run(run)
+
+        # Verify
+        assert all(run and run.logs == "2\n" for run in runs)
+        client.containers.run.assert_called_once()
+        assert client.containers.run.call_args.kwargs["entrypoint"] == ["sleep", "2147483647"]
+        client.api.exec_create.assert_called_with("abc123", ["python", "/app/word_counter.py", "a b c"])
+        pool.close()
+        container.remove.assert_called_once_with(force=True)
+
+    def test_container_is_recycled_after_max_uses(self, client, container):
+        # Setup
+        pool = WarmContainerPool(client, ContainerLimits(), max_uses=2)
+
+        # Execute
+        for _ in range(3):
+            pool.run(ContainerRunResult(tag="test:latest", test_command="x"))
+
+        # Verify
+        assert client.containers.run.call_count == 2
+        container.remove.assert_called_once_with(force=True)
+
+    def test_container_is_replaced_once_the_tag_points_to_another_image(self, client, container):
+        # Setup
+        pool = WarmContainerPool(client, ContainerLimits())
+
+        # Execute
+        for image_id in ["sha256:first", "sha256:first", "sha256:rebuilt"]:
+            client.images.get.return_value.id = image_id
+            pool.run(ContainerRunResult(tag="test:latest", test_command="x"))
+
+        # Verify
+        assert client.containers.run.call_count == 2
+        container.remove.assert_called_once_with(force=True)
+
+    def test_concurrent_first_tests_start_one_container(self, client, container):
+        # Setup
+        client.containers.run.side_effect = lambda *args, **kwargs: time.sleep(0.05) or container
+        pool = WarmContainerPool(client, ContainerLimits())
+        runs = [ContainerRunResult(tag="test:latest", test_command="x") for _ in range(4)]
+
+        # Execute
+        threads = [threading.Thread(target=pool.run, args=(run,)) for run in runs]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Verify
+        assert all(run.exit_code == 0 for run in runs)
+        client.containers.run.assert_called_once()
+        assert pool._containers["test:latest"].uses == 4
+
+    def test_cancel_kills_busy_container(self, client, container):
+        # Setup
+        started = threading.Event()
+        removed = threading.Event()
+        client.api.exec_start.side_effect = lambda exec_id, stream: started.set() or removed.wait(5) or iter([])
+        client.api.exec_inspect.side_effect = NotFound("No such exec instance")
+        container.remove.side_effect = lambda force: removed.set()
+        pool = WarmContainerPool(client, ContainerLimits())
+        run = ContainerRunResult(tag="test:latest", test_command="x")
+        thread = threading.Thread(target=pool.run, args=(run,))
+
+        # Execute
+        thread.start()
+        started.wait(5)
+        pool.cancel()
+        thread.join(timeout=5)
+
+        # Verify
+        assert run.cancelled
+        container.remove.assert_called_once_with(force=True)
+        assert pool._containers == {}
+
+    def test_timeout_kills_container(self, client, container):
+        # Setup
+        client.api.exec_start.side_effect = lambda exec_id, stream: time.sleep(0.5) or iter([])
+        pool = WarmContainerPool(client, ContainerLimits(timeout_seconds=0.05))
+        run = ContainerRunResult(tag="test:latest", test_command="x")
+
+        # Execute
+        pool.run(run)
+
+        # Verify
+        assert run.timed_out and not run
+        container.remove.assert_called_once_with(force=True)
+
+    def test_image_that_cannot_idle_raises(self, client, container):
+        # Setup
+        container.status = "exited"
+        pool = WarmContainerPool(client, ContainerLimits())
+
+        # Execute and verify
+        with pytest.raises(DockerException):
+            pool.run(ContainerRunResult(tag="test:latest", test_command="x"))
+        container.remove.assert_called_once_with(force=True)
+
+
+class TestDockerManagerWarmContainers:
+    @pytest.fixture(autouse=True)
+    def clear_client_pool(self):
+        DockerClientPool.clear()
+        yield
+        DockerClientPool.clear()
+
+    def test_falls_back_to_new_container(self):
+        # Setup
+        client = Mock()
+        client.images.get.return_value.attrs = {"Config": {}}
+        client.containers.run.return_value.reload.side_effect = APIError("No such container")
+        client.containers.run.return_value.wait.return_value = {"StatusCode": 0}
+        client.containers.run.return_value.logs.return_value = [b"ok"]
+        with patch('docker.from_env', return_value=client):
+            manager = DockerManager(warm_containers=True)
+
+            # Execute
+            result = manager.test_container("test:latest", "x")
+
+        # Verify
+        assert result is True
+        assert "entrypoint" not in client.containers.run.call_args.kwargs
+        assert manager.run_history[-1].logs == "ok"
+        assert client.containers.run.return_value.remove.call_count == 2
+
+    def test_rebuild_keeps_warm_container_of_unchanged_image(self):
+        # Setup
+        client = Mock()
+        client.images.get.return_value.attrs = {"Config": {}}
+        client.images.get.return_value.id = "sha256:abc"
+        client.containers.run.return_value.status = "running"
+        client.api.exec_create.return_value = {"Id": "exec1"}
+        client.api.exec_start.return_value = []
+        client.api.exec_inspect.return_value = {"ExitCode": 0}
+        client.api.build.return_value = []
+        with patch('docker.from_env', return_value=client):
+            manager = DockerManager(warm_containers=True)
+
+            # Execute
+            manager.test_container("test:latest", "x")
+            manager.build_image("/path/to/context", "test:latest")
+            manager.test_container("test:latest", "x")
+            manager.close()
+
+        # Verify
+        client.containers.run.assert_called_once()
+        client.containers.run.return_value.remove.assert_called_once_with(force=True)
@@ -0,0 +1,43 @@
+from src.models.token_ledger import TokenLedger
+
+
+class TestTokenLedger:
+    def test_totals_accumulate_per_stage_and_run(self):
+        ledger = TokenLedger()
+        ledger.record("script_analysis", {"input_tokens": 100, "output_tokens": 50, "total_tokens": 150})
+        ledger.record("generation_attempt_1", {"input_tokens": 200, "output_tokens": 100, "total_tokens": 300})
+        ledger.record("generation_attempt_1", {"input_tokens": 10, "output_tokens": 5, "total_tokens": 15})
+
+        totals = ledger.get_totals()
+        stage_totals = ledger.get_stage_totals()
+
+        assert totals["input_tokens"] == 310
+        assert totals["output_tokens"] == 155
+        assert totals["total_tokens"] == 465
+        assert list(stage_totals) == ["script_analysis", "generation_attempt_1"]
+        assert stage_totals["generation_attempt_1"]["total_tokens"] == 315
+
+    def test_cost_uses_model_pricing(self):
+        ledger = TokenLedger()
+        entry = ledger.record("generation", {"input_tokens": 1_000_000, "output_tokens": 1_000_000}, "gpt-4o-mini")
+
+        assert entry.total_tokens == 2_000_000
+        assert round(entry.cost, 2) == 0.75
+        assert ledger.record("generation", {"input_tokens": 100}, "unknown-model").cost == 0
+
+    def test_budget(self):
+        ledger = TokenLedger(max_total_tokens=200)
+        ledger.record("script_analysis", {"input_tokens": 100, "output_tokens": 50, "total_tokens": 150})
+        assert not ledger.is_budget_exceeded()
+
+        ledger.record("example_analysis", {"input_tokens": 40, "output_tokens": 10, "total_tokens": 50})
+        assert ledger.is_budget_exceeded()
+
+        ledger.reset()
+        assert not ledger.is_budget_exceeded()
+
+    def test_cost_budget(self):
+        ledger = TokenLedger(max_cost=0.1)
+        ledger.record("generation", {"input_tokens": 1_000_000, "output_tokens": 0}, "gpt-4o-mini")
+
+        assert ledger.is_budget_exceeded()
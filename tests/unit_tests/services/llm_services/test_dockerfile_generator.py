@@ -0,0 +1,333 @@
+import pytest
+import threading
+from unittest.mock import Mock
+from src.core.llm_provider_pool import LLMProviderPool
+from src.models.build_context import BuildContext
+from src.models.docker_file_generation import DockerfileGenerationRequest
+from src.models.script_analysis import ScriptAnalysis
+from src.services.llm_services.dockerfile_generator import DockerfileGenerator
+
+
+class RecordingLLMProvider:
+    def __init__(self, tools):
+        self.tools = tools
+        self.calls = []
+
+    def generate_response(self, prompt, system_message=None, thread_id=None):
+        self.calls.append({"prompt": prompt, "system_message": system_message, "thread_id": thread_id})
+        return f"FROM python:3.11\n# attempt {len(self.calls)}"
+
+    def stream_response(self, prompt, system_message=None, thread_id=None):
+        self.calls.append({"prompt": prompt, "system_message": system_message, "thread_id": thread_id})
+        if len(self.calls) == 1:
+            yield "Sure! Here is your Dockerfile:\n"
+            yield "```dockerfile\n"
+            raise AssertionError("The stream should have been aborted")
+        yield from ["```docker", "file\nFROM python:3.11\n", "COPY word_counter.py .\n```", "\nDone."]
+
+    def bind_thread_tools(self, thread_id, tools):
+        pass
+
+    def release_thread(self, thread_id):
+        pass
+
+
+class CandidateLLMProvider:
+    """Answers with a Dockerfile naming the temperature it was created with."""
+    calls = []
+
+    def __init__(self, tools, temperature=None):
+        self.tools = tools
+        self.temperature = temperature
+
+    def generate_response(self, prompt, system_message=None, thread_id=None):
+        self.calls.append({"prompt": prompt, "temperature": self.temperature, "thread_id": thread_id})
+        return f"FROM python:3.11\n# temperature {self.temperature}"
+
+    def bind_thread_tools(self, thread_id, tools):
+        pass
+
+    def release_thread(self, thread_id):
+        pass
+
+
+class TestDockerfileGenerator:
+    @pytest.fixture(autouse=True)
+    def clear_pool(self):
+        LLMProviderPool.clear()
+        yield
+        LLMProviderPool.clear()
+
+    @pytest.fixture
+    def request_model(self):
+        return DockerfileGenerationRequest(
+            script_analysis=ScriptAnalysis(
+                language="python",
+                version_requirements={"python": ">=3.6"},
+                system_dependencies=[],
+                environment_variables=[],
+                execution_pattern={},
+            ),
+            test_command="'Hello world'",
+            build_context=BuildContext(script_name="word_counter", script_path="/path/to/word_counter.py"),
+        )
+
+    @pytest.fixture
+    def build_image_tool(self):
+        tool = Mock()
+        tool.name = "build_image"
+        tool._run.side_effect = ["E: Unable to locate package foo\nmore details", "x" * 5000 + "final error", None]
+        return tool
+
+    @pytest.fixture
+    def test_container_tool(self):
+        tool = Mock()
+        tool.name = "test_container"
+        tool._run.return_value = None
+        return tool
+
+    def test_compact_history_uses_fresh_bounded_conversations(self, request_model, build_image_tool, test_container_tool):
+        generator = DockerfileGenerator(RecordingLLMProvider, build_image_tool, test_container_tool, history_mode="compact",
+                                        use_templates=False)
+
+        result = generator.generate_dockerfile(request_model)
+
+        calls = generator.llm.calls
+        assert result.file_content == "FROM python:3.11\n# attempt 3"
+        assert len(calls) == 3
+        assert len({call["thread_id"] for call in calls}) == 3
+        assert all(call["system_message"] for call in calls)
+
+        last_prompt = calls[2]["prompt"]
+        assert "word_counter" in last_prompt
+        assert "# attempt 2" in last_prompt
+        assert "# attempt 1" not in last_prompt
+        assert "Attempt 1: E: Unable to locate package foo" in last_prompt
+        assert "more details" not in last_prompt
+        assert "final error" in last_prompt
+        assert "x" * 2000 not in last_prompt
+
+    def test_full_history_reuses_conversation(self, request_model, build_image_tool, test_container_tool):
+        generator = DockerfileGenerator(RecordingLLMProvider, build_image_tool, test_container_tool, history_mode="full",
+                                        use_templates=False)
+
+        generator.generate_dockerfile(request_model)
+
+        calls = generator.llm.calls
+        assert len(calls) == 3
+        assert len({call["thread_id"] for call in calls}) == 1
+        assert calls[0]["system_message"]
+        assert calls[1]["system_message"] is None
+        assert "E: Unable to locate package foo" in calls[1]["prompt"]
+
+    def test_streaming_aborts_invalid_completion_without_building(self, request_model, build_image_tool, test_container_tool):
+        build_image_tool._run.side_effect = None
+        build_image_tool._run.return_value = None
+        generator = DockerfileGenerator(RecordingLLMProvider, build_image_tool, test_container_tool, streaming=True,
+                                        use_templates=False)
+
+        result = generator.generate_dockerfile(request_model)
+
+        calls = generator.llm.calls
+        assert result.file_content == "FROM python:3.11\nCOPY word_counter.py ."
+        assert len(calls) == 2
+        assert "not a valid Dockerfile" in calls[1]["prompt"]
+        build_image_tool._run.assert_called_once_with("FROM python:3.11\nCOPY word_counter.py .")
+
+    def test_template_dockerfile_skips_llm(self, request_model, build_image_tool, test_container_tool):
+        build_image_tool._run.side_effect = None
+        build_image_tool._run.return_value = None
+        generator = DockerfileGenerator(RecordingLLMProvider, build_image_tool, test_container_tool)
+
+        result = generator.generate_dockerfile(request_model)
+
+        assert generator.llm.calls == []
+        assert result.file_content.startswith("FROM python:3.11\n")
+        assert 'ENTRYPOINT ["python", "/app/word_counter.py"]' in result.file_content
+        build_image_tool._run.assert_called_once_with(result.file_content)
+        test_container_tool._run.assert_called_once()
+
+    def test_failed_template_falls_back_to_llm(self, request_model, build_image_tool, test_container_tool):
+        build_image_tool._run.side_effect = None
+        build_image_tool._run.return_value = None
+        test_container_tool._run.side_effect = ["Unexpected output", None]
+        generator = DockerfileGenerator(RecordingLLMProvider, build_image_tool, test_container_tool)
+
+        result = generator.generate_dockerfile(request_model)
+
+        assert len(generator.llm.calls) == 1
+        assert result.file_content == "FROM python:3.11\n# attempt 1"
+        assert build_image_tool._run.call_count == 2
+
+    def test_dockerfile_is_normalized_before_build(self, request_model, build_image_tool, test_container_tool):
+        build_image_tool._run.side_effect = None
+        build_image_tool._run.return_value = None
+        normalizer = Mock()
+        normalizer.normalize.side_effect = lambda content: content + "# normalized\n"
+        generator = DockerfileGenerator(RecordingLLMProvider, build_image_tool, test_container_tool, normalizer=normalizer)
+
+        result = generator.generate_dockerfile(request_model)
+
+        assert result.file_content.endswith("# normalized\n")
+        build_image_tool._run.assert_called_once_with(result.file_content)
+
+    @pytest.fixture
+    def candidate_tools(self):
+        build_image_tool, test_container_tool = Mock(), Mock()
+        build_image_tool.name, test_container_tool.name = "build_image", "test_container"
+        build_image_tool.tag = "script-container:word_counter"
+        built = {}
+        lock = threading.Lock()
+
+        def for_tag(tag):
+            tool = Mock()
+
+            def build(dockerfile_content):
+                with lock:
+                    built[tag] = dockerfile_content
+                return None
+
+            tool._run.side_effect = build
+            return tool
+
+        def test_for_tag(tag):
+            tool = Mock()
+            # Only the candidate asked for the Alpine variant passes its test
+            tool._run.side_effect = lambda: None if "temperature 1.0" in built[tag] else "Container test failed. exit 1"
+            return tool
+
+        build_image_tool.for_tag.side_effect = for_tag
+        test_container_tool.for_tag.side_effect = test_for_tag
+        return build_image_tool, test_container_tool, built
+
+    def test_candidates_first_passing_wins(self, request_model, candidate_tools):
+        # Setup
+        build_image_tool, test_container_tool, built = candidate_tools
+        CandidateLLMProvider.calls = []
+        generator = DockerfileGenerator(CandidateLLMProvider, build_image_tool, test_container_tool, use_templates=False,
+                                        candidates=3)
+
+        # Execute
+        result = generator.generate_dockerfile(request_model)
+
+        # Verify
+        assert result.file_content == "FROM python:3.11\n# temperature 1.0"
+        # The others may still be generating when the winner is returned
+        calls = list(CandidateLLMProvider.calls)
+        assert len({call["thread_id"] for call in calls}) == len(calls)
+        assert [call["temperature"] for call in calls if "Alpine" in call["prompt"]] == [1.0]
+        assert "script-container:word_counter-candidate-3" in built
+        build_image_tool._run.assert_not_called()
+        test_container_tool.docker_manager.cancel_running.assert_called_once()
+
+    def test_failed_candidates_fall_back_to_fixing_the_best_one(self, request_model, candidate_tools):
+        # Setup
+        build_image_tool, test_container_tool, _ = candidate_tools
+        test_container_tool.for_tag.side_effect = lambda tag: Mock(_run=Mock(return_value="Container test failed. exit 1"))
+        build_image_tool._run.side_effect = None
+        build_image_tool._run.return_value = None
+        test_container_tool._run.return_value = None
+        generator = DockerfileGenerator(RecordingLLMProvider, build_image_tool, test_container_tool, use_templates=False,
+                                        history_mode="full", candidates=2)
+        generator.max_concurrent_builds = 1
+
+        # Execute
+        with pytest.MonkeyPatch.context() as monkeypatch:
+            monkeypatch.setattr(LLMProviderPool, "get_provider", lambda provider_class, tools=None, temperature=None:
+                                CandidateLLMProvider(tools, temperature) if temperature else provider_class(tools))
+            result = generator.generate_dockerfile(request_model)
+
+        # Verify
+        calls = generator.llm.calls
+        assert result.file_content == "FROM python:3.11\n# attempt 1"
+        assert len(calls) == 1
+        # The retry is not made in a candidate's conversation, so it restates the requirements
+        assert calls[0]["system_message"]
+        assert "word_counter" in calls[0]["prompt"]
+        assert "Container test failed" in calls[0]["prompt"]
+
+    def test_candidates_are_not_generated_over_budget(self, request_model, candidate_tools):
+        # Setup
+        build_image_tool, test_container_tool, built = candidate_tools
+        CandidateLLMProvider.calls = []
+        ledger = Mock()
+        ledger.is_budget_exceeded.return_value = True
+        generator = DockerfileGenerator(CandidateLLMProvider, build_image_tool, test_container_tool, use_templates=False,
+                                        candidates=3, ledger=ledger)
+
+        # Execute
+        result = generator.generate_dockerfile(request_model)
+
+        # Verify
+        assert result.file_content is None
+        assert CandidateLLMProvider.calls == []
+        assert built == {}
+
+    def test_provider_error_only_fails_its_candidate(self, request_model, candidate_tools):
+        # Setup
+        build_image_tool, test_container_tool, _ = candidate_tools
+        generator = DockerfileGenerator(CandidateLLMProvider, build_image_tool, test_container_tool, use_templates=False,
+                                        candidates=3)
+
+        def get_provider(provider_class, tools=None, temperature=None):
+            if temperature == 0.2:
+                raise ValueError("Invalid API key")
+            return provider_class(tools, temperature)
+
+        # Execute
+        with pytest.MonkeyPatch.context() as monkeypatch:
+            monkeypatch.setattr(LLMProviderPool, "get_provider", get_provider)
+            result = generator.generate_dockerfile(request_model)
+
+        # Verify
+        assert result.file_content == "FROM python:3.11\n# temperature 1.0"
+
+    def test_optimize_size_keeps_smallest_passing_variant(self, request_model):
+        # Setup
+        sizes = {"python:3.11": 1_000_000_000, "python:3.11-slim": 150_000_000, "python:3.11-alpine": 60_000_000,
+                 "gcr.io/distroless/python3": 50_000_000}
+        built = {}
+
+        def build_for_tag(tag):
+            tool = Mock()
+
+            def build(dockerfile_content):
+                image = dockerfile_content.split("\n")[0].split()[1]
+                built[tag] = image
+                tool.last_result = Mock(duration_seconds=1.5, cache_hits=1, size=sizes[image])
+                return None
+
+            tool._run.side_effect = build
+            return tool
+
+        def test_for_tag(tag):
+            # Alpine lacks the glibc the script needs
+            return Mock(_run=Mock(return_value="Container test failed. exit 1" if "alpine" in built[tag] else None))
+
+        build_image_tool, test_container_tool = Mock(), Mock()
+        build_image_tool.name, test_container_tool.name = "build_image", "test_container"
+        build_image_tool.tag = "script-container:word_counter"
+        build_image_tool.for_tag.side_effect = build_for_tag
+        test_container_tool.for_tag.side_effect = test_for_tag
+        test_container_tool._run.return_value = None
+        build_image_tool._run.return_value = None
+        generator = DockerfileGenerator(RecordingLLMProvider, build_image_tool, test_container_tool, use_templates=False,
+                                        optimize="size")
+        generator.llm.generate_response = Mock(side_effect=[
+            "FROM python:3.11\nCOPY word_counter.py .",
+            "```dockerfile\nFROM gcr.io/distroless/python3\nCOPY word_counter.py .\n```",
+        ])
+
+        # Execute
+        result = generator.generate_dockerfile(request_model)
+
+        # Verify
+        report = result.optimization_report
+        assert result.file_content == "FROM gcr.io/distroless/python3\nCOPY word_counter.py ."
+        assert [variant.name for variant in report.variants] == [
+            "baseline", "python:3.11-slim", "python:3.11-alpine", "multi-stage",
+        ]
+        assert [variant.passed for variant in report.variants] == [True, True, False, True]
+        assert report.selected == "multi-stage"
+        assert "| multi-stage * | yes | 50.0 | 1.5 | 1 |" in report.format()
+        assert "| python:3.11-alpine | no | 60.0 | 1.5 | 1 |" in report.format()
@@ -1,13 +1,17 @@
+import asyncio
 import pytest
 from src.services.llm_services.script_analyzer import ScriptAnalyzer
 from src.models.script_analysis import ScriptAnalysis
+from src.core.llm_cache import LLMResponseCache
 
 
 class MockLLMProvider:
+    released_threads = []
+
     def __init__(self, tools):
         self.tools = tools
 
-    def generate_response(self, prompt, system_message=None):
+    def generate_response(self, prompt, system_message=None, thread_id=None):
         return (
             '{"language": "python",'
             '"version_requirements": {"python": ">=3.6"},'
@@ -19,6 +23,15 @@ class MockLLMProvider:
             '}}'
         )
 
+    async def agenerate_response(self, prompt, system_message=None, thread_id=None):
+        return self.generate_response(prompt, system_message)
+
+    def bind_thread_tools(self, thread_id, tools):
+        pass
+
+    def release_thread(self, thread_id):
+        self.released_threads.append(thread_id)
+
 class TestScriptAnalyzer:
     @pytest.fixture
     def mock_llm_provider(self):
@@ -38,4 +51,73 @@ class TestScriptAnalyzer:
         assert result.language == "python"
         assert result.version_requirements == {"python": ">=3.6"}
         assert result.system_dependencies == []
-        assert result.environment_variables == [] 
\ No newline at end of file
+        assert result.environment_variables == []
+
+    def test_analyze_script_uses_cache(self, mock_llm_provider, tmp_path, mocker):
+        # Setup
+        cache = LLMResponseCache(cache_dir=str(tmp_path / "cache"))
+        generate_response = mocker.spy(mock_llm_provider, "generate_response")
+        test_script = tmp_path / "test.py"
+        test_script.write_text("print('Hello, World!')")
+
+        # Execute
+        first = ScriptAnalyzer(mock_llm_provider, cache=cache, use_static_analysis=False).analyze_script(str(test_script))
+        second = ScriptAnalyzer(mock_llm_provider, cache=cache, use_static_analysis=False).analyze_script(str(test_script))
+
+        # Verify
+        assert first == second
+        assert generate_response.call_count == 1
+
+    def test_analyze_script_releases_its_conversation(self, mock_llm_provider, tmp_path):
+        analyzer = ScriptAnalyzer(mock_llm_provider, use_static_analysis=False)
+        test_script = tmp_path / "test.py"
+        test_script.write_text("print('Hello, World!')")
+
+        analyzer.analyze_script(str(test_script))
+
+        assert mock_llm_provider.released_threads[-1] == analyzer.thread_id
+
+    def test_malformed_response_is_not_cached(self, mock_llm_provider, tmp_path, mocker):
+        # Setup
+        cache = LLMResponseCache(cache_dir=str(tmp_path / "cache"))
+        mocker.patch.object(mock_llm_provider, "generate_response", return_value="not json")
+        test_script = tmp_path / "test.py"
+        test_script.write_text("print('Hello, World!')")
+
+        # Execute
+        with pytest.raises(Exception):
+            ScriptAnalyzer(mock_llm_provider, cache=cache, use_static_analysis=False).analyze_script(str(test_script))
+
+        # Verify
+        assert list((tmp_path / "cache").glob("*")) == []
+
+    def test_aanalyze_script(self, mock_llm_provider, tmp_path):
+        # Setup
+        analyzer = ScriptAnalyzer(mock_llm_provider)
+        test_script = tmp_path / "test.py"
+        test_script.write_text("print('Hello, World!')")
+
+        # Execute
+        result = asyncio.run(analyzer.aanalyze_script(str(test_script)))
+
+        # Verify
+        assert isinstance(result, ScriptAnalysis)
+        assert result.language == "python"
+
+    def test_analyze_script_falls_back_to_llm_on_low_confidence(self, mock_llm_provider, tmp_path, mocker):
+        # Setup
+        generate_response = mocker.spy(mock_llm_provider, "generate_response")
+        confident_script = tmp_path / "confident.py"
+        confident_script.write_text("import sys\nprint(sys.argv[1])")
+        local_module_script = tmp_path / "uncertain.py"
+        local_module_script.write_text("from .helpers import run\nrun()")
+
+        # Execute
+        analyzer = ScriptAnalyzer(mock_llm_provider)
+        confident = analyzer.analyze_script(str(confident_script))
+        uncertain = analyzer.analyze_script(str(local_module_script))
+
+        # Verify
+        assert confident.execution_pattern["command"] == "python confident.py"
+        assert uncertain.execution_pattern["command"] == "python script.py"
+        assert generate_response.call_count == 1
@@ -0,0 +1,27 @@
+import pytest
+from src.services.base_image_variants import BaseImageVariants
+
+
+class TestBaseImageVariants:
+    @pytest.mark.parametrize("image,expected", [
+        ("python:3.11", ["python:3.11-slim", "python:3.11-alpine"]),
+        ("python:3.11-slim-bookworm", ["python:3.11-alpine"]),
+        ("python", ["python:slim", "python:alpine"]),
+        ("debian:bookworm", ["debian:bookworm-slim"]),
+        ("library/golang:1.22", ["library/golang:1.22-alpine"]),
+        ("node:20-alpine", []),
+        ("python@sha256:abc", []),
+        ("registry.example.com/python:3.11", []),
+    ])
+    def test_smaller_images(self, image, expected):
+        variants = BaseImageVariants().get_variants(f"FROM {image}\nCMD [\"true\"]")
+
+        assert [name for name, _ in variants] == expected
+        assert [content.split("\n")[0] for _, content in variants] == [f"FROM {name}" for name in expected]
+
+    def test_only_final_stage_is_rewritten(self):
+        content = "FROM golang:1.22 AS build\nRUN go build -o /app\n\nfrom --platform=linux/amd64 debian:bookworm AS final\nCOPY --from=build /app /app"
+
+        variants = BaseImageVariants().get_variants(content)
+
+        assert variants == [("debian:bookworm-slim", content.replace("debian:bookworm AS", "debian:bookworm-slim AS"))]
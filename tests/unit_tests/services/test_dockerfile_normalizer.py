@@ -0,0 +1,82 @@
+import pytest
+from src.services.dockerfile_normalizer import DockerfileNormalizer
+
+
+class TestDockerfileNormalizer:
+    def test_install_is_moved_before_script_copy(self):
+        content = (
+            "FROM python:3.11\n"
+            "WORKDIR /app\n"
+            "COPY word_counter.py /app/\n"
+            "# Dependencies\n"
+            "RUN apt-get update && \\\n"
+            "    apt-get install -y curl\n"
+            "RUN pip install --no-cache-dir requests\n"
+            "ENTRYPOINT [\"python\", \"/app/word_counter.py\"]\n"
+        )
+
+        normalized = DockerfileNormalizer().normalize(content)
+
+        assert normalized == (
+            "FROM python:3.11\n"
+            "WORKDIR /app\n"
+            "# Dependencies\n"
+            "RUN apt-get update && \\\n"
+            "    apt-get install -y curl\n"
+            "RUN pip install --no-cache-dir requests\n"
+            "COPY word_counter.py /app/\n"
+            "ENTRYPOINT [\"python\", \"/app/word_counter.py\"]\n"
+        )
+
+    @pytest.mark.parametrize("copy,install", [
+        ("COPY requirements.txt .", "RUN pip install -r requirements.txt"),
+        ("COPY . /app", "RUN pip install requests"),
+        ("COPY --from=builder /out/app /app/", "RUN apt-get install -y curl"),
+        ("COPY package.json /srv/", "RUN cd /srv && npm install"),
+        ("COPY package.json package-lock.json ./", "RUN npm ci"),
+        ("COPY go.mod go.sum ./", "RUN go mod download"),
+        ("COPY Gemfile Gemfile.lock ./", "RUN bundle install && gem install rake"),
+    ])
+    def test_install_using_copied_files_is_kept(self, copy, install):
+        content = f"FROM node:20\n{copy}\n{install}\n"
+
+        assert DockerfileNormalizer().normalize(content) == content
+
+    def test_install_is_not_moved_across_other_instructions(self):
+        content = "FROM python:3.11\nCOPY script.py /app/\nUSER nobody\nRUN pip install --user requests\n"
+
+        assert DockerfileNormalizer().normalize(content) == content
+
+    def test_only_final_stage_is_reordered(self):
+        content = (
+            "FROM golang:1.22 AS builder\n"
+            "COPY main.go .\n"
+            "RUN go mod download\n"
+            "FROM debian:bookworm\n"
+            "COPY --from=builder /out/app /app\n"
+            "COPY run.sh /run.sh\n"
+            "RUN apt-get install -y ca-certificates\n"
+        )
+
+        normalized = DockerfileNormalizer().normalize(content)
+
+        assert normalized.splitlines() == [
+            "FROM golang:1.22 AS builder",
+            "COPY main.go .",
+            "RUN go mod download",
+            "FROM debian:bookworm",
+            "COPY --from=builder /out/app /app",
+            "RUN apt-get install -y ca-certificates",
+            "COPY run.sh /run.sh",
+        ]
+
+    def test_cache_mounts(self):
+        content = "FROM python:3.11\nRUN pip install --no-cache-dir requests\nRUN --mount=type=cache,target=/x npm ci\n"
+
+        normalized = DockerfileNormalizer(use_cache_mounts=True).normalize(content)
+
+        assert normalized == (
+            "FROM python:3.11\n"
+            "RUN --mount=type=cache,target=/root/.cache/pip pip install requests\n"
+            "RUN --mount=type=cache,target=/x npm ci\n"
+        )
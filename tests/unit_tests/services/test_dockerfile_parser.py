@@ -0,0 +1,85 @@
+import pytest
+from src.services.dockerfile_parser import DockerfileParser, DockerfileStreamReader, DockerfileStreamAbortedError
+
+
+class TestDockerfileParser:
+    def test_parse_joins_continuations_and_skips_comments(self):
+        content = (
+            "# syntax=docker/dockerfile:1\n"
+            "FROM python:3.11\n"
+            "\n"
+            "RUN apt-get update && \\\n"
+            "    # comments inside continuations are dropped\n"
+            "    apt-get install -y curl\n"
+            "copy script.py /app/\n"
+        )
+
+        instructions = DockerfileParser.parse(content)
+
+        assert [i.instruction for i in instructions] == ["FROM", "RUN", "COPY"]
+        assert instructions[1].arguments == "apt-get update && apt-get install -y curl"
+        assert instructions[1].line_number == 4
+        assert instructions[2].line_number == 7
+
+    def test_escape_directive(self):
+        content = "# escape=`\nFROM mcr.microsoft.com/windows/servercore\nRUN dir C:\\ `\n    && echo done\n# escape=\\\n"
+
+        instructions = DockerfileParser.parse(content)
+
+        assert [i.raw for i in instructions] == [
+            "FROM mcr.microsoft.com/windows/servercore",
+            "RUN dir C:\\ && echo done",
+        ]
+
+    def test_feed_returns_instructions_as_they_complete(self):
+        parser = DockerfileParser()
+
+        assert parser.feed("FROM pyth") == []
+        assert [i.raw for i in parser.feed("on:3.11\nWORKDIR /app")] == ["FROM python:3.11"]
+        assert [i.raw for i in parser.close()] == ["WORKDIR /app"]
+
+
+class TestDockerfileStreamReader:
+    def stream(self, reader, text, chunk_size=7):
+        for start in range(0, len(text), chunk_size):
+            reader.feed(text[start:start + chunk_size])
+            if reader.finished:
+                break
+        reader.close()
+
+    def test_fenced_dockerfile(self):
+        reader = DockerfileStreamReader()
+
+        self.stream(reader, "```dockerfile\nFROM node:18\nCOPY app.js .\n```\nThis Dockerfile copies the app.")
+
+        assert reader.finished
+        assert reader.content == "FROM node:18\nCOPY app.js ."
+        assert [i.instruction for i in reader.instructions] == ["FROM", "COPY"]
+
+    def test_preamble_aborts_on_first_line(self):
+        reader = DockerfileStreamReader()
+
+        with pytest.raises(DockerfileStreamAbortedError):
+            reader.feed("Here is the Dockerfile you asked for:\n")
+
+    def test_heredoc_bodies_are_not_instructions(self):
+        reader = DockerfileStreamReader()
+
+        self.stream(reader, "FROM debian:bookworm\nRUN <<EOT\napt-get update\nEOT\nCOPY app.sh /app/\n")
+
+        assert [i.instruction for i in reader.instructions] == ["FROM", "RUN", "COPY"]
+        assert reader.instructions[2].line_number == 5
+
+    def test_unknown_instruction_aborts(self):
+        reader = DockerfileStreamReader()
+        reader.feed("FROM python:3.11\n")
+
+        with pytest.raises(DockerfileStreamAbortedError):
+            reader.feed("INSTALL requests\n")
+
+    def test_empty_response_aborts(self):
+        reader = DockerfileStreamReader()
+        reader.feed("```dockerfile\n```\n")
+
+        with pytest.raises(DockerfileStreamAbortedError):
+            reader.close()
@@ -0,0 +1,79 @@
+import pytest
+from pathlib import Path
+from src.models.script_analysis import ScriptAnalysis
+from src.services.dockerfile_parser import DockerfileParser
+from src.services.dockerfile_template_engine import DockerfileTemplateEngine
+from src.services.static_script_analyzer import StaticScriptAnalyzer
+
+
+EXAMPLES_DIR = Path(__file__).parent.parent.parent.parent / "examples" / "sample_scripts"
+
+
+def build_analysis(language, **kwargs):
+    return ScriptAnalysis(
+        language=language,
+        version_requirements=kwargs.get("version_requirements", {}),
+        system_dependencies=kwargs.get("system_dependencies", []),
+        package_dependencies=kwargs.get("package_dependencies", []),
+        environment_variables=[],
+        execution_pattern={},
+    )
+
+
+class TestDockerfileTemplateEngine:
+    @pytest.fixture
+    def engine(self):
+        return DockerfileTemplateEngine()
+
+    @pytest.mark.parametrize("filename,base_image,entrypoint", [
+        ("word_counter.py", "python:3.11", '["python", "/app/word_counter.py"]'),
+        ("line_counter.sh", "debian:bookworm", '["bash", "/app/line_counter.sh"]'),
+        ("text_capitalizer.rb", "ruby:3.2", '["ruby", "/app/text_capitalizer.rb"]'),
+        ("char_counter.go", "golang:1.22", '["/app/char_counter"]'),
+        ("vowel_counter.js", "node:20", '["node", "/app/vowel_counter.js"]'),
+    ])
+    def test_sample_scripts(self, engine, filename, base_image, entrypoint):
+        path = EXAMPLES_DIR / filename
+        analysis = StaticScriptAnalyzer().analyze(str(path), path.read_text()).analysis
+
+        content = engine.render(analysis, filename)
+
+        instructions = DockerfileParser.parse(content)
+        assert instructions[0].raw == f"FROM {base_image}"
+        assert instructions[-1].raw == f"ENTRYPOINT {entrypoint}"
+
+    def test_dependencies_are_installed(self, engine):
+        analysis = build_analysis("python", system_dependencies=["curl", "libpq-dev"], package_dependencies=["requests"])
+
+        content = engine.render(analysis, "fetch.py")
+
+        assert "apt-get install -y --no-install-recommends curl libpq-dev" in content
+        assert "RUN pip install --no-cache-dir requests" in content
+
+    @pytest.mark.parametrize("requirement,base_image", [
+        ("3.9", "python:3.9"),
+        ("==3.10.4", "python:3.10"),
+        (">=3.6", "python:3.11"),
+        ("3.6+", "python:3.11"),
+        ("<3.9", "python:3.8"),
+        (">=3.8,<3.11", "python:3.10"),
+        ("<=3.12", "python:3.11"),
+        ("<3.8", None),
+    ])
+    def test_pinned_version_selects_base_image(self, engine, requirement, base_image):
+        assert engine.get_base_image("python", {"python": requirement}) == base_image
+
+    def test_version_below_supported_ones_is_not_rendered(self, engine):
+        assert engine.render(build_analysis("python", version_requirements={"python": "<3.6"}), "script.py") is None
+
+    def test_predict_base_image(self, engine):
+        assert engine.predict_base_image(build_analysis("Node.js", version_requirements={"node": "18"})) == "node:18"
+        assert engine.predict_base_image(build_analysis("rust")) is None
+
+    @pytest.mark.parametrize("analysis", [
+        build_analysis("rust"),
+        build_analysis("python", system_dependencies=["some package && rm -rf /"]),
+        build_analysis("go", package_dependencies=["github.com/spf13/cobra"]),
+    ])
+    def test_unsupported_analysis_is_not_rendered(self, engine, analysis):
+        assert engine.render(analysis, "script") is None
@@ -0,0 +1,61 @@
+import pytest
+from src.services.dockerfile_validator import DockerfileValidator
+
+
+class TestDockerfileValidator:
+    @pytest.fixture
+    def validator(self):
+        return DockerfileValidator(["Dockerfile", "word_counter.py", "lib/helpers.py"])
+
+    @pytest.mark.parametrize("content", [
+        'FROM python:3.11\nCOPY word_counter.py /app/\nENTRYPOINT ["python", "/app/word_counter.py"]',
+        "ARG VERSION=3.11\nFROM python:${VERSION}\nCOPY . /app\nCOPY ./lib /app/lib\nCOPY *.py lib/*.py /app/",
+        "FROM golang:1.22 AS build\nFROM debian:bookworm\nCOPY --from=build /go/bin/app /app\nADD https://example.com/x.tgz /tmp/",
+        "FROM python:3.11\nRUN <<EOF\napt-get update\npip install requests\nEOF\nCOPY [\"word_counter.py\", \"/app/\"]",
+    ])
+    def test_valid_dockerfiles(self, validator, content):
+        assert validator.validate(content) == []
+
+    @pytest.mark.parametrize("content", [
+        "FROM python:3.11\nCOPY <<EOT /app/run.sh\npython /app/word_counter.py\nEOT",
+        "FROM python:3.11\nRUN cat <<EOT > /a && cat <<EOT2 > /b\nfirst\nEOT\nsecond\nEOT2\nCOPY word_counter.py /app/",
+        "# escape=`\nFROM python:3.11\nRUN pip install `\n    requests\nCOPY word_counter.py C:\\app\\",
+    ])
+    def test_valid_heredocs_and_escape_directive(self, validator, content):
+        assert validator.validate(content) == []
+
+    def test_leftover_fence(self, validator):
+        errors = validator.validate("```dockerfile\nFROM python:3.11\n```")
+
+        assert len(errors) == 2
+        assert errors[0].startswith("Line 1: remove the markdown code fence")
+        assert errors[1].startswith("Line 3:")
+
+    def test_missing_from_and_unknown_instruction(self, validator):
+        errors = validator.validate("RUN pip install requests\nINSTALL curl")
+
+        assert errors == [
+            "The Dockerfile must start with a FROM instruction (optionally preceded by ARG)",
+            "Line 2: unknown instruction: INSTALL curl",
+        ]
+
+    @pytest.mark.parametrize("run", ["RUN echo $((1<<2))", "RUN echo $(( x << y ))", "RUN grep -q 3 <<< \"$VERSION\""])
+    def test_shifts_and_here_strings_are_not_heredocs(self, validator, run):
+        errors = validator.validate(f"FROM python:3.11\n{run}\nINSTALL curl\ny")
+
+        assert errors == ["Line 3: unknown instruction: INSTALL curl", "Line 4: unknown instruction: y"]
+
+    @pytest.mark.parametrize("copy,error", [
+        ("COPY requirements.txt /app/", "requirements.txt is not in the build context"),
+        ("COPY ../secrets /app/", "../secrets is outside of the build context"),
+        ("COPY word_counter.py", "COPY needs at least a source and a destination"),
+        ("ADD src/*.py /app/", "src/*.py is not in the build context"),
+    ])
+    def test_copy_sources_are_checked(self, validator, copy, error):
+        errors = validator.validate(f"FROM python:3.11\n{copy}")
+
+        assert len(errors) == 1
+        assert errors[0].startswith(f"Line 2: {error}")
+
+    def test_empty_dockerfile(self, validator):
+        assert validator.validate("# nothing here\n") == ["The Dockerfile does not contain any instructions"]
@@ -1,3 +1,5 @@
+import os
+import time
 import pytest
 from unittest.mock import Mock
 
@@ -5,6 +7,7 @@ from src.models.script_analysis import ScriptAnalysis
 from src.services.file_service import FileService
 from src.models.build_context import BuildContext
 from src.models.docker_file_generation import DockerfileGenerationRequest
+from src.models.garbage_collection import GCPolicy
 
 class TestFileService:
     @pytest.fixture
@@ -70,4 +73,38 @@ class TestFileService:
             build_context.get_dockerfile_path(),
             request.file_content
         )
-        assert result == build_context.get_dockerfile_path() 
\ No newline at end of file
+        assert result == build_context.get_dockerfile_path() 
+
+class TestFileServiceGarbageCollection:
+    DAY = 86400
+
+    @pytest.fixture
+    def context_root(self, tmp_path):
+        now = time.time()
+        for name, age_days in [("fresh", 0), ("recent", 1), ("stale", 10)]:
+            directory = tmp_path / name
+            directory.mkdir()
+            (directory / "Dockerfile").write_text("FROM python:3.11")
+            for path in (directory / "Dockerfile", directory):
+                os.utime(path, (now - age_days * self.DAY, now - age_days * self.DAY))
+        (tmp_path / "results.sqlite3").write_text("")
+        return tmp_path
+
+    def test_stale_and_least_recently_used_contexts_are_removed(self, context_root):
+        # Execute
+        items = FileService().collect_garbage(str(context_root), GCPolicy(max_age_days=7, max_build_contexts=1))
+
+        # Verify
+        assert [(os.path.basename(item.name), item.reason.split()[0]) for item in items] == [
+            ("recent", "beyond"), ("stale", "unused"),
+        ]
+        assert sorted(os.listdir(context_root)) == ["fresh", "results.sqlite3"]
+
+    def test_dry_run_removes_nothing(self, context_root):
+        # Execute
+        items = FileService().collect_garbage(str(context_root), GCPolicy(max_age_days=7, dry_run=True))
+
+        # Verify
+        assert [os.path.basename(item.name) for item in items] == ["stale"]
+        assert items[0].size == len("FROM python:3.11")
+        assert (context_root / "stale").exists()
@@ -0,0 +1,44 @@
+import pytest
+from pathlib import Path
+from src.services.markdown_command_extractor import MarkdownCommandExtractor
+
+
+EXAMPLES_DIR = Path(__file__).parent.parent.parent.parent / "examples" / "sample_scripts"
+
+
+class TestMarkdownCommandExtractor:
+    @pytest.fixture
+    def extractor(self):
+        return MarkdownCommandExtractor()
+
+    @pytest.mark.parametrize("script,arguments", [
+        ("char_counter.go", "'Hello, World!'"),
+        ("line_counter.sh", "'Hello world\nThis is a test.'"),
+        ("text_capitalizer.rb", "'hello beautiful world'"),
+        ("vowel_counter.js", "'Hello world'"),
+        ("word_counter.py", "'Hello beautiful world'"),
+    ])
+    def test_sample_readmes(self, extractor, script, arguments):
+        readme = EXAMPLES_DIR / f"README_{Path(script).stem}.md"
+
+        assert extractor.extract_arguments(readme.read_text(), str(EXAMPLES_DIR / script)) == arguments
+
+    def test_continuations_and_prompts(self, extractor):
+        content = "```sh\n$ python -u tool.py --input in.txt \\\n    --verbose\n```\n"
+
+        assert extractor.extract_arguments(content, "tool.py") == "--input in.txt --verbose"
+
+    def test_inline_code(self, extractor):
+        content = "Run it with `./tool.sh data.csv` and check the output."
+
+        assert extractor.extract_arguments(content, "tool.sh") == "data.csv"
+
+    def test_ambiguous_examples_return_none(self, extractor):
+        content = "```bash\npython tool.py first\n```\n\n```bash\npython tool.py second\n```\n"
+
+        assert extractor.extract_arguments(content, "tool.py") is None
+
+    def test_other_scripts_and_commands_are_ignored(self, extractor):
+        content = "```bash\nchmod +x tool.sh\npython other.py arg\n```\n"
+
+        assert extractor.extract_arguments(content, "tool.sh") is None
@@ -0,0 +1,77 @@
+import pytest
+from pathlib import Path
+from src.services.static_script_analyzer import StaticScriptAnalyzer
+
+
+EXAMPLES_DIR = Path(__file__).parent.parent.parent.parent / "examples" / "sample_scripts"
+
+
+class TestStaticScriptAnalyzer:
+    @pytest.fixture
+    def analyzer(self):
+        return StaticScriptAnalyzer()
+
+    @pytest.mark.parametrize("filename,language,command", [
+        ("word_counter.py", "python", "python word_counter.py"),
+        ("line_counter.sh", "bash", "bash line_counter.sh"),
+        ("text_capitalizer.rb", "ruby", "ruby text_capitalizer.rb"),
+        ("char_counter.go", "go", "go run char_counter.go"),
+        ("vowel_counter.js", "javascript", "node vowel_counter.js"),
+    ])
+    def test_sample_scripts_are_confident(self, analyzer, filename, language, command):
+        path = EXAMPLES_DIR / filename
+
+        result = analyzer.analyze(str(path), path.read_text())
+
+        assert result.confidence >= 0.8
+        assert result.analysis.language == language
+        assert result.analysis.system_dependencies == []
+        assert result.analysis.execution_pattern["command"] == command
+
+    def test_python_imports_and_environment(self, analyzer, tmp_path):
+        content = (
+            "import os\nimport requests\nimport yaml\nfrom collections import Counter\n"
+            "print(os.getenv('API_KEY'), os.environ['REGION'], os.environ.get('DEBUG'))\n"
+            "if (n := 1): pass\n"
+        )
+
+        result = analyzer.analyze(str(tmp_path / "script.py"), content)
+
+        assert result.analysis.package_dependencies == ["requests", "pyyaml"]
+        assert result.analysis.environment_variables == ["API_KEY", "REGION", "DEBUG"]
+        assert result.analysis.version_requirements == {"python": ">=3.8"}
+        assert result.confidence < 0.95
+
+    def test_python_local_module_is_not_confident(self, analyzer, tmp_path):
+        (tmp_path / "helpers.py").write_text("")
+
+        result = analyzer.analyze(str(tmp_path / "script.py"), "import helpers\n")
+
+        assert result.confidence < 0.8
+
+    def test_bash_external_commands(self, analyzer):
+        content = (
+            "#!/usr/bin/env bash\n"
+            "URL=\"${API_URL:-http://localhost}\"\n"
+            "resp=$(curl -s \"$URL\" | jq '.data')\n"
+            "echo \"$resp\" | wc -l  # count lines; then notify-send\n"
+        )
+
+        result = analyzer.analyze("fetch", content)
+
+        assert result.analysis.language == "bash"
+        assert result.analysis.system_dependencies == ["curl", "jq"]
+        assert result.analysis.environment_variables == ["API_URL"]
+
+    def test_node_packages(self, analyzer):
+        content = "const _ = require('lodash');\nimport x from '@scope/pkg/sub';\nconst fs = require('node:fs');\n" \
+                  "console.log(process.env.TOKEN);\n"
+
+        result = analyzer.analyze("script.js", content)
+
+        assert result.analysis.package_dependencies == ["lodash", "@scope/pkg"]
+        assert result.analysis.environment_variables == ["TOKEN"]
+
+    def test_unsupported_or_invalid_scripts(self, analyzer):
+        assert analyzer.analyze("script.php", "<?php echo 1;") is None
+        assert analyzer.analyze("script.py", "def broken(:\n") is None
@@ -0,0 +1,107 @@
+import pytest
+from unittest.mock import Mock
+from src.core.image_result_store import ImageResultStore
+from src.models.build_result import BuildResult
+from src.models.container_run import ContainerRunResult
+from src.services.dockerfile_validator import DockerfileValidator
+from src.services.tool_services.build_image import BuildImageTool
+from src.services.tool_services.test_container import TestContainerTool
+
+
+TAG = "script-container:script"
+DOCKERFILE = "FROM python:3.11\nCOPY script.py /app/\nENTRYPOINT [\"python\", \"/app/script.py\"]"
+
+
+class TestResultMemoization:
+    @pytest.fixture
+    def docker_manager(self):
+        docker_manager = Mock()
+        docker_manager.build_image.return_value = BuildResult(tag=TAG, success=True, image_id="sha256:abc")
+        docker_manager.tag_image.return_value = True
+        docker_manager.run_test.return_value = ContainerRunResult(tag=TAG, test_command="python script.py", exit_code=1,
+                                                                  logs="boom")
+        return docker_manager
+
+    @pytest.fixture
+    def tools(self, tmp_path, docker_manager):
+        script_path = tmp_path / "script.py"
+        script_path.write_text("print('hello')")
+        store = ImageResultStore(str(tmp_path / "results.sqlite3"), {"script.py": str(script_path)}, "python script.py")
+        build_tool = BuildImageTool(docker_manager, Mock(), str(tmp_path / "Dockerfile"), TAG,
+                                    context_archive=Mock(), result_store=store)
+        test_tool = TestContainerTool(docker_manager, TAG, "python script.py", result_store=store)
+        return build_tool, test_tool
+
+    def test_known_dockerfile_skips_build_and_test(self, tools, docker_manager):
+        # Setup
+        build_tool, test_tool = tools
+        build_tool._run(DOCKERFILE)
+        first_error = test_tool._run()
+
+        # Execute
+        build_error = build_tool._run(DOCKERFILE)
+        test_error = test_tool._run()
+
+        # Verify
+        assert build_error is None
+        assert test_error == first_error
+        assert "boom" in test_error
+        docker_manager.build_image.assert_called_once()
+        docker_manager.run_test.assert_called_once()
+        docker_manager.tag_image.assert_called_once_with("sha256:abc", TAG)
+
+    def test_missing_image_is_rebuilt(self, tools, docker_manager):
+        # Setup
+        build_tool, _ = tools
+        build_tool._run(DOCKERFILE)
+        docker_manager.tag_image.return_value = False
+
+        # Execute
+        build_tool._run(DOCKERFILE)
+
+        # Verify
+        assert docker_manager.build_image.call_count == 2
+
+    def test_removed_image_is_forgotten(self, tools, docker_manager):
+        # Setup
+        build_tool, _ = tools
+        build_tool._run(DOCKERFILE)
+        docker_manager.image_exists.return_value = False
+
+        # Execute
+        build_tool._run(DOCKERFILE)
+
+        # Verify
+        docker_manager.image_exists.assert_called_once_with("sha256:abc")
+        docker_manager.tag_image.assert_not_called()
+        assert docker_manager.build_image.call_count == 2
+
+    def test_timed_out_test_is_not_recorded(self, tools, docker_manager):
+        # Setup
+        build_tool, test_tool = tools
+        docker_manager.run_test.return_value.timed_out = True
+        build_tool._run(DOCKERFILE)
+        test_tool._run()
+
+        # Execute
+        build_tool._run(DOCKERFILE)
+        test_tool._run()
+
+        # Verify
+        assert docker_manager.run_test.call_count == 2
+
+
+class TestBuildImageToolValidation:
+    def test_invalid_dockerfile_is_not_built(self, tmp_path):
+        # Setup
+        docker_manager = Mock()
+        validator = DockerfileValidator(["Dockerfile", "script.py"])
+        build_tool = BuildImageTool(docker_manager, Mock(), str(tmp_path / "Dockerfile"), TAG,
+                                    context_archive=Mock(), validator=validator)
+
+        # Execute
+        error = build_tool._run("FROM python:3.11\nCOPY requirements.txt /app/")
+
+        # Verify
+        assert error.startswith("The Dockerfile is invalid and was not built:\n- Line 2: requirements.txt")
+        docker_manager.build_image.assert_not_called()
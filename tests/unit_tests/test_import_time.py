@@ -0,0 +1,62 @@
+import json
+import re
+import subprocess
+import sys
+from pathlib import Path
+import pytest
+
+
+ROOT_DIR = Path(__file__).parent.parent.parent
+# Generous so slow CI machines pass, while eagerly importing langgraph or a vendor SDK (1s+ each) does not
+MAX_MAIN_IMPORT_SECONDS = 1.0
+VENDOR_SDKS = ["langchain_openai", "langchain_google_genai"]
+
+
+def run_python(code: str, *args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *args, "-c", code],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def get_loaded_modules(code: str, modules) -> dict:
+    result = run_python(f"import sys\n{code}\nimport json\nprint(json.dumps({{m: m in sys.modules for m in {modules!r}}}))")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class TestImportTime:
+    def test_main_import_time(self):
+        result = run_python("import main", "-X", "importtime")
+
+        # Lines look like "import time: self [us] | cumulative | imported package"
+        match = re.search(r"^import time:\s+\d+\s+\|\s+(\d+)\s+\|\s+main$", result.stderr, re.MULTILINE)
+        cumulative_seconds = int(match.group(1)) / 1_000_000
+
+        assert cumulative_seconds < MAX_MAIN_IMPORT_SECONDS
+
+    def test_main_does_not_import_llm_or_docker(self):
+        modules = ["langgraph", "docker", *VENDOR_SDKS]
+
+        loaded = get_loaded_modules("import main", modules)
+
+        assert not any(loaded.values()), loaded
+
+    @pytest.mark.parametrize("vendor,expected_sdk", [
+        ("openai", "langchain_openai"),
+        ("google", "langchain_google_genai"),
+    ])
+    def test_only_selected_vendor_sdk_is_imported(self, vendor, expected_sdk):
+        code = (
+            "import os\n"
+            "os.environ.setdefault('OPENAI_API_KEY', 'test-key')\n"
+            "os.environ.setdefault('GOOGLE_API_KEY', 'test-key')\n"
+            "from src.controllers.llm_provider_controller import LLMProviderController\n"
+            f"LLMProviderController('{vendor}').get_llm_provider()()\n"
+        )
+
+        loaded = get_loaded_modules(code, VENDOR_SDKS)
+
+        assert loaded == {sdk: sdk == expected_sdk for sdk in VENDOR_SDKS}